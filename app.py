@@ -3,6 +3,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import streamlit as st
+from config.constants import MODEL_PRELOAD, INFERENCE_SERVER_URL, METRICS_PORT
 from config.page_config import setup_page
 from components.sidebar import render_sidebar
 from pages.landing import render_landing
@@ -10,6 +11,8 @@ from pages.classify import render_classify
 from pages.inbox import render_inbox
 from pages.log import render_log
 from pages.dashboard import render_dashboard
+from models.startup import preload_models
+from utils.metrics import start_metrics_server
 
 
 def main():
@@ -24,6 +27,15 @@ def main():
     if 'imap_connected' not in st.session_state:
         st.session_state.imap_connected = False
 
+    # Start loading the model in the background while the user is on other pages
+    # (not needed when a separate inference server holds the model)
+    if MODEL_PRELOAD and not INFERENCE_SERVER_URL:
+        preload_models()
+
+    # Per-stage latency histograms for Prometheus (once per process)
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+
     # Load model only for pages that need it
     models = None
     if st.session_state.page in ('classify', 'inbox'):
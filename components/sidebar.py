@@ -3,8 +3,8 @@ import pathfix  # noqa — must be first, adds project root to sys.path
 import streamlit as st
 
 from config.constants import APP_NAME, APP_VERSION, MODEL_NAME, MODEL_ACCURACY, MODEL_PARAMS
-from models.loader import get_device_label
-from utils.log_manager import load_log, get_log_summary
+from models.loader import get_device_label, get_cache_stats
+from utils.log_manager import get_log_summary
 
 PAGES = [
     {"key": "landing",   "label": "Home",          "icon": "🏠"},
@@ -62,8 +62,7 @@ def _render_status(models: dict = None):
 
 def _render_log_summary():
     st.caption("LOG SUMMARY")
-    entries = load_log()
-    summary = get_log_summary(entries)
+    summary = get_log_summary()
 
     col1, col2 = st.columns(2)
     with col1:
@@ -81,6 +80,14 @@ def _render_model_info(models: dict):
     st.metric("Accuracy",     MODEL_ACCURACY)
     st.metric("Device",       get_device_label(models))
 
+    cache = get_cache_stats(models)
+    if cache:
+        st.metric("Cache Hit Rate", f"{cache['hit_rate_pct']}%")
+        st.caption(
+            f"{cache['hits']} hits · {cache['misses']} misses · "
+            f"{cache['size']}/{cache['max_size']} cached"
+        )
+
 
 def _render_sidebar_footer():
     st.markdown("<br>", unsafe_allow_html=True)
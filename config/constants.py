@@ -157,6 +157,116 @@ LOG_FILE_PATH = _os.path.join(
     "email_log.json"
 )
 
+# ─── Log Storage ──────────────────────────────────────────────────────────────
+# Backend for the email log:
+#   "jsonl"  — append-only JSON lines (default)
+#   "sqlite" — indexed + full-text search, best for very large logs
+#   "json"   — legacy single JSON array
+LOG_BACKEND     = "jsonl"
+LOG_JSONL_PATH  = _os.path.join(_os.path.dirname(LOG_FILE_PATH), "email_log.jsonl")
+LOG_SQLITE_PATH = _os.path.join(_os.path.dirname(LOG_FILE_PATH), "email_log.db")
+LOG_FSYNC_EVERY    = 8       # appends between fsyncs
+LOG_FSYNC_INTERVAL = 2.0     # seconds — fsync sooner if this much time has passed
+LOG_COMPACT_AFTER  = 200     # tombstones before the JSONL file is rewritten
+
+# Cold tier: entries older than this many days can be moved to
+# month-partitioned Parquet files under LOG_ARCHIVE_DIR
+LOG_ARCHIVE_DIR        = _os.path.join(_os.path.dirname(LOG_FILE_PATH), "archive")
+LOG_ARCHIVE_AFTER_DAYS = 90
+
+# Rows encoded per chunk when streaming a CSV export
+LOG_EXPORT_CHUNK_ROWS = 1000
+
+# Page sizes offered on the Email Log page
+LOG_PAGE_SIZES = [10, 25, 50, 100]
+
+# ─── Inference Backend ────────────────────────────────────────────────────────
+# "auto"  — ONNX Runtime on CPU if onnxruntime is installed and
+#           models/mobilebert/model.onnx exists, PyTorch otherwise
+# "torch" — always PyTorch
+# "onnx"  — always ONNX Runtime (export first: python -m models.onnx_backend export)
+INFERENCE_BACKEND     = "auto"
+ONNX_INTRA_OP_THREADS = 0        # 0 = one thread per physical core
+
+# Dynamic INT8 quantization of the Linear layers (CPU only). Activated only
+# if accuracy and macro-F1 on the test split stay within QUANTIZE_MAX_DROP
+# of an fp32 run on the same split; the verdict is cached in QUANTIZE_REPORT_PATH
+INFERENCE_QUANTIZE   = False
+QUANTIZE_MAX_DROP    = 0.01     # fraction of test emails, floored at one email
+QUANTIZE_REPORT_PATH = _os.path.join(_os.path.dirname(LOG_FILE_PATH), "quantization_report.json")
+
+# ─── Inference Server ─────────────────────────────────────────────────────────
+# Run the model in its own process (python -m models.server) and point the UI
+# at it by setting INFERENCE_SERVER_URL, e.g. http://127.0.0.1:8765.
+# Empty = load the model inside the Streamlit process as before
+INFERENCE_SERVER_URL     = _os.environ.get("INFERENCE_SERVER_URL", "").rstrip("/")
+INFERENCE_SERVER_HOST    = "127.0.0.1"
+INFERENCE_SERVER_PORT    = 8765
+INFERENCE_MAX_BATCH      = 32     # texts per forward pass, across requests
+INFERENCE_BATCH_WAIT_MS  = 5      # how long a batch waits for more requests
+INFERENCE_QUEUE_SIZE     = 64     # pending requests before the server answers 503
+INFERENCE_CLIENT_TIMEOUT = 30     # seconds
+
+# ─── Model Startup ────────────────────────────────────────────────────────────
+# Start loading the model in a background thread as soon as the app starts,
+# so the first Classify/Inbox visit only waits for what is left of the load
+MODEL_PRELOAD = True
+
+# Dummy emails run through the model after loading (approx. word counts), so
+# the first real prediction doesn't pay for lazy kernel and allocator setup
+MODEL_WARMUP_LENGTHS = [16, 64, 128]
+
+# PyTorch backend: after the first from_pretrained() load, save the model and
+# tokenizer to models/mobilebert/snapshot.pt and memory-map it on later starts
+MODEL_SNAPSHOT = True
+
+# PyTorch on CPU: use the memory-mapped tensors from model.safetensors as the
+# model's parameters instead of copying them, so server processes on one host
+# share a single copy of the weights (see python -m utils.memory)
+MODEL_MMAP = True
+
+# ─── Prediction Cache ─────────────────────────────────────────────────────────
+# LRU cache of model outputs keyed on cleaned text + model fingerprint
+PREDICTION_CACHE_SIZE = 2048
+PREDICTION_CACHE_PATH = _os.path.join(
+    _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__))),
+    "data",
+    "prediction_cache.pkl"
+)                                # set to None to keep the cache in memory only
+PREDICTION_CACHE_SAVE_EVERY    = 64      # puts between background saves of the pickle
+PREDICTION_CACHE_SAVE_INTERVAL = 30.0    # seconds — save sooner if this much time has passed
+
+# ─── Token Cache ──────────────────────────────────────────────────────────────
+# LRU cache of token ids keyed on cleaned text (shared by every model that uses
+# the same tokenizer). Pre-tokenized stores built with
+# `python -m models.token_cache build` are loaded from TOKEN_STORE_DIR at startup
+TOKEN_CACHE_SIZE = 8192
+TOKEN_STORE_DIR  = _os.path.join(_os.path.dirname(LOG_FILE_PATH), "tokens")
+
+# ─── Re-classification Job ────────────────────────────────────────────────────
+# python -m models.reclassify — re-score the log after retraining
+RECLASSIFY_DIR     = _os.path.join(_os.path.dirname(LOG_FILE_PATH), "reclassify")
+RECLASSIFY_WORKERS = 2       # chunks scored concurrently (CPU threads are split between them)
+RECLASSIFY_CHUNK   = 256     # entries per batched predict_emails() call
+
+# ─── Benchmark ────────────────────────────────────────────────────────────────
+# python -m models.benchmark — accuracy + latency report per backend/variant
+BENCHMARK_DIR         = _os.path.join(_os.path.dirname(LOG_FILE_PATH), "benchmarks")
+BENCHMARK_BATCH_SIZES = [1, 8, 32, 64]
+BENCHMARK_BATCHES     = 300     # timed batches per batch size × thread count (p99 needs ≥ 300)
+
+# ─── Stage Metrics ────────────────────────────────────────────────────────────
+# perf_counter_ns spans around fetch → parse → clean → tokenize → pad → infer →
+# validate → log, kept as in-process histograms (utils/metrics.py).
+# The inference server exports them at /metrics and /metrics.json; the
+# Streamlit app does the same on METRICS_PORT when it is set (0 = off)
+METRICS_ENABLED = True
+METRICS_PORT    = int(_os.environ.get("METRICS_PORT", "0"))
+METRICS_BUCKETS = (                # seconds, upper bounds
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
 # ─── Irrelevant Detection ─────────────────────────────────────────────────────
 # If model's top confidence is below this threshold, email is flagged irrelevant
 IRRELEVANT_THRESHOLD   = 55      # % — below this = not meant for registry
@@ -0,0 +1,41 @@
+import pathfix  # noqa
+# models/background.py
+# Background batch classification — runs predict_emails() off the script thread
+# Depends on: models/predictor.py
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from models.predictor import predict_emails, combine_subject_body
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide single worker, shared by every session.
+    One worker keeps concurrent jobs from fighting over CPU cores.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='auto-classify')
+        return _executor
+
+
+def submit_classification(emails: list[dict], models: dict, batch_size: int = 16) -> Future:
+    """
+    Queue a batched classification of fetched inbox emails.
+
+    Args:
+        emails:     Email dicts with 'subject' and 'body' keys
+        models:     Dict returned by load_models()
+        batch_size: Maximum number of emails per forward pass
+
+    Returns:
+        Future resolving to a list of predict_email()-style result
+        dicts, in the same order as `emails`
+    """
+    texts = [combine_subject_body(em.get('subject', ''), em.get('body', '')) for em in emails]
+    return _get_executor().submit(predict_emails, texts, models, batch_size)
@@ -0,0 +1,295 @@
+import pathfix  # noqa
+# models/benchmark.py
+# Offline evaluation + latency benchmark on preprocessed_data/data_splits.pkl
+# One JSON report per run, so backends and optimizations compare on equal terms
+# Depends on: models/loader.py, models/predictor.py, models/quantize.py (paths),
+#             utils/metrics.py
+#
+#   python -m models.benchmark                                  # configured backend
+#   python -m models.benchmark --backend torch onnx --quantize  # several variants
+#   python -m models.benchmark --batch-sizes 1 8 --threads 1 4 --split X_val
+#
+# Report: data/benchmarks/<timestamp>-<backend>[-int8].json
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import numpy as np
+
+from config.constants import (
+    BENCHMARK_DIR, BENCHMARK_BATCH_SIZES, BENCHMARK_BATCHES, MODEL_ACCURACY,
+)
+from models.predictor import predict_emails
+from models.quantize import DATA_SPLITS_PATH, TRAINING_CONFIG_PATH
+from utils.metrics import REGISTRY
+
+_WARMUP_BATCHES = 3
+
+# A percentile is only reported when at least this many timed batches lie
+# above it; with fewer, p99 is just the slowest sample (p99 needs 300 batches)
+_MIN_TAIL_SAMPLES = 3
+
+
+def load_split(split: str = 'X_test') -> tuple[list[str], list[int]]:
+    """Texts and encoded labels of one split ('X_train' | 'X_val' | 'X_test')."""
+    with open(DATA_SPLITS_PATH, 'rb') as f:
+        splits = pickle.load(f)
+    return list(splits[split]), [int(y) for y in splits['y' + split[1:]]]
+
+
+# ─── Accuracy ─────────────────────────────────────────────────────────────────
+
+def evaluate_accuracy(models: dict, texts: list[str], labels: list[int]) -> dict:
+    """
+    Score `models` on a labelled split.
+
+    Returns:
+        dict with keys: n, accuracy, f1_macro, f1_weighted, per_class
+        ({label: precision, recall, f1, support}), confusion (rows = true
+        label, columns = predicted, in `labels` order), labels, baseline
+        (training_config.json values and the deltas from them)
+    """
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+
+    class_names = [str(c) for c in models['label_encoder'].classes_]
+    results     = predict_emails(texts, _uncached(models))
+    predicted   = [r['class_id'] for r in results]
+    class_ids   = list(range(len(class_names)))
+
+    report = classification_report(
+        labels, predicted, labels=class_ids, target_names=class_names,
+        output_dict=True, zero_division=0,
+    )
+    metrics = {
+        'n':           len(texts),
+        'accuracy':    float(accuracy_score(labels, predicted)),
+        'f1_macro':    float(f1_score(labels, predicted, average='macro', zero_division=0)),
+        'f1_weighted': float(f1_score(labels, predicted, average='weighted', zero_division=0)),
+        'per_class':   {
+            name: {
+                'precision': round(report[name]['precision'], 4),
+                'recall':    round(report[name]['recall'], 4),
+                'f1':        round(report[name]['f1-score'], 4),
+                'support':   int(report[name]['support']),
+            }
+            for name in class_names
+        },
+        'labels':      class_names,
+        'confusion':   confusion_matrix(labels, predicted, labels=class_ids).tolist(),
+    }
+
+    try:
+        with open(TRAINING_CONFIG_PATH, 'r', encoding='utf-8') as f:
+            trained = json.load(f)
+        metrics['baseline'] = {
+            'test_accuracy':  trained.get('test_accuracy'),
+            'test_f1_macro':  trained.get('test_f1_macro'),
+            'advertised':     MODEL_ACCURACY,
+            'delta_accuracy': round(metrics['accuracy'] - trained['test_accuracy'], 4),
+            'delta_f1_macro': round(metrics['f1_macro'] - trained['test_f1_macro'], 4),
+        }
+    except (OSError, KeyError, ValueError):
+        metrics['baseline'] = None
+    return metrics
+
+
+# ─── Latency ──────────────────────────────────────────────────────────────────
+
+def measure_latency(
+    models:     dict,
+    texts:      list[str],
+    batch_size: int,
+    batches:    int = BENCHMARK_BATCHES,
+) -> dict:
+    """
+    Time `batches` predict_emails() calls of `batch_size` texts each (the
+    split is cycled if it is shorter), after a few untimed warmup calls.
+    Caches are off, so every call pays for cleaning, tokenizing and the
+    forward pass.
+
+    Returns:
+        dict with keys: batch_size, batches, p50_ms, p95_ms, p99_ms, max_ms,
+        mean_ms (per batch), per_email_ms, emails_per_sec, stages (the
+        utils.metrics breakdown of the timed batches: clean, tokenize, pad, infer).
+        p95_ms / p99_ms are None when `batches` is too small to estimate them
+    """
+    models = _uncached(models)
+    stream = _cycle(texts, batch_size)
+    for _ in range(_WARMUP_BATCHES):
+        predict_emails(next(stream), models, batch_size=batch_size)
+
+    REGISTRY.reset()
+    timings = np.empty(batches, dtype=np.float64)
+    for i in range(batches):
+        batch = next(stream)
+        t0    = time.perf_counter_ns()
+        predict_emails(batch, models, batch_size=batch_size)
+        timings[i] = (time.perf_counter_ns() - t0) / 1e6
+
+    mean = float(timings.mean())
+    return {
+        'batch_size':     batch_size,
+        'batches':        batches,
+        'p50_ms':         _percentile(timings, 50),
+        'p95_ms':         _percentile(timings, 95),
+        'p99_ms':         _percentile(timings, 99),
+        'max_ms':         round(float(timings.max()), 3),
+        'mean_ms':        round(mean, 3),
+        'per_email_ms':   round(mean / batch_size, 3),
+        'emails_per_sec': round(batch_size * 1000 / mean, 1),
+        'stages':         REGISTRY.snapshot(),
+    }
+
+
+@contextmanager
+def with_threads(models: dict, threads: int):
+    """
+    Yield `models` set up to run on `threads` CPU threads. PyTorch
+    changes a process-wide setting, restored on exit so later variants
+    start from the default; ONNX Runtime gets a new session.
+    """
+    if models['backend'] == 'onnx':
+        from models.onnx_backend import OnnxClassifier
+        yield {**models, 'model': OnnxClassifier(models['model'].path, intra_op_threads=threads)}
+        return
+    import torch
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield models
+    finally:
+        torch.set_num_threads(previous)
+
+
+# ─── Run ──────────────────────────────────────────────────────────────────────
+
+def run_benchmark(
+    models:      dict,
+    split:       str       = 'X_test',
+    batch_sizes: list[int] = BENCHMARK_BATCH_SIZES,
+    threads:     list[int] | None = None,
+    batches:     int       = BENCHMARK_BATCHES,
+) -> dict:
+    """
+    Accuracy on `split` plus latency for every batch size × thread count.
+
+    Returns:
+        The report dict (see write_report())
+    """
+    texts, labels = load_split(split)
+    threads       = threads or _default_threads()
+
+    report = {
+        'meta':     _meta(models, split),
+        'accuracy': evaluate_accuracy(models, texts, labels),
+        'latency':  [],
+    }
+    acc = report['accuracy']
+    print(f"[benchmark] {report['meta']['variant']} on {split} ({acc['n']}): "
+          f"accuracy {acc['accuracy']:.4f}  macro-F1 {acc['f1_macro']:.4f}")
+
+    if str(models['device']).startswith('cuda'):
+        threads = [None]                            # thread count is a CPU setting
+    for n_threads in threads:
+        with (with_threads(models, n_threads) if n_threads else nullcontext(models)) as variant:
+            for batch_size in batch_sizes:
+                row = {'threads': n_threads, **measure_latency(variant, texts, batch_size, batches)}
+                report['latency'].append(row)
+                print(f"[benchmark]   threads {str(n_threads):>4}  batch {batch_size:>3}  "
+                      f"p50 {_ms(row['p50_ms'])}  p95 {_ms(row['p95_ms'])}  p99 {_ms(row['p99_ms'])}  "
+                      f"max {_ms(row['max_ms'])} ms  {row['emails_per_sec']:8.1f} emails/s")
+    return report
+
+
+def write_report(report: dict, out_dir: str = BENCHMARK_DIR) -> str:
+    """Save a run_benchmark() report as JSON and return its path."""
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = report['meta']['timestamp'].replace(':', '').replace(' ', '-')
+    path  = os.path.join(out_dir, f"{stamp}-{report['meta']['variant']}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+# ─── Private Helpers ──────────────────────────────────────────────────────────
+
+def _percentile(timings: np.ndarray, q: float) -> float | None:
+    if len(timings) * (100 - q) / 100 < _MIN_TAIL_SAMPLES:
+        return None
+    return round(float(np.percentile(timings, q)), 3)
+
+
+def _ms(value: float | None) -> str:
+    return f"{value:8.2f}" if value is not None else f"{'n/a':>8}"
+
+
+def _uncached(models: dict) -> dict:
+    return {**models, 'cache': None, 'token_cache': None}
+
+
+def _cycle(texts: list[str], batch_size: int):
+    i = 0
+    while True:
+        yield [texts[(i + k) % len(texts)] for k in range(batch_size)]
+        i = (i + batch_size) % len(texts)
+
+
+def _default_threads() -> list[int]:
+    cores = os.cpu_count() or 1
+    return sorted({1, max(1, cores // 2), cores})
+
+
+def _meta(models: dict, split: str) -> dict:
+    variant = models['backend'] + ('-int8' if models.get('quantized') else '')
+    meta = {
+        'timestamp':   datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'variant':     variant,
+        'backend':     models['backend'],
+        'quantized':   bool(models.get('quantized')),
+        'device':      str(models['device']),
+        'fingerprint': models['fingerprint'],
+        'split':       split,
+        'python':      platform.python_version(),
+        'platform':    platform.platform(),
+        'cpu_count':   os.cpu_count(),
+    }
+    for module in ('torch', 'onnxruntime', 'transformers'):
+        try:
+            meta[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return meta
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+if __name__ == '__main__':
+    from config.constants import INFERENCE_BACKEND
+    from models.loader import build_models
+
+    parser = argparse.ArgumentParser(description="Accuracy + latency benchmark on data_splits.pkl")
+    parser.add_argument('--backend',     nargs='+', default=[INFERENCE_BACKEND],
+                        help="torch | onnx | auto (several → one report each)")
+    parser.add_argument('--quantize',    action='store_true', help="also benchmark the INT8 variant")
+    parser.add_argument('--split',       default='X_test', choices=['X_train', 'X_val', 'X_test'])
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=BENCHMARK_BATCH_SIZES)
+    parser.add_argument('--threads',     nargs='+', type=int, default=None)
+    parser.add_argument('--batches',     type=int, default=BENCHMARK_BATCHES,
+                        help="timed batches per configuration")
+    args = parser.parse_args()
+
+    for backend in args.backend:
+        fp32     = build_models(backend, quantize=False)
+        variants = [fp32]
+        if args.quantize:
+            from models.quantize import quantized_variant
+            variants.append(quantized_variant(fp32))
+        for models in variants:
+            report = run_benchmark(models, args.split, args.batch_sizes, args.threads, args.batches)
+            print(f"[benchmark] report → {write_report(report)}")
@@ -0,0 +1,177 @@
+import pathfix  # noqa
+# models/cache.py
+# Bounded LRU cache of prediction results, optionally persisted to disk
+# Keys are a hash of the cleaned email text plus a model fingerprint,
+# so a retrained model never serves stale predictions
+# Depends on: config/constants.py
+
+import atexit
+import hashlib
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config.constants import PREDICTION_CACHE_SAVE_EVERY, PREDICTION_CACHE_SAVE_INTERVAL
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache mapping (cleaned text, model) → result dict.
+
+    Saving rewrites the whole pickle, so callers use maybe_save(): the file
+    is written in a background thread every `save_every` puts or
+    `save_interval` seconds, and once more at exit.
+
+    Args:
+        max_size:      Maximum number of results kept in memory
+        path:          Optional pickle file to load from / save to
+        save_every:    Puts between background saves
+        save_interval: Seconds after which a pending put is saved anyway
+    """
+
+    def __init__(
+        self,
+        max_size:      int   = 2048,
+        path:          str | None = None,
+        save_every:    int   = PREDICTION_CACHE_SAVE_EVERY,
+        save_interval: float = PREDICTION_CACHE_SAVE_INTERVAL,
+    ):
+        self.max_size      = max(1, int(max_size))
+        self.path          = path
+        self.save_every    = max(1, save_every)
+        self.save_interval = save_interval
+        self.hits          = 0
+        self.misses        = 0
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock         = threading.Lock()
+        self._save_lock    = threading.Lock()
+        self._dirty        = False
+        self._unsaved      = 0
+        self._last_save    = time.monotonic()
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def make_key(cleaned_text: str, fingerprint: str) -> str:
+        """Hash the cleaned email text together with the model fingerprint."""
+        h = hashlib.sha256()
+        h.update(fingerprint.encode('utf-8'))
+        h.update(b'\x00')
+        h.update(cleaned_text.encode('utf-8'))
+        return h.hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """Return a copy of the cached result, or None on a miss."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(result)
+
+    def put(self, key: str, result: dict):
+        """Store a result, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._dirty    = True
+            self._unsaved += 1
+
+    def clear(self):
+        """Drop all cached results and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits   = 0
+            self.misses = 0
+            self._dirty = True
+
+    def stats(self) -> dict:
+        """
+        Return cache counters for display.
+
+        Returns:
+            dict with keys: hits, misses, size, max_size, hit_rate_pct
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits':         self.hits,
+                'misses':       self.misses,
+                'size':         len(self._entries),
+                'max_size':     self.max_size,
+                'hit_rate_pct': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            }
+
+    # ─── Persistence ──────────────────────────────────────────────────────────
+
+    def load(self) -> bool:
+        """Load entries from `path`. Returns False if missing or unreadable."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"[cache] load failed: {e}")
+            return False
+        if not isinstance(data, OrderedDict):
+            return False
+        with self._lock:
+            self._entries = data
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._dirty = False
+        return True
+
+    def maybe_save(self) -> bool:
+        """
+        Start a background save if enough puts or time have accumulated.
+        Cheap enough to call after every prediction.
+
+        Returns:
+            True if a save was started
+        """
+        if not self.path or not self._dirty:
+            return False
+        due = (
+            self._unsaved >= self.save_every
+            or time.monotonic() - self._last_save >= self.save_interval
+        )
+        if not due or self._save_lock.locked():
+            return False
+        threading.Thread(target=self.save, name='cache-save', daemon=True).start()
+        return True
+
+    def save(self) -> bool:
+        """Write entries to `path` now if anything changed since the last save."""
+        if not self.path or not self._dirty:
+            return False
+        with self._save_lock:
+            with self._lock:
+                snapshot        = OrderedDict(self._entries)
+                self._dirty     = False
+                self._unsaved   = 0
+                self._last_save = time.monotonic()
+            # Per-writer temp name: every Streamlit process saves the same file
+            tmp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+                return True
+            except Exception as e:
+                print(f"[cache] save failed: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                with self._lock:
+                    self._dirty = True
+                return False
@@ -0,0 +1,144 @@
+import pathfix  # noqa
+# models/client.py
+# Thin HTTP client for models/server.py
+# connect_models() returns a `models` dict with backend 'remote'; predictor.py
+# forwards predict_email()/predict_emails() to it, so the pages are unchanged
+# Depends on: models/server.py (protocol), config/constants.py
+
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from config.constants import INFERENCE_CLIENT_TIMEOUT
+
+
+class InferenceServerError(RuntimeError):
+    """The inference server could not be reached or answered with an error."""
+
+
+class InferenceClient:
+    """
+    Keep-alive connection to the inference server, one per calling thread
+    (Streamlit sessions and the background classifier each get their own).
+
+    Args:
+        url:     Server base URL, e.g. http://127.0.0.1:8765
+        timeout: Seconds to wait for a response
+    """
+
+    def __init__(self, url: str, timeout: float = INFERENCE_CLIENT_TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"expected http://host:port, got {url!r}")
+        self.url     = url
+        self.host    = parts.hostname
+        self.port    = parts.port or 80
+        self.timeout = timeout
+        self._local  = threading.local()
+
+    def health(self) -> dict:
+        """GET /health — backend, device, fingerprint and labels of the server."""
+        return self._request('GET', '/health')
+
+    def predict_emails(self, texts: list[str]) -> list[dict]:
+        """Same contract as models.predictor.predict_emails()."""
+        if not texts:
+            return []
+        body = self._request('POST', '/classify', {'texts': list(texts)})
+        return [_from_json_result(r) for r in body['results']]
+
+    def predict_email(self, text: str) -> dict:
+        """Same contract as models.predictor.predict_email()."""
+        return self.predict_emails([text])[0]
+
+    def _request(self, method: str, path: str, payload: dict | None = None) -> dict:
+        data    = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if data is not None else {}
+
+        status, retry_after, body = self._send(method, path, data, headers)
+        if status == 503:
+            # Queue full — wait as long as the server asks (capped), then try once more.
+            # Jittered, so clients turned away together don't all come back together
+            time.sleep(min(retry_after * random.uniform(1.0, 2.0), self.timeout))
+            status, retry_after, body = self._send(method, path, data, headers)
+
+        try:
+            decoded = json.loads(body)
+        except ValueError:
+            raise InferenceServerError(f"{self.url}{path} returned HTTP {status}, not JSON")
+        if status != 200:
+            raise InferenceServerError(f"{self.url}{path} → HTTP {status}: {decoded.get('error')}")
+        return decoded
+
+    def _send(self, method: str, path: str, data: bytes | None, headers: dict) -> tuple[int, float, bytes]:
+        """One request → (status, Retry-After seconds or 1, body)."""
+        # One retry on a fresh connection: the server may have dropped an idle one
+        for attempt in range(2):
+            conn = self._connection(fresh=attempt > 0)
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                break
+            except (ConnectionError, http.client.HTTPException, OSError) as e:
+                conn.close()
+                if attempt:
+                    raise InferenceServerError(f"{self.url} unreachable: {e}")
+        try:
+            retry_after = max(0.0, float(resp.getheader('Retry-After', 1)))
+        except ValueError:
+            retry_after = 1.0
+        return resp.status, retry_after, body
+
+    def _connection(self, fresh: bool = False) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or fresh:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+
+def connect_models(url: str) -> dict:
+    """
+    Build a `models` dict backed by the inference server at `url`.
+
+    Returns:
+        dict with the same keys as build_models(); 'model' and 'tokenizer'
+        are None, 'client' is the InferenceClient, 'backend' is 'remote'
+        and 'device' is the server's device label
+
+    Raises:
+        InferenceServerError if the server is not reachable
+    """
+    from sklearn.preprocessing import LabelEncoder
+
+    client = InferenceClient(url)
+    health = client.health()
+
+    label_encoder          = LabelEncoder()
+    label_encoder.classes_ = np.array(health['labels'])
+
+    return {
+        'model':         None,
+        'tokenizer':     None,
+        'label_encoder': label_encoder,
+        'device':        health['device'],
+        'backend':       'remote',
+        'fingerprint':   health['fingerprint'],
+        'cache':         None,        # the server keeps the prediction cache
+        'client':        client,
+    }
+
+
+def _from_json_result(result: dict) -> dict:
+    """Server JSON → predict_email()-style dict (probabilities as an ndarray)."""
+    result = dict(result)
+    result['probabilities'] = np.asarray(result['probabilities'], dtype=np.float32)
+    if not result.get('cached'):
+        result.pop('cached', None)
+    return result
@@ -1,16 +1,39 @@
+import pathfix  # noqa
 # model/loader.py
 # Handles MobileBERT model loading and caching
 # Uses st.cache_resource so the model loads once and stays in memory
 
+import hashlib
 import os
 import pickle
+import uuid
+
 import streamlit as st
 
+from config.constants import (
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_PATH, INFERENCE_BACKEND, INFERENCE_QUANTIZE,
+    MODEL_SNAPSHOT, MODEL_MMAP, INFERENCE_SERVER_URL, TOKEN_CACHE_SIZE,
+)
+from models.cache import PredictionCache
+from models.predictor import MAX_LENGTH
+from models.token_cache import TokenCache, tokenizer_fingerprint
+
 # Absolute path to the project root (one level up from this file's config/)
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 MODEL_PATH         = os.path.join(_ROOT, 'models', 'mobilebert')
 LABEL_ENCODER_PATH = os.path.join(_ROOT, 'preprocessed_data', 'label_encoder.pkl')
+SNAPSHOT_PATH      = os.path.join(MODEL_PATH, 'snapshot.pt')
+WEIGHTS_PATH       = os.path.join(MODEL_PATH, 'model.safetensors')
+
+_SNAPSHOT_VERSION = 1
+
+# Files generated from the model (exports, snapshots) — not part of its identity
+_DERIVED_FILES = ('.onnx', 'snapshot.pt', '.tmp')
+
+
+class ModelLoadError(RuntimeError):
+    """Raised by build_models(); load_models() shows it with st.error."""
 
 
 @st.cache_resource(show_spinner=False)
@@ -19,60 +42,307 @@ def load_models():
     Load MobileBERT model, tokenizer, and label encoder.
     Cached — only runs once per session.
 
+    If models/startup.py already started loading in the background, this
+    only waits for that load to finish. With INFERENCE_SERVER_URL set,
+    nothing is loaded here — see models/client.py.
+
     Returns:
-        dict with keys: model, tokenizer, label_encoder, device
+        dict with keys: model, tokenizer, label_encoder, device, backend,
+                        fingerprint, cache, token_cache, from_snapshot
     """
-    import torch
-    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    if INFERENCE_SERVER_URL:
+        from models.client import connect_models, InferenceServerError
+        try:
+            return connect_models(INFERENCE_SERVER_URL)
+        except InferenceServerError as e:
+            st.error(f"❌ Inference server not available: {e}")
+            st.stop()
 
+    from models.startup import preload_models
+    try:
+        return preload_models().result()
+    except ModelLoadError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+
+
+def build_models(
+    backend:      str  = INFERENCE_BACKEND,
+    quantize:     bool = INFERENCE_QUANTIZE,
+    use_snapshot: bool = MODEL_SNAPSHOT,
+) -> dict:
+    """
+    Uncached body of load_models(), also used by offline scripts and the
+    background preload. Raises ModelLoadError instead of touching the UI.
+
+    Args:
+        backend:      'torch' | 'onnx' | 'auto' (ONNX Runtime on CPU when an
+                      exported model and onnxruntime are both available)
+        quantize:     Try the INT8 variant (kept only if it passes the
+                      accuracy guardrail in models/quantize.py)
+        use_snapshot: PyTorch only — load model + tokenizer from
+                      SNAPSHOT_PATH when it matches the files on disk
+
+    Returns:
+        The `models` dict. For the ONNX backend 'model' is an
+        OnnxClassifier and 'device' is 'cpu'; predictor.py handles both.
+    """
     # ── Label encoder ──────────────────────────────────────────────────────
     try:
         with open(LABEL_ENCODER_PATH, 'rb') as f:
             label_encoder = pickle.load(f)
     except FileNotFoundError:
-        st.error(f"❌ label_encoder.pkl not found at: {LABEL_ENCODER_PATH}")
-        st.stop()
+        raise ModelLoadError(f"label_encoder.pkl not found at: {LABEL_ENCODER_PATH}")
     except Exception as e:
-        st.error(f"❌ Failed to load label encoder: {e}")
-        st.stop()
+        raise ModelLoadError(f"Failed to load label encoder: {e}")
 
-    # ── Device ─────────────────────────────────────────────────────────────
-    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    num_labels = len(label_encoder.classes_)
+    backend     = _resolve_backend(backend)
+    fingerprint = model_fingerprint(label_encoder)
+    snapshot    = None
 
     # ── Model ──────────────────────────────────────────────────────────────
-    try:
-        model = AutoModelForSequenceClassification.from_pretrained(
-            MODEL_PATH,
-            num_labels=num_labels,
-            ignore_mismatched_sizes=True
-        )
-        model.to(device)
-        model.eval()
-    except Exception as e:
-        st.error(f"❌ Failed to load MobileBERT model from {MODEL_PATH}: {e}")
-        st.stop()
+    if backend == 'onnx':
+        from models.onnx_backend import OnnxClassifier, ONNX_MODEL_PATH
+        try:
+            model  = OnnxClassifier(ONNX_MODEL_PATH)
+            device = 'cpu'
+        except Exception as e:
+            raise ModelLoadError(f"Failed to load ONNX model from {ONNX_MODEL_PATH}: {e}")
+    else:
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        device     = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        num_labels = len(label_encoder.classes_)
+        snapshot   = _load_snapshot(fingerprint) if use_snapshot else None
+        try:
+            if snapshot is not None:
+                model = snapshot['model']
+            elif MODEL_MMAP and device.type == 'cpu':
+                model = _load_mmap(num_labels)
+            else:
+                model = None
+            if model is None:
+                model = AutoModelForSequenceClassification.from_pretrained(
+                    MODEL_PATH,
+                    num_labels=num_labels,
+                    ignore_mismatched_sizes=True
+                )
+            model.to(device)
+            model.eval()
+        except Exception as e:
+            raise ModelLoadError(f"Failed to load MobileBERT model from {MODEL_PATH}: {e}")
 
     # ── Tokenizer ──────────────────────────────────────────────────────────
-    try:
-        tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-    except Exception as e:
-        st.error(f"❌ Failed to load tokenizer from {MODEL_PATH}: {e}")
-        st.stop()
+    if snapshot is not None:
+        tokenizer = snapshot['tokenizer']
+    else:
+        from transformers import AutoTokenizer
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
+        except Exception as e:
+            raise ModelLoadError(f"Failed to load tokenizer from {MODEL_PATH}: {e}")
 
-    return {
+    # ── Token + prediction caches ──────────────────────────────────────────
+    token_cache = TokenCache(
+        TOKEN_CACHE_SIZE, MAX_LENGTH, tokenizer_fingerprint(MODEL_PATH, MAX_LENGTH), len(tokenizer)
+    )
+    token_cache.load_stores()
+    cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_PATH)
+
+    models = {
         'model':         model,
         'tokenizer':     tokenizer,
         'label_encoder': label_encoder,
         'device':        device,
+        'backend':       backend,
+        'fingerprint':   fingerprint,
+        'cache':         cache,
+        'token_cache':   token_cache,
+        'from_snapshot': snapshot is not None,
     }
 
+    if quantize:
+        from models.quantize import maybe_quantize
+        models = maybe_quantize(models)
+    return models
+
+
+# ─── Snapshot ─────────────────────────────────────────────────────────────────
+# The fp32 PyTorch module and tokenizer pickled together with torch.save.
+# Loading it with mmap skips from_pretrained's config parsing, module
+# construction, weight initialisation and copy, and the tokenizer build.
+# The pickle references torch/transformers classes by name, so it is only
+# reused by the exact library versions that wrote it.
+
+def _snapshot_key(fingerprint: str) -> dict:
+    """Everything a snapshot must match to be loaded instead of the model files."""
+    import torch
+    import transformers
+    return {
+        'version':      _SNAPSHOT_VERSION,
+        'fingerprint':  fingerprint,
+        'torch':        torch.__version__,
+        'transformers': transformers.__version__,
+    }
+
+
+def save_snapshot(models: dict) -> bool:
+    """
+    Write SNAPSHOT_PATH from a freshly loaded PyTorch `models` dict.
+    Does nothing for ONNX, quantized or snapshot-loaded models.
+
+    Returns:
+        True if a snapshot was written
+    """
+    if (models.get('backend') != 'torch' or models.get('quantized')
+            or models.get('from_snapshot')):
+        return False
+    import torch
+    tmp = None
+    try:
+        model = models['model']
+        if str(models['device']) != 'cpu':
+            import copy
+            model = copy.deepcopy(model).to('cpu')
+        # Per-writer temp name: several processes may cold-start at once
+        tmp = f"{SNAPSHOT_PATH}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        torch.save({
+            **_snapshot_key(models['fingerprint']),
+            'model':     model,
+            'tokenizer': models['tokenizer'],
+        }, tmp)
+        os.replace(tmp, SNAPSHOT_PATH)
+        print(f"[loader] snapshot written → {SNAPSHOT_PATH}")
+        return True
+    except Exception as e:
+        print(f"[loader] snapshot save failed: {e}")
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+
+
+def _load_snapshot(fingerprint: str) -> dict | None:
+    """Return the snapshot dict if it exists and matches `fingerprint`."""
+    if not os.path.exists(SNAPSHOT_PATH):
+        return None
+    import torch
+    try:
+        # Our own artifact: a full module pickle, so weights_only must be off
+        snap = torch.load(SNAPSHOT_PATH, mmap=True, weights_only=False, map_location='cpu')
+    except Exception as e:
+        print(f"[loader] snapshot unreadable, ignoring: {e}")
+        return None
+    key = _snapshot_key(fingerprint)
+    if any(snap.get(k) != v for k, v in key.items()):
+        print("[loader] snapshot is stale, ignoring")
+        return None
+    return snap
+
+
+# ─── Memory-mapped weights ────────────────────────────────────────────────────
+# safetensors maps model.safetensors read-only; if the module's parameters
+# are those mapped tensors (not copies), every Streamlit process on the host
+# shares one copy of the weights through the OS page cache. The snapshot
+# above is loaded with torch.load(mmap=True) and is shared the same way.
+# See utils/memory.py to check what a process actually holds privately.
+
+def _load_mmap(num_labels: int):
+    """
+    Build the classifier with every tensor on the meta device, then assign
+    the memory-mapped tensors from WEIGHTS_PATH in place of its parameters.
+
+    Returns:
+        The model, or None (caller falls back to from_pretrained) if there
+        is no safetensors file or the checkpoint doesn't cover every parameter
+    """
+    if not os.path.exists(WEIGHTS_PATH):
+        return None
+    import torch
+    from safetensors.torch import load_file
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    config = AutoConfig.from_pretrained(MODEL_PATH, num_labels=num_labels)
+    # torch.device() is a thread-local default: other threads building
+    # modules meanwhile (preload, reclassify, benchmark) are unaffected
+    with torch.device('meta'):
+        model = AutoModelForSequenceClassification.from_config(config)
+    _materialize_buffers(model)
+
+    weights = load_file(WEIGHTS_PATH)       # mmap-backed CPU tensors
+    own     = model.state_dict()
+    weights = {k: v for k, v in weights.items() if k in own and v.shape == own[k].shape}
+    model.load_state_dict(weights, strict=False, assign=True)
+    model.tie_weights()
+
+    missing = [n for n, t in (*model.named_parameters(), *model.named_buffers()) if t.is_meta]
+    if missing:
+        print(f"[loader] mmap load skipped — {len(missing)} tensors not in checkpoint (e.g. {missing[0]})")
+        return None
+    return model
+
+
+def _materialize_buffers(model):
+    """
+    Give meta buffers real CPU storage and let the model's own
+    _init_weights() fill them (e.g. the non-persistent position_ids,
+    which no checkpoint contains). Runs while the parameters are still
+    on meta, so initialising them as a side effect costs nothing and
+    never touches the mapped weights.
+    """
+    import torch
+
+    for module in model.modules():
+        meta = [name for name, buf in module._buffers.items() if buf is not None and buf.is_meta]
+        if not meta:
+            continue
+        for name in meta:
+            module._buffers[name] = torch.zeros_like(module._buffers[name], device='cpu')
+        model._init_weights(module)
+
+
+def _resolve_backend(backend: str) -> str:
+    """Turn 'auto' into 'onnx' or 'torch'; ONNX is only chosen for CPU hosts."""
+    if backend != 'auto':
+        return backend
+    from models.onnx_backend import onnx_available
+    if not onnx_available():
+        return 'torch'
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return 'torch'
+    except ImportError:
+        pass
+    return 'onnx'
+
+
+def model_fingerprint(label_encoder) -> str:
+    """
+    Short hash identifying the model on disk and its label set.
+    Changes whenever any file in models/mobilebert is replaced;
+    files derived from the model (ONNX exports, the snapshot) are skipped.
+    """
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(MODEL_PATH)):
+        if name.endswith(_DERIVED_FILES):
+            continue
+        stat = os.stat(os.path.join(MODEL_PATH, name))
+        h.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+    h.update('|'.join(map(str, label_encoder.classes_)).encode('utf-8'))
+    return h.hexdigest()[:16]
+
 
 def get_device_label(models: dict) -> str:
     """Return a clean device string for display — e.g. 'CPU' or 'CUDA (GPU)'."""
     device = str(models['device'])
+    suffix = ' · INT8' if models.get('quantized') else ''
+    if models.get('backend') == 'remote':
+        return f'{device} · server'
+    if models.get('backend') == 'onnx':
+        return f'CPU (ONNX Runtime){suffix}'
     if device == 'cpu':
-        return 'CPU'
+        return f'CPU{suffix}'
     elif device.startswith('cuda'):
         return 'CUDA (GPU)'
     return device.upper()
@@ -85,4 +355,10 @@ def get_num_labels(models: dict) -> int:
 
 def get_class_labels(models: dict) -> list:
     """Return the list of class label names from the label encoder."""
-    return list(models['label_encoder'].classes_)
\ No newline at end of file
+    return list(models['label_encoder'].classes_)
+
+
+def get_cache_stats(models: dict) -> dict | None:
+    """Return prediction cache counters, or None if caching is disabled."""
+    cache = models.get('cache')
+    return cache.stats() if cache is not None else None
\ No newline at end of file
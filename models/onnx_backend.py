@@ -0,0 +1,218 @@
+import pathfix  # noqa
+# models/onnx_backend.py
+# ONNX export of models/mobilebert and an ONNX Runtime inference backend
+# Selected by load_models() when INFERENCE_BACKEND allows it (see config/constants.py)
+# Depends on: models/loader.py, models/predictor.py
+#
+#   python -m models.onnx_backend export   # write models/mobilebert/model.onnx
+#   python -m models.onnx_backend check    # parity + latency vs PyTorch on X_test
+#   (parity itself is enforced by tests/test_onnx_backend.py on a tiny model)
+
+import os
+import uuid
+
+import numpy as np
+
+from config.constants import ONNX_INTRA_OP_THREADS
+from models.loader import MODEL_PATH
+
+ONNX_MODEL_PATH = os.path.join(MODEL_PATH, 'model.onnx')
+MODEL_INPUTS    = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+def onnx_available() -> bool:
+    """True if onnxruntime is installed and an exported model exists."""
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return False
+    return os.path.exists(ONNX_MODEL_PATH)
+
+
+# ─── Export ───────────────────────────────────────────────────────────────────
+
+def export_onnx(
+    num_labels: int,
+    out_path:   str = ONNX_MODEL_PATH,
+    opset:      int = 17,
+    model_path: str = MODEL_PATH,
+) -> str:
+    """
+    Export the fine-tuned MobileBERT to ONNX with dynamic batch/sequence axes.
+
+    Args:
+        num_labels: Number of output classes (len(label_encoder.classes_))
+        out_path:   Destination .onnx file
+        opset:      ONNX opset version
+        model_path: from_pretrained() directory to export
+
+    Returns:
+        Path of the written model
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_path,
+        num_labels=num_labels,
+        ignore_mismatched_sizes=True
+    )
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    dummy     = tokenizer(
+        ["export sample", "a second, longer export sample"],
+        padding='longest',
+        return_token_type_ids=True,
+        return_tensors='pt',
+    )
+
+    tmp = _tmp_path(out_path)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[k] for k in MODEL_INPUTS),
+            tmp,
+            input_names=list(MODEL_INPUTS),
+            output_names=['logits'],
+            dynamic_axes={
+                **{k: {0: 'batch', 1: 'sequence'} for k in MODEL_INPUTS},
+                'logits': {0: 'batch'},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+            dynamo=False,            # TorchScript exporter: honours dynamic_axes
+        )
+    os.replace(tmp, out_path)
+
+    # Drop a stale optimized graph so the next session re-optimizes
+    optimized = _optimized_path(out_path)
+    if os.path.exists(optimized):
+        os.remove(optimized)
+
+    print(f"[onnx_backend] exported → {out_path}")
+    return out_path
+
+
+# ─── Runtime ──────────────────────────────────────────────────────────────────
+
+class OnnxClassifier:
+    """
+    ONNX Runtime session with the predictor's calling convention.
+
+    The first load runs the graph optimizations (constant folding,
+    attention/GELU/LayerNorm fusion) and saves the result next to the
+    model as model.opt.onnx. Later loads start from that file and only
+    re-apply the hardware-specific layout passes. The file is written
+    under a per-process temp name and renamed into place, so processes
+    starting together never open a half-written graph.
+
+    Args:
+        path:             Exported .onnx file
+        intra_op_threads: Threads per operator; 0 lets ONNX Runtime use
+                          one per physical core
+        inter_op_threads: Threads across independent operators
+    """
+
+    def __init__(
+        self,
+        path:             str = ONNX_MODEL_PATH,
+        intra_op_threads: int = ONNX_INTRA_OP_THREADS,
+        inter_op_threads: int = 1,
+    ):
+        import onnxruntime as ort
+
+        optimized = _optimized_path(path)
+        if not os.path.exists(optimized) or os.path.getmtime(optimized) < os.path.getmtime(path):
+            # Persist the portable (EXTENDED) optimizations once; the
+            # hardware-specific layout passes are re-applied per session
+            tmp  = _tmp_path(optimized)
+            save = ort.SessionOptions()
+            save.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+            save.optimized_model_filepath = tmp
+            try:
+                ort.InferenceSession(path, save, providers=['CPUExecutionProvider'])
+                os.replace(tmp, optimized)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode           = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.intra_op_num_threads     = intra_op_threads
+        opts.inter_op_num_threads     = inter_op_threads
+
+        self.path    = path
+        self.session = ort.InferenceSession(optimized, opts, providers=['CPUExecutionProvider'])
+        self.inputs  = [i.name for i in self.session.get_inputs()]
+
+    def predict_proba(self, encoding) -> np.ndarray:
+        """
+        Softmax probabilities for one tokenized batch.
+
+        Args:
+            encoding: Tokenizer output (dict-like of int arrays, batch first)
+
+        Returns:
+            float32 array of shape (batch, num_labels)
+        """
+        feeds  = {name: np.asarray(encoding[name], dtype=np.int64) for name in self.inputs}
+        logits = self.session.run(['logits'], feeds)[0]
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp    = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _optimized_path(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.opt{ext}"
+
+
+def _tmp_path(path: str) -> str:
+    """Unique sibling temp name; ONNX Runtime writes ONNX (not ORT format) for it."""
+    return f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+
+
+# ─── CLI: export / parity + latency check ─────────────────────────────────────
+
+if __name__ == '__main__':
+    import pickle
+    import sys
+    import time
+
+    from models.loader import build_models, LABEL_ENCODER_PATH, _ROOT
+    from models.predictor import predict_email, predict_emails
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+
+    if command == 'export':
+        with open(LABEL_ENCODER_PATH, 'rb') as f:
+            export_onnx(len(pickle.load(f).classes_))
+        sys.exit(0)
+
+    with open(os.path.join(_ROOT, 'preprocessed_data', 'data_splits.pkl'), 'rb') as f:
+        x_test = list(pickle.load(f)['X_test'])
+
+    torch_models = {**build_models('torch', quantize=False), 'cache': None}
+    onnx_models  = {**build_models('onnx',  quantize=False), 'cache': None}
+
+    def _timed(fn):
+        t0  = time.perf_counter()
+        out = fn()
+        return out, (time.perf_counter() - t0) * 1000 / len(x_test)
+
+    ref, t_batch_pt = _timed(lambda: predict_emails(x_test, torch_models))
+    got, t_batch_ox = _timed(lambda: predict_emails(x_test, onnx_models))
+    _,   t_one_pt   = _timed(lambda: [predict_email(t, torch_models) for t in x_test])
+    _,   t_one_ox   = _timed(lambda: [predict_email(t, onnx_models) for t in x_test])
+
+    max_diff = max(float(np.abs(a['probabilities'] - b['probabilities']).max()) for a, b in zip(ref, got))
+    agree    = sum(a['class_id'] == b['class_id'] for a, b in zip(ref, got))
+
+    print(f"[onnx_backend] X_test: {len(x_test)} emails")
+    print(f"[onnx_backend] argmax agreement: {agree}/{len(x_test)}  max |Δp|: {max_diff:.2e}")
+    print(f"[onnx_backend] single  ms/email: torch {t_one_pt:6.2f}  onnx {t_one_ox:6.2f}")
+    print(f"[onnx_backend] batched ms/email: torch {t_batch_pt:6.2f}  onnx {t_batch_ox:6.2f}")
+
+    if agree != len(x_test) or max_diff > 1e-4:
+        sys.exit("[onnx_backend] parity check FAILED")
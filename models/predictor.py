@@ -1,47 +1,29 @@
+import pathfix  # noqa
 # model/predictor.py
 # Handles text cleaning and email classification inference
-# Depends on: model/loader.py
+# Depends on: model/loader.py, models/token_cache.py, utils/text_normalizer.py,
+#             utils/metrics.py
 
-import re
 import time
 import numpy as np
 
+from models.token_cache import tokenize
+from utils.metrics import span
+from utils.text_normalizer import clean_text
 
-def clean_text(text: str) -> str:
-    """
-    Clean and normalize raw email text before tokenization.
-
-    Steps:
-        - Lowercase
-        - Remove email addresses
-        - Remove URLs
-        - Strip HTML tags
-        - Collapse whitespace
+# Token limit used at training time (training_config.json → max_length)
+MAX_LENGTH = 128
 
-    Args:
-        text: Raw email string
 
-    Returns:
-        Cleaned string
-    """
-    if not text:
-        return ""
-    text = str(text).lower()
-    text = re.sub(r'\S+@\S+', '', text)           # remove emails
-    text = re.sub(r'http\S+|www\S+', '', text)     # remove URLs
-    text = re.sub(r'<.*?>', '', text)              # strip HTML tags
-    text = re.sub(r'[^\w\s.,!?]', ' ', text)      # remove special chars
-    text = re.sub(r'\s+', ' ', text).strip()       # collapse whitespace
-    return text
-
-
-def predict_email(text: str, models: dict) -> dict:
+def predict_email(text: str, models: dict, dynamic_padding: bool = True) -> dict:
     """
     Run MobileBERT inference on an email string.
 
     Args:
-        text:   Raw email text (subject + body combined)
-        models: Dict returned by load_models()
+        text:            Raw email text (subject + body combined)
+        models:          Dict returned by load_models()
+        dynamic_padding: If True, skip padding entirely (single item);
+                         if False, pad to MAX_LENGTH as during training
 
     Returns:
         dict with keys:
@@ -51,46 +33,42 @@ def predict_email(text: str, models: dict) -> dict:
             - class_id      (int)   predicted class index
             - elapsed_ms    (str)   inference time in milliseconds
             - all_labels    (list)  ordered list of all class names
+            - cached        (bool)  only present, and True, on a cache hit
     """
-    import torch
+    if models.get('backend') == 'remote':
+        return models['client'].predict_email(text)
 
-    cleaned = clean_text(text)
+    with span('clean'):
+        cleaned = clean_text(text)
 
-    # ── Tokenize ───────────────────────────────────────────────────────────
-    encoding = models['tokenizer'](
-        cleaned,
-        add_special_tokens=True,
-        max_length=128,
-        padding='max_length',
-        truncation=True,
-        return_attention_mask=True,
-        return_token_type_ids=True,
-        return_tensors='pt'
-    )
+    # ── Cache lookup ───────────────────────────────────────────────────────
+    cache = models.get('cache')
+    if cache is not None:
+        cache_key = cache.make_key(cleaned, models.get('fingerprint', ''))
+        cached    = cache.get(cache_key)
+        if cached is not None:
+            return {**cached, 'elapsed_ms': '0', 'cached': True}
 
-    input_ids      = encoding['input_ids'].to(models['device'])
-    attention_mask = encoding['attention_mask'].to(models['device'])
-    token_type_ids = encoding['token_type_ids'].to(models['device'])
+    # ── Tokenize ───────────────────────────────────────────────────────────
+    with span('tokenize'):
+        token_ids = _encode([cleaned], models)
+    with span('pad'):
+        encoding = _pad(token_ids, models['tokenizer'], dynamic_padding)
 
     # ── Inference ──────────────────────────────────────────────────────────
-    t0 = time.time()
-    with torch.no_grad():
-        outputs = models['model'](
-            input_ids=input_ids,
-            attention_mask=attention_mask,
-            token_type_ids=token_type_ids
-        )
-        probs = torch.softmax(outputs.logits, dim=1)
-        pred  = torch.argmax(probs, dim=1).item()
-    elapsed_ms = f"{(time.time() - t0) * 1000:.0f}"
+    t0 = time.perf_counter_ns()
+    with span('infer'):
+        probs = _forward(encoding, models)
+    pred  = int(probs[0].argmax())
+    elapsed_ms = f"{(time.perf_counter_ns() - t0) / 1e6:.0f}"
 
     # ── Extract results ────────────────────────────────────────────────────
-    confidence  = float(probs[0][pred].item())
-    all_probs   = probs[0].cpu().numpy()
+    confidence  = float(probs[0][pred])
+    all_probs   = probs[0]
     all_labels  = list(models['label_encoder'].classes_)
     label       = models['label_encoder'].inverse_transform([pred])[0]
 
-    return {
+    result = {
         'category':      label,
         'confidence':    confidence,
         'probabilities': all_probs,
@@ -99,6 +77,188 @@ def predict_email(text: str, models: dict) -> dict:
         'all_labels':    all_labels,
     }
 
+    if cache is not None:
+        cache.put(cache_key, result)
+        cache.maybe_save()
+
+    return result
+
+
+def predict_emails(
+    texts:           list[str],
+    models:          dict,
+    batch_size:      int  = 16,
+    dynamic_padding: bool = True,
+) -> list[dict]:
+    """
+    Run MobileBERT inference on many emails, one forward pass per batch.
+
+    Tokenization, device transfer and the model call are paid once per
+    batch instead of once per email, which is much faster on CPU than
+    calling predict_email() in a loop.
+
+    With dynamic padding, emails are sorted by token length before
+    batching and each batch is padded only to its own longest email, so
+    short emails are never run through 128 positions of padding.
+
+    If `models` carries a prediction cache, cached texts are answered
+    without touching the model and only the misses are batched.
+
+    Args:
+        texts:           Raw email strings (subject + body combined)
+        models:          Dict returned by load_models()
+        batch_size:      Maximum number of emails per forward pass
+        dynamic_padding: If True, bucket by length and pad per batch;
+                         if False, pad every email to MAX_LENGTH
+
+    Returns:
+        List of result dicts in the same order as `texts`, with the same
+        keys as predict_email(). `elapsed_ms` is the batch inference time
+        divided evenly across the emails in that batch.
+    """
+    if not texts:
+        return []
+    if models.get('backend') == 'remote':
+        return models['client'].predict_emails(texts)
+
+    with span('clean', items=len(texts)):
+        cleaned = [clean_text(t) for t in texts]
+    results: list[dict | None] = [None] * len(texts)
+
+    # ── Cache lookup ───────────────────────────────────────────────────────
+    # Identical texts in one call are scored once and fanned out afterwards
+    cache   = models.get('cache')
+    pending: dict[str, list[int]] = {}
+    for i, text in enumerate(cleaned):
+        key = cache.make_key(text, models.get('fingerprint', '')) if cache is not None else text
+        if key in pending:
+            pending[key].append(i)
+            continue
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[i] = {**cached, 'elapsed_ms': '0', 'cached': True}
+        else:
+            pending[key] = [i]
+
+    # ── Inference on misses ────────────────────────────────────────────────
+    keys   = list(pending)
+    scored = _predict_cleaned(
+        [cleaned[pending[k][0]] for k in keys], models, batch_size, dynamic_padding
+    )
+    for key, result in zip(keys, scored):
+        for i in pending[key]:
+            results[i] = result if i == pending[key][0] else dict(result)
+        if cache is not None:
+            cache.put(key, result)
+
+    if cache is not None and keys:
+        cache.maybe_save()
+
+    return results
+
+
+def _predict_cleaned(
+    cleaned:         list[str],
+    models:          dict,
+    batch_size:      int,
+    dynamic_padding: bool,
+) -> list[dict]:
+    """Batched forward passes over already-cleaned texts (see predict_emails)."""
+    if not cleaned:
+        return []
+
+    tokenizer  = models['tokenizer']
+    all_labels = list(models['label_encoder'].classes_)
+    batch_size = max(1, batch_size)
+
+    # ── Tokenize (unpadded) ────────────────────────────────────────────────
+    with span('tokenize', items=len(cleaned)):
+        token_ids = _encode(cleaned, models)
+
+    # Shortest first, so every batch holds emails of similar length
+    order = list(range(len(cleaned)))
+    if dynamic_padding:
+        order.sort(key=lambda i: len(token_ids[i]))
+
+    results: list[dict | None] = [None] * len(cleaned)
+
+    for start in range(0, len(order), batch_size):
+        batch_idx = order[start:start + batch_size]
+        with span('pad', items=len(batch_idx)):
+            encoding = _pad([token_ids[i] for i in batch_idx], tokenizer, dynamic_padding)
+
+        # ── Inference ──────────────────────────────────────────────────────
+        t0 = time.perf_counter_ns()
+        with span('infer', items=len(batch_idx)):
+            batch_probs = _forward(encoding, models)
+        elapsed_ms  = f"{(time.perf_counter_ns() - t0) / 1e6 / len(batch_idx):.0f}"
+
+        # ── Extract results ────────────────────────────────────────────────
+        preds       = batch_probs.argmax(axis=1)
+        labels      = models['label_encoder'].inverse_transform(preds)
+
+        for i, row, pred, label in zip(batch_idx, batch_probs, preds, labels):
+            results[i] = {
+                'category':      label,
+                'confidence':    float(row[pred]),
+                'probabilities': row,
+                'class_id':      int(pred),
+                'elapsed_ms':    elapsed_ms,
+                'all_labels':    all_labels,
+            }
+
+    return results
+
+
+def _encode(cleaned: list[str], models: dict) -> list[np.ndarray]:
+    """Unpadded token ids per text, through the token cache when there is one."""
+    token_cache = models.get('token_cache')
+    if token_cache is not None:
+        return token_cache.encode(cleaned, models['tokenizer'])
+    return tokenize(cleaned, models['tokenizer'], MAX_LENGTH, np.int64)
+
+
+def _pad(token_ids: list[np.ndarray], tokenizer, dynamic_padding: bool) -> dict:
+    """
+    Pad one batch of id arrays into model inputs — the same arrays
+    tokenizer.pad() returns for single-sequence BERT input, without its
+    per-item Python overhead.
+
+    Returns:
+        dict of int64 arrays: input_ids, attention_mask, token_type_ids
+    """
+    width     = max(len(ids) for ids in token_ids) if dynamic_padding else MAX_LENGTH
+    input_ids = np.full((len(token_ids), width), tokenizer.pad_token_id, dtype=np.int64)
+    mask      = np.zeros((len(token_ids), width), dtype=np.int64)
+    left      = tokenizer.padding_side == 'left'
+    for row, ids in enumerate(token_ids):
+        cols = slice(width - len(ids), width) if left else slice(0, len(ids))
+        input_ids[row, cols] = ids
+        mask[row, cols]      = 1
+    return {
+        'input_ids':      input_ids,
+        'attention_mask': mask,
+        'token_type_ids': np.zeros_like(input_ids),
+    }
+
+
+def _forward(encoding, models: dict) -> np.ndarray:
+    """
+    Softmax probabilities for one tokenized batch (NumPy arrays in,
+    NumPy out) on whichever backend load_models() picked.
+    """
+    if models.get('backend') == 'onnx':
+        return models['model'].predict_proba(encoding)
+
+    import torch
+    inputs = {
+        key: torch.as_tensor(encoding[key]).to(models['device'])
+        for key in ('input_ids', 'attention_mask', 'token_type_ids')
+    }
+    with torch.no_grad():
+        logits = models['model'](**inputs).logits
+        return torch.softmax(logits, dim=1).cpu().numpy()
+
 
 def build_probability_table(result: dict) -> list[dict]:
     """
@@ -0,0 +1,252 @@
+import pathfix  # noqa
+# models/quantize.py
+# Dynamic INT8 quantization of MobileBERT, gated by an accuracy check
+# Enabled with INFERENCE_QUANTIZE in config/constants.py
+# The check scores fp32 and INT8 through the same predict_emails() path on
+# the same split, so only the quantization itself can cost accuracy
+# Depends on: models/loader.py, models/predictor.py, models/onnx_backend.py
+#
+#   python -m models.quantize    # evaluate fp32 vs int8 on X_test and print the verdict
+
+import json
+import os
+import pickle
+import time
+
+from config.constants import QUANTIZE_MAX_DROP, QUANTIZE_REPORT_PATH
+from models.loader import MODEL_PATH, _ROOT
+
+TRAINING_CONFIG_PATH = os.path.join(MODEL_PATH, 'training_config.json')
+DATA_SPLITS_PATH     = os.path.join(_ROOT, 'preprocessed_data', 'data_splits.pkl')
+
+
+# ─── Quantize ─────────────────────────────────────────────────────────────────
+
+def quantize_torch(model):
+    """
+    Dynamic INT8 quantization of every nn.Linear (weights stored as int8,
+    activations quantized on the fly). CPU only.
+
+    Returns:
+        A new quantized module; `model` is left untouched
+    """
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_onnx(fp32_path: str) -> str:
+    """
+    Write an INT8 copy of an exported ONNX model next to it (model.int8.onnx),
+    reusing the file if it is newer than the source.
+
+    Returns:
+        Path of the quantized model
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    root, ext = os.path.splitext(fp32_path)
+    int8_path = f"{root}.int8{ext}"
+    if not os.path.exists(int8_path) or os.path.getmtime(int8_path) < os.path.getmtime(fp32_path):
+        from models.onnx_backend import _tmp_path
+        tmp = _tmp_path(int8_path)     # processes starting together must not share a file
+        try:
+            quantize_dynamic(fp32_path, tmp, weight_type=QuantType.QInt8)
+            os.replace(tmp, int8_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        print(f"[quantize] wrote {int8_path}")
+    return int8_path
+
+
+def quantized_variant(models: dict) -> dict:
+    """
+    Build the INT8 counterpart of a `models` dict from load_models().
+
+    Returns:
+        New dict with the quantized model, 'quantized': True and a
+        fingerprint suffix so cached fp32 predictions are not reused
+    """
+    if models.get('backend') == 'onnx':
+        from models.onnx_backend import OnnxClassifier
+        model = OnnxClassifier(quantize_onnx(models['model'].path))
+    else:
+        model = quantize_torch(models['model'])
+    return {
+        **models,
+        'model':       model,
+        'quantized':   True,
+        'fingerprint': f"{models.get('fingerprint', '')}:int8",
+    }
+
+
+# ─── Evaluate ─────────────────────────────────────────────────────────────────
+
+def load_test_split() -> tuple[list[str], list[int]]:
+    """(X_test, y_test) from DATA_SPLITS_PATH."""
+    with open(DATA_SPLITS_PATH, 'rb') as f:
+        splits = pickle.load(f)
+    return list(splits['X_test']), list(splits['y_test'])
+
+
+def evaluate(models: dict, x_test: list[str], y_test: list[int]) -> dict:
+    """
+    Score a `models` dict on a labelled split.
+
+    Returns:
+        dict with keys: accuracy, f1_macro, f1_weighted, n, correct,
+                        ms_per_email, y_pred
+    """
+    from sklearn.metrics import accuracy_score, f1_score
+    from models.predictor import predict_emails
+
+    t0      = time.perf_counter()
+    results = predict_emails(x_test, {**models, 'cache': None})
+    elapsed = time.perf_counter() - t0
+    y_pred  = [int(r['class_id']) for r in results]
+
+    return {
+        'accuracy':     float(accuracy_score(y_test, y_pred)),
+        'f1_macro':     float(f1_score(y_test, y_pred, average='macro')),
+        'f1_weighted':  float(f1_score(y_test, y_pred, average='weighted')),
+        'n':            len(x_test),
+        'correct':      sum(int(p == y) for p, y in zip(y_pred, y_test)),
+        'ms_per_email': round(elapsed * 1000 / max(1, len(x_test)), 2),
+        'y_pred':       y_pred,
+    }
+
+
+def compare(fp32: dict, int8: dict, x_test: list[str], y_test: list[int]) -> dict:
+    """
+    Evaluate both variants on the same split in the same run.
+
+    Returns:
+        dict with keys: fp32, int8 (evaluate() results without y_pred),
+                        n, agreement (fraction of identical predictions),
+                        flips (emails whose prediction changed)
+    """
+    base  = evaluate(fp32, x_test, y_test)
+    quant = evaluate(int8, x_test, y_test)
+    flips = sum(a != b for a, b in zip(base.pop('y_pred'), quant.pop('y_pred')))
+    n     = len(x_test)
+    return {
+        'fp32':      base,
+        'int8':      quant,
+        'n':         n,
+        'agreement': round(1 - flips / n, 4) if n else 1.0,
+        'flips':     flips,
+    }
+
+
+def allowed_samples(n: int, max_drop: float = QUANTIZE_MAX_DROP) -> int:
+    """
+    `max_drop` as a number of test emails, never below one: on a 67-email
+    split a single flip is already a 0.0149 accuracy change.
+    """
+    return max(1, int(max_drop * n))
+
+
+def check_guardrail(comparison: dict, max_drop: float = QUANTIZE_MAX_DROP) -> tuple[bool, str]:
+    """
+    Judge a compare() result. INT8 passes if it gets at most
+    allowed_samples() fewer test emails right than fp32, and macro-F1
+    drops by no more than the same number of emails as a fraction of n.
+
+    Returns:
+        (passed, human-readable reason)
+    """
+    base, quant, n = comparison['fp32'], comparison['int8'], comparison['n']
+    allowed  = allowed_samples(n, max_drop)
+    lost     = base['correct'] - quant['correct']
+    f1_drop  = base['f1_macro'] - quant['f1_macro']
+    f1_limit = max(max_drop, allowed / n) if n else max_drop
+    msg      = (
+        f"accuracy {quant['accuracy']:.4f} (fp32 {base['accuracy']:.4f}), "
+        f"macro-F1 {quant['f1_macro']:.4f} (fp32 {base['f1_macro']:.4f}), "
+        f"agreement {comparison['flips']} of {n} flipped, "
+        f"tolerance {allowed} email(s)"
+    )
+    if lost > allowed:
+        return False, f"{lost} more test emails wrong — {msg}"
+    if f1_drop > f1_limit:
+        return False, f"macro-F1 dropped by {f1_drop:.4f} (limit {f1_limit:.4f}) — {msg}"
+    return True, msg
+
+
+# ─── Load-time entry point ────────────────────────────────────────────────────
+
+def maybe_quantize(models: dict, max_drop: float = QUANTIZE_MAX_DROP) -> dict:
+    """
+    Return the INT8 variant if it passes the accuracy guardrail, else `models`.
+
+    The verdict is stored in QUANTIZE_REPORT_PATH keyed on the model
+    fingerprint and tolerance, so the test split is only re-scored (with
+    both fp32 and INT8) when the model files change.
+    """
+    if str(models.get('device')).startswith('cuda'):
+        print("[quantize] skipped — dynamic INT8 is a CPU optimization")
+        return models
+
+    key    = f"{models.get('backend')}:{models.get('fingerprint')}:{max_drop}:vs-fp32"
+    report = _load_report()
+    if key in report and not report[key]['passed']:
+        print(f"[quantize] refused (cached) — {report[key]['reason']}")
+        return models
+
+    try:
+        variant = quantized_variant(models)
+    except Exception as e:
+        print(f"[quantize] could not quantize: {e}")
+        return models
+
+    if key not in report:
+        comparison     = compare(models, variant, *load_test_split())
+        passed, reason = check_guardrail(comparison, max_drop)
+        report[key]    = {'passed': passed, 'reason': reason, 'comparison': comparison}
+        _save_report(report)
+    else:
+        passed, reason = report[key]['passed'], report[key]['reason']
+
+    if not passed:
+        print(f"[quantize] refused — {reason}")
+        return models
+    print(f"[quantize] INT8 active — {reason}")
+    return variant
+
+
+def _load_report() -> dict:
+    try:
+        with open(QUANTIZE_REPORT_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_report(report: dict):
+    try:
+        os.makedirs(os.path.dirname(QUANTIZE_REPORT_PATH), exist_ok=True)
+        tmp = QUANTIZE_REPORT_PATH + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, QUANTIZE_REPORT_PATH)
+    except OSError as e:
+        print(f"[quantize] could not save report: {e}")
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+if __name__ == '__main__':
+    from models.loader import build_models
+
+    fp32 = {**build_models(quantize=False), 'cache': None}
+    int8 = quantized_variant(fp32)
+
+    result         = compare(fp32, int8, *load_test_split())
+    passed, reason = check_guardrail(result)
+    base, quant    = result['fp32'], result['int8']
+
+    print(f"[quantize] backend {fp32['backend']}, {result['n']} test emails")
+    print(f"[quantize] fp32  acc {base['accuracy']:.4f}  macro-F1 {base['f1_macro']:.4f}  {base['ms_per_email']:.2f} ms/email")
+    print(f"[quantize] int8  acc {quant['accuracy']:.4f}  macro-F1 {quant['f1_macro']:.4f}  {quant['ms_per_email']:.2f} ms/email")
+    print(f"[quantize] prediction agreement {result['agreement']:.2%} ({result['flips']} flipped)")
+    print(f"[quantize] guardrail {'PASSED' if passed else 'FAILED'} — {reason}")
@@ -0,0 +1,292 @@
+import pathfix  # noqa
+# models/reclassify.py
+# Bulk re-classification of the email log with the current model
+# Writes one old → new diff per entry; resumable after an interruption
+# Depends on: models/loader.py, models/predictor.py, models/validator.py,
+#             utils/log_manager.py, utils/log_archive.py
+#
+#   python -m models.reclassify                     # hot log, resume if possible
+#   python -m models.reclassify --workers 4 --include-archive
+#   python -m models.reclassify --restart           # discard previous progress
+#
+# Output: data/reclassify/<model fingerprint>.jsonl (+ .checkpoint.json)
+#
+# The log only keeps subject + body_preview (the first 120 characters), so
+# that is what gets re-scored, while old_confidence came from the full body.
+# A diff can therefore come from truncation as well as from retraining; each
+# row and the checkpoint say so in 'rescored_on'.
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Iterator
+
+from config.constants import RECLASSIFY_DIR, RECLASSIFY_WORKERS, RECLASSIFY_CHUNK
+from models.predictor import predict_emails, combine_subject_body
+from models.validator import is_irrelevant
+
+# What the new prediction was scored on (the original saw the full body)
+RESCORED_ON = 'subject + body_preview'
+
+
+# ─── Diff ─────────────────────────────────────────────────────────────────────
+
+def old_label(entry: dict) -> str:
+    """The category the model originally gave, ignoring manual overrides."""
+    if entry.get('was_overridden') and entry.get('original_category'):
+        return entry['original_category']
+    return entry.get('category', '')
+
+
+def diff_entry(entry: dict, result: dict) -> dict:
+    """
+    Compare a log entry with a new prediction for it.
+
+    'new_category' is 'Irrelevant' below IRRELEVANT_THRESHOLD, the same
+    way the pages log it; 'model_category' is the raw top class.
+    'rescored_on' records that the new score saw only RESCORED_ON.
+    """
+    new = 'Irrelevant' if is_irrelevant(result['confidence']) else str(result['category'])
+    old = old_label(entry)
+    return {
+        'id':             entry.get('id'),
+        'timestamp':      entry.get('timestamp'),
+        'subject':        entry.get('subject', ''),
+        'old_category':   old,
+        'old_confidence': entry.get('confidence'),
+        'new_category':   new,
+        'new_confidence': round(result['confidence'] * 100, 2),
+        'model_category': str(result['category']),
+        'changed':        new != old,
+        'was_overridden': bool(entry.get('was_overridden')),
+        'rescored_on':    RESCORED_ON,
+    }
+
+
+# ─── Job ──────────────────────────────────────────────────────────────────────
+
+def reclassify_log(
+    models:          dict,
+    workers:         int  = RECLASSIFY_WORKERS,
+    chunk_size:      int  = RECLASSIFY_CHUNK,
+    include_archive: bool = False,
+    restart:         bool = False,
+    out_dir:         str  = RECLASSIFY_DIR,
+    report_every:    float = 5.0,
+) -> dict:
+    """
+    Re-score every log entry and append the diffs to a JSONL file.
+
+    Entries stream from the log in chunks of `chunk_size`; up to `workers`
+    chunks are scored at once through predict_emails() and at most twice
+    that many are held in memory. Each finished chunk is appended and
+    flushed, and the ids already in the file are skipped on the next run,
+    so an interrupted job resumes where it stopped.
+
+    Args:
+        models:          Dict returned by build_models()
+        workers:         Chunks scored concurrently
+        chunk_size:      Entries per predict_emails() call
+        include_archive: Also re-score entries moved to the Parquet archive
+        restart:         Discard the diff file for this model and start over
+        out_dir:         Where the diff and checkpoint files go
+        report_every:    Seconds between progress lines
+
+    Returns:
+        The final checkpoint dict (counts, throughput, output path)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    out_path  = os.path.join(out_dir, f"{models['fingerprint'].replace(':', '-')}.jsonl")
+    ckpt_path = out_path.replace('.jsonl', '.checkpoint.json')
+    if restart:
+        for path in (out_path, ckpt_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    done_ids, changed = _read_progress(out_path)
+    total      = _count_entries(include_archive)
+    checkpoint = {
+        'fingerprint': models['fingerprint'],
+        'backend':     models['backend'],
+        'output':      out_path,
+        'started':     datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total':       total,
+        'processed':   len(done_ids),
+        'changed':     changed,
+        'rescored_on': RESCORED_ON,
+        'done':        False,
+    }
+    if done_ids:
+        print(f"[reclassify] resuming — {len(done_ids):,} of {total:,} entries already scored")
+
+    scoring     = {**models, 'cache': None}     # don't flood the UI's prediction cache
+    transitions = Counter()
+    t0          = time.perf_counter()
+    scored      = 0
+    last_report = t0
+
+    entries = (e for e in _iter_entries(include_archive) if e.get('id') not in done_ids)
+    chunks  = iter(lambda: list(islice(entries, chunk_size)), [])
+
+    with _torch_threads(models, workers), open(out_path, 'a', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='reclassify') as pool:
+        for chunk in _score_chunks(chunks, pool, scoring, max(1, workers) * 2):
+            for entry, result in chunk:
+                row = diff_entry(entry, result)
+                out.write(json.dumps(row, ensure_ascii=False) + '\n')
+                checkpoint['changed'] += row['changed']
+                if row['changed']:
+                    transitions[(row['old_category'], row['new_category'])] += 1
+            out.flush()
+            os.fsync(out.fileno())
+
+            scored                  += len(chunk)
+            checkpoint['processed'] += len(chunk)
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                _report(checkpoint, scored, now - t0)
+                _save_checkpoint(ckpt_path, checkpoint)
+                last_report = now
+
+    elapsed = time.perf_counter() - t0
+    checkpoint.update({
+        'done':           True,
+        'finished':       datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'emails_per_sec': round(scored / elapsed, 1) if elapsed else 0.0,
+    })
+    _save_checkpoint(ckpt_path, checkpoint)
+    _report(checkpoint, scored, elapsed)
+
+    for (old, new), n in transitions.most_common(10):
+        print(f"[reclassify]   {n:>6,}  {old} → {new}")
+    return checkpoint
+
+
+# ─── Private Helpers ──────────────────────────────────────────────────────────
+
+def _iter_entries(include_archive: bool) -> Iterator[dict]:
+    """Hot log oldest first, then (optionally) the archive month by month."""
+    from utils.log_manager import iter_query_log
+
+    yield from iter_query_log(sort_by='timestamp', ascending=True)
+    if include_archive:
+        from utils.log_archive import archive_months, load_archived_entries
+        for month in archive_months():
+            yield from load_archived_entries(month_from=month, month_to=month)
+
+
+def _score(entries: list[dict], models: dict) -> list[tuple[dict, dict]]:
+    texts = [combine_subject_body(e.get('subject', ''), e.get('body_preview', '')) for e in entries]
+    return list(zip(entries, predict_emails(texts, models)))
+
+
+def _score_chunks(chunks, pool, models: dict, limit: int) -> Iterator[list]:
+    """Keep up to `limit` chunks in flight; yield scored chunks as they finish."""
+    pending = set()
+    for chunk in chunks:
+        pending.add(pool.submit(_score, chunk, models))
+        if len(pending) < limit:
+            continue
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def _count_entries(include_archive: bool) -> int:
+    from utils.log_manager import query_log
+    total = query_log(limit=1)[1]
+    if include_archive:
+        from utils.log_archive import archive_aggregates
+        total += archive_aggregates().total
+    return total
+
+
+def _read_progress(out_path: str) -> tuple[set, int]:
+    """
+    Ids already written to `out_path` and how many of them changed.
+    A line torn by a crash is cut off so appends start on a clean line.
+    """
+    ids, changed, good = set(), 0, 0
+    if not os.path.exists(out_path):
+        return ids, changed
+    with open(out_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                row = json.loads(line)
+            except ValueError:
+                break
+            ids.add(row['id'])
+            changed += bool(row.get('changed'))
+            good    += len(line)
+    if good != os.path.getsize(out_path):
+        with open(out_path, 'r+b') as f:
+            f.truncate(good)
+    return ids, changed
+
+
+@contextmanager
+def _torch_threads(models: dict, workers: int):
+    """
+    Split the cores between workers so concurrent chunks don't
+    oversubscribe. torch's thread count is process-wide, so the previous
+    value is restored when the job ends.
+    """
+    if models.get('backend') != 'torch' or str(models.get('device')) != 'cpu':
+        yield
+        return
+    import torch
+    previous = torch.get_num_threads()
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // max(1, workers)))
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def _report(checkpoint: dict, scored: int, elapsed: float):
+    rate      = scored / elapsed if elapsed else 0.0
+    remaining = max(0, checkpoint['total'] - checkpoint['processed'])
+    eta       = f", ETA {remaining / rate:,.0f}s" if rate and not checkpoint['done'] else ''
+    print(f"[reclassify] {checkpoint['processed']:,}/{checkpoint['total']:,} entries · "
+          f"{checkpoint['changed']:,} changed · {rate:,.1f} emails/s{eta}")
+
+
+def _save_checkpoint(path: str, checkpoint: dict):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+if __name__ == '__main__':
+    from models.loader import build_models
+
+    parser = argparse.ArgumentParser(description="Re-score the email log with the current model")
+    parser.add_argument('--workers',         type=int, default=RECLASSIFY_WORKERS)
+    parser.add_argument('--chunk-size',      type=int, default=RECLASSIFY_CHUNK)
+    parser.add_argument('--include-archive', action='store_true')
+    parser.add_argument('--restart',         action='store_true')
+    args = parser.parse_args()
+
+    result = reclassify_log(
+        build_models(),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        include_archive=args.include_archive,
+        restart=args.restart,
+    )
+    print(f"[reclassify] diffs → {result['output']}")
@@ -0,0 +1,224 @@
+import pathfix  # noqa
+# models/server.py
+# Standalone inference server — the model runs here, Streamlit talks to it over HTTP
+# Requests from all UI workers are merged into shared batches (see MicroBatcher)
+# Depends on: models/loader.py, models/predictor.py, utils/metrics.py
+#
+#   python -m models.server [--host 127.0.0.1] [--port 8765]
+#   INFERENCE_SERVER_URL=http://127.0.0.1:8765 streamlit run app.py
+#
+#   GET  /health    → { status, backend, device, fingerprint, labels, queued }
+#   POST /classify  ← { "texts": [...] }  → { "results": [...] }
+#   GET  /metrics   → per-stage latency histograms (Prometheus text; /metrics.json)
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer
+
+from config.constants import (
+    INFERENCE_SERVER_HOST, INFERENCE_SERVER_PORT, INFERENCE_MAX_BATCH,
+    INFERENCE_BATCH_WAIT_MS, INFERENCE_QUEUE_SIZE, INFERENCE_CLIENT_TIMEOUT,
+)
+from models.predictor import predict_emails
+from utils.metrics import MetricsHandler, record
+
+
+class QueueFull(Exception):
+    """Raised by MicroBatcher.submit() when INFERENCE_QUEUE_SIZE requests are waiting."""
+
+
+# ─── Batching ─────────────────────────────────────────────────────────────────
+
+class MicroBatcher:
+    """
+    One worker thread that owns the model. Requests wait in a bounded
+    queue; the worker takes the oldest, then keeps collecting requests for
+    up to `wait_ms` or until `max_batch` texts, and scores them all with a
+    single predict_emails() call.
+
+    Args:
+        models:     Dict returned by build_models()
+        max_batch:  Texts per predict_emails() call (a single larger
+                    request is still taken whole)
+        wait_ms:    How long the first request waits for company
+        queue_size: Pending requests before submit() raises QueueFull
+    """
+
+    def __init__(
+        self,
+        models:     dict,
+        max_batch:  int = INFERENCE_MAX_BATCH,
+        wait_ms:    int = INFERENCE_BATCH_WAIT_MS,
+        queue_size: int = INFERENCE_QUEUE_SIZE,
+    ):
+        self.models    = models
+        self.max_batch = max(1, max_batch)
+        self.wait_s    = max(0, wait_ms) / 1000
+        self._queue: queue.Queue[tuple[list[str], Future]] = queue.Queue(maxsize=queue_size)
+        self._thread   = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: list[str]) -> Future:
+        """Queue texts for scoring; the Future resolves to predict_emails() results."""
+        future = Future()
+        try:
+            self._queue.put_nowait((texts, future))
+        except queue.Full:
+            raise QueueFull(f"{self._queue.maxsize} requests already queued")
+        return future
+
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            jobs  = [self._queue.get()]
+            count = len(jobs[0][0])
+            deadline = time.monotonic() + self.wait_s
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                count += len(job[0])
+
+            jobs = [(texts, f) for texts, f in jobs if f.set_running_or_notify_cancel()]
+            try:
+                results = predict_emails(
+                    [t for texts, _ in jobs for t in texts],
+                    self.models,
+                    batch_size=self.max_batch,
+                )
+            except Exception as e:
+                print(f"[server] batch of {count} failed: {e}")
+                for _, f in jobs:
+                    f.set_exception(e)
+                continue
+
+            offset = 0
+            for texts, f in jobs:
+                f.set_result(results[offset:offset + len(texts)])
+                offset += len(texts)
+
+
+# ─── HTTP ─────────────────────────────────────────────────────────────────────
+
+def to_json_result(result: dict) -> dict:
+    """predict_email() result → JSON-safe dict (the UI runs validate_result() itself)."""
+    return {
+        'category':      str(result['category']),
+        'confidence':    float(result['confidence']),
+        'probabilities': [float(p) for p in result['probabilities']],
+        'class_id':      int(result['class_id']),
+        'elapsed_ms':    str(result['elapsed_ms']),
+        'all_labels':    [str(label) for label in result['all_labels']],
+        'cached':        bool(result.get('cached', False)),
+    }
+
+
+class _Handler(MetricsHandler):
+    protocol_version = 'HTTP/1.1'         # keep-alive for InferenceClient
+    batcher: MicroBatcher                 # set by serve()
+    health:  dict
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            return self.send_metrics()
+        if self.path == '/metrics.json':
+            return self.send_metrics_json()
+        if self.path != '/health':
+            return self._send(404, {'error': f"unknown path {self.path}"})
+        self._send(200, {**self.health, 'queued': self.batcher.queued()})
+
+    def do_POST(self):
+        if self.path != '/classify':
+            return self._send(404, {'error': f"unknown path {self.path}"})
+        try:
+            length  = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(payload, dict):
+                raise ValueError("body must be a JSON object")
+            texts   = payload['texts']
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("'texts' must be a list of strings")
+        except (KeyError, ValueError) as e:
+            return self._send(400, {'error': f"bad request: {e}"})
+
+        if not texts:
+            return self._send(200, {'results': []})
+        # 'request' = queue wait + batch share + serialization, successful calls only
+        # (a 503 takes microseconds and would drag the percentiles down under load)
+        started = time.perf_counter_ns()
+        try:
+            results = self.batcher.submit(texts).result(timeout=INFERENCE_CLIENT_TIMEOUT)
+        except QueueFull as e:
+            return self._send(503, {'error': f"server busy: {e}"}, retry_after=1)
+        except TimeoutError:
+            return self._send(504, {'error': "inference timed out"})
+        except Exception as e:
+            return self._send(500, {'error': f"inference failed: {e}"})
+        body = {'results': [to_json_result(r) for r in results]}
+        record('request', started, items=len(texts))
+        self._send(200, body)
+
+    def _send(self, status: int, body: dict, retry_after: int | None = None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_request(self, code='-', size='-'):
+        # Only failed requests; a line per request would drown everything else
+        if str(code).isdigit() and int(code) >= 400:
+            print(f"[server] {self.address_string()} \"{self.requestline}\" {code}")
+
+
+def serve(host: str = INFERENCE_SERVER_HOST, port: int = INFERENCE_SERVER_PORT):
+    """Load the models, warm them up and serve until interrupted."""
+    from models.loader import build_models, get_device_label, save_snapshot
+    from models.startup import warmup
+
+    models = build_models()
+    warmup(models)
+    save_snapshot(models)
+
+    _Handler.batcher = MicroBatcher(models)
+    _Handler.health  = {
+        'status':      'ok',
+        'backend':     models['backend'],
+        'device':      get_device_label(models),
+        'fingerprint': models['fingerprint'],
+        'labels':      [str(label) for label in models['label_encoder'].classes_],
+    }
+
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    print(f"[server] {_Handler.health['device']} · listening on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        if models.get('cache') is not None:
+            models['cache'].save()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="MobileBERT inference server")
+    parser.add_argument('--host', default=INFERENCE_SERVER_HOST)
+    parser.add_argument('--port', type=int, default=INFERENCE_SERVER_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
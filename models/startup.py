@@ -0,0 +1,86 @@
+import pathfix  # noqa
+# models/startup.py
+# Background model preload and warmup, so the first page that needs the
+# model doesn't wait for the whole cold start
+# Depends on: models/loader.py, models/predictor.py, config/constants.py, utils/memory.py
+
+import threading
+import time
+from concurrent.futures import Future
+
+from config.constants import MODEL_WARMUP_LENGTHS
+from utils.memory import format_report, memory_report
+
+_preload_lock   = threading.Lock()
+_preload_future: Future | None = None
+
+
+def preload_models() -> Future:
+    """
+    Start loading the models in a daemon thread, once per process.
+
+    Safe to call on every Streamlit rerun: later calls return the same
+    Future. load_models() waits on it, so the cached result is always the
+    one built here. If the previous load failed, the next call retries.
+
+    Returns:
+        Future resolving to the `models` dict (or raising ModelLoadError)
+    """
+    global _preload_future
+    with _preload_lock:
+        if _preload_future is not None and not (
+            _preload_future.done() and _preload_future.exception() is not None
+        ):
+            return _preload_future
+        _preload_future = Future()
+        future = _preload_future
+
+    threading.Thread(target=_load, args=(future,), name='model-preload', daemon=True).start()
+    return future
+
+
+def warmup(models: dict, lengths: list[int] = MODEL_WARMUP_LENGTHS) -> float:
+    """
+    Run a few throwaway predictions so lazy initialisation (thread pools,
+    kernel selection, allocator growth) happens before the first user email.
+
+    Args:
+        models:  Dict returned by build_models()
+        lengths: Approximate word counts of the dummy emails
+
+    Returns:
+        Seconds spent
+    """
+    from models.predictor import predict_emails
+
+    t0       = time.perf_counter()
+    texts    = [' '.join(['warmup'] * n) for n in lengths]
+    uncached = {**models, 'cache': None}
+    predict_emails(texts[:1], uncached)               # single-email path
+    predict_emails(texts * 3, uncached, batch_size=8)  # batched, mixed lengths
+    return time.perf_counter() - t0
+
+
+# ─── Private Helpers ──────────────────────────────────────────────────────────
+
+def _load(future: Future):
+    from models.loader import build_models, save_snapshot
+
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        t0     = time.perf_counter()
+        models = build_models()
+        t_load = time.perf_counter() - t0
+        t_warm = warmup(models)
+    except BaseException as e:
+        future.set_exception(e)
+        return
+
+    source = 'snapshot' if models.get('from_snapshot') else models['backend']
+    print(f"[startup] models ready — load {t_load:.2f}s ({source}), warmup {t_warm:.2f}s")
+    print(f"[startup] {format_report(memory_report())}")
+    future.set_result(models)
+
+    # Written after the result is published so it never delays the first page
+    save_snapshot(models)
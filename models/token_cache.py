@@ -0,0 +1,249 @@
+import pathfix  # noqa
+# models/token_cache.py
+# Memoized tokenization — token ids keyed on a hash of the cleaned text
+# Ids are kept unpadded as uint16 arrays; predictor.py pads each batch itself.
+# Stores (.npz) hold pre-tokenized dataset splits and log texts, so evaluation
+# and re-scoring jobs skip the tokenizer entirely
+# Equality with the tokenizer is checked by tests/test_token_cache.py
+# Depends on: config/constants.py, models/loader.py (CLI), models/predictor.py (CLI)
+#
+#   python -m models.token_cache build   # write data/tokens/{X_train,X_val,X_test,log}.npz
+
+import glob
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from config.constants import TOKEN_CACHE_SIZE, TOKEN_STORE_DIR
+
+_STORE_VERSION = 1
+
+
+def text_key(cleaned_text: str) -> bytes:
+    """16-byte digest of a cleaned email text."""
+    return hashlib.blake2b(cleaned_text.encode('utf-8'), digest_size=16).digest()
+
+
+def tokenizer_fingerprint(model_path: str, max_length: int) -> str:
+    """
+    Hash of the tokenizer files in `model_path` plus the truncation length.
+    Unlike the model fingerprint, it survives retraining with the same vocabulary.
+    """
+    h = hashlib.sha256(f"v{_STORE_VERSION}:{max_length};".encode('utf-8'))
+    for name in sorted(os.listdir(model_path)):
+        if name.startswith(('tokenizer', 'vocab', 'special_tokens', 'added_tokens')):
+            with open(os.path.join(model_path, name), 'rb') as f:
+                h.update(name.encode('utf-8'))
+                h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+class TokenCache:
+    """
+    Thread-safe LRU cache mapping cleaned text → token ids.
+
+    Args:
+        max_size:    Maximum number of encodings kept in memory
+        max_length:  Truncation length, including [CLS]/[SEP]
+        fingerprint: tokenizer_fingerprint() of the tokenizer in use
+        vocab_size:  len(tokenizer); ids are stored as uint16 when it fits
+    """
+
+    def __init__(
+        self,
+        max_size:    int = TOKEN_CACHE_SIZE,
+        max_length:  int = 128,
+        fingerprint: str = '',
+        vocab_size:  int = 65536,
+    ):
+        self.max_size    = max(1, int(max_size))
+        self.max_length  = max_length
+        self.fingerprint = fingerprint
+        self.dtype       = np.uint16 if vocab_size <= 65536 else np.uint32
+        self.hits        = 0
+        self.misses      = 0
+        self._entries: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._lock       = threading.Lock()
+
+    def encode(self, cleaned: list[str], tokenizer) -> list[np.ndarray]:
+        """
+        Token ids for each cleaned text; only cache misses reach the tokenizer
+        (in one batched call).
+
+        Returns:
+            One 1-D id array per text, truncated to max_length, unpadded
+        """
+        keys = [text_key(t) for t in cleaned]
+        out: list[np.ndarray | None] = [None] * len(cleaned)
+        missing: dict[bytes, list[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                ids = self._entries.get(key)
+                if ids is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    out[i] = ids
+                elif key in missing:
+                    missing[key].append(i)
+                else:
+                    self.misses += 1
+                    missing[key] = [i]
+
+        if missing:
+            encoded = tokenize(
+                [cleaned[idx[0]] for idx in missing.values()], tokenizer, self.max_length, self.dtype
+            )
+            with self._lock:
+                for (key, idx), ids in zip(missing.items(), encoded):
+                    for i in idx:
+                        out[i] = ids
+                    self._put(key, ids)
+        return out
+
+    def stats(self) -> dict:
+        """
+        Return cache counters for display.
+
+        Returns:
+            dict with keys: hits, misses, size, max_size, hit_rate_pct
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits':         self.hits,
+                'misses':       self.misses,
+                'size':         len(self._entries),
+                'max_size':     self.max_size,
+                'hit_rate_pct': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            }
+
+    def _put(self, key: bytes, ids: np.ndarray):
+        self._entries[key] = ids
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    # ─── Stores ───────────────────────────────────────────────────────────────
+
+    def load_stores(self, store_dir: str = TOKEN_STORE_DIR) -> int:
+        """
+        Prefill from every .npz store in `store_dir` built with the same
+        tokenizer fingerprint; others are skipped.
+
+        Returns:
+            Number of encodings loaded
+        """
+        loaded = 0
+        for path in sorted(glob.glob(os.path.join(store_dir, '*.npz'))):
+            store = read_store(path)
+            if store is None or store['fingerprint'] != self.fingerprint:
+                continue
+            with self._lock:
+                for key, ids in zip(store['keys'], store['ids']):
+                    self._put(key, ids.astype(self.dtype, copy=False))
+            loaded += len(store['keys'])
+        return loaded
+
+
+# Fast tokenizers reconfigure truncation on every call and raise
+# "Already borrowed" when two threads do it at once
+_tokenizer_lock = threading.Lock()
+
+
+def tokenize(cleaned: list[str], tokenizer, max_length: int, dtype=np.uint16) -> list[np.ndarray]:
+    """Uncached batched tokenization → one unpadded id array per text."""
+    if not cleaned:
+        return []
+    with _tokenizer_lock:
+        encoded = tokenizer(
+            cleaned,
+            add_special_tokens=True,
+            max_length=max_length,
+            truncation=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )['input_ids']
+    return [np.asarray(ids, dtype=dtype) for ids in encoded]
+
+
+# ─── Store files ──────────────────────────────────────────────────────────────
+# One .npz per corpus: every text's ids concatenated into one flat array,
+# with offsets marking where each text starts and 16-byte text digests as keys.
+
+def write_store(path: str, cleaned: list[str], ids: list[np.ndarray], fingerprint: str, dtype=np.uint16):
+    """Save encodings of `cleaned` to a compact .npz store."""
+    lengths = np.fromiter((len(a) for a in ids), dtype=np.int64, count=len(ids))
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    flat    = np.concatenate(ids).astype(dtype) if ids else np.empty(0, dtype=dtype)
+    digests = np.frombuffer(b''.join(text_key(t) for t in cleaned), dtype=np.uint8).reshape(-1, 16)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, 'wb') as f:            # a file object stops savez appending '.npz'
+        np.savez(f, ids=flat, offsets=offsets, digests=digests, fingerprint=np.array(fingerprint))
+    os.replace(tmp, path)
+
+
+def read_store(path: str) -> dict | None:
+    """
+    Load a store written by write_store().
+
+    Returns:
+        dict with keys: fingerprint, keys (list of bytes), ids (list of
+        arrays, views into one buffer) — or None if unreadable
+    """
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            flat, offsets = data['ids'], data['offsets']
+            digests       = data['digests']
+            fingerprint   = str(data['fingerprint'])
+    except Exception as e:
+        print(f"[token_cache] could not read {path}: {e}")
+        return None
+    return {
+        'fingerprint': fingerprint,
+        'keys':        [bytes(d) for d in digests],
+        'ids':         [flat[offsets[i]:offsets[i + 1]] for i in range(len(digests))],
+    }
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+if __name__ == '__main__':
+    import pickle
+    import sys
+    import time
+
+    from models.loader import MODEL_PATH, _ROOT
+    from models.predictor import MAX_LENGTH, clean_text, combine_subject_body
+    from utils.log_manager import load_log
+
+    if (sys.argv[1] if len(sys.argv) > 1 else 'build') != 'build':
+        sys.exit("usage: python -m models.token_cache build")
+
+    from transformers import AutoTokenizer
+    tokenizer   = AutoTokenizer.from_pretrained(MODEL_PATH)
+    fingerprint = tokenizer_fingerprint(MODEL_PATH, MAX_LENGTH)
+    dtype       = np.uint16 if len(tokenizer) <= 65536 else np.uint32
+
+    with open(os.path.join(_ROOT, 'preprocessed_data', 'data_splits.pkl'), 'rb') as f:
+        splits = pickle.load(f)
+    corpora = {name: list(splits[name]) for name in ('X_train', 'X_val', 'X_test') if name in splits}
+    corpora['log'] = [
+        combine_subject_body(e.get('subject', ''), e.get('body_preview', '')) for e in load_log()
+    ]
+
+    for name, texts in corpora.items():
+        t0      = time.perf_counter()
+        cleaned = [clean_text(t) for t in texts]
+        ids     = tokenize(cleaned, tokenizer, MAX_LENGTH, dtype)
+        path    = os.path.join(TOKEN_STORE_DIR, f"{name}.npz")
+        write_store(path, cleaned, ids, fingerprint, dtype)
+        print(f"[token_cache] {name}: {len(texts):,} texts, "
+              f"{sum(map(len, ids)):,} tokens → {path} "
+              f"({os.path.getsize(path) / 1024:.0f} KB, {time.perf_counter() - t0:.2f}s)")
@@ -1,6 +1,7 @@
 import pathfix  # noqa
 # model/validator.py
 # Confidence threshold checks, alert logic, and irrelevant detection
+# Depends on: config/constants.py, utils/metrics.py
 
 from config.constants import (
     CONFIDENCE_HIGH,
@@ -9,6 +10,7 @@ from config.constants import (
     ROUTING_MAP,
     PRIORITY_CONFIG,
 )
+from utils.metrics import timed
 
 
 def get_confidence_level(confidence: float) -> dict:
@@ -83,6 +85,7 @@ def is_high_priority(category: str) -> bool:
     return get_priority(category)['key'] in ('urgent', 'high')
 
 
+@timed('validate')
 def validate_result(result: dict) -> dict:
     """
     Full validation — includes irrelevant detection.
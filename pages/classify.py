@@ -2,6 +2,7 @@ import pathfix  # noqa
 import streamlit as st
 
 from config.constants import SAMPLE_EMAILS, CATEGORIES, ROUTING_MAP
+from models.client import InferenceServerError
 from models.predictor import predict_email, combine_subject_body
 from models.validator import validate_result
 from components.result_card import render_result_card, render_probability_chart
@@ -25,7 +26,11 @@ def render_classify(models: dict):
             return
         full_text = combine_subject_body(subject, body)
         with st.spinner("Analysing with MobileBERT…"):
-            result = predict_email(full_text, models)
+            try:
+                result = predict_email(full_text, models)
+            except InferenceServerError as e:
+                st.error(f"❌ Classification failed: {e}")
+                return
         # Store result in session state so it survives reruns
         st.session_state['last_result']  = result
         st.session_state['last_subject'] = subject
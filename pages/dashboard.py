@@ -3,7 +3,7 @@ import streamlit as st
 import plotly.graph_objects as go
 
 from config.constants import CATEGORY_COLORS, MODEL_ACCURACY, MODEL_NAME
-from utils.log_manager import load_log, get_log_summary
+from utils.log_manager import get_log_summary
 from utils.stats import (
     category_distribution, confidence_distribution, volume_over_time,
     priority_breakdown, top_categories, override_rate,
@@ -26,27 +26,26 @@ def render_dashboard():
     st.markdown("## 📊 Analytics Dashboard")
     st.caption("Live statistics, classification trends and model performance")
 
-    entries = load_log()
+    summary = get_log_summary()
 
-    if not entries:
+    if not summary['total']:
         st.info("📈 No data yet. Classify and approve some emails first.")
         if st.button("Go to Classifier →", type="primary", key="dash_goto_classify"):
             st.session_state.page = "classify"
             st.rerun()
         return
 
-    summary = get_log_summary(entries)
-    daily   = daily_summary(entries)
+    daily = daily_summary()
 
     _render_summary_stats(summary)
     st.divider()
     _render_today_strip(daily)
     st.divider()
-    _render_charts_row1(entries)
+    _render_charts_row1()
     st.divider()
-    _render_charts_row2(entries)
+    _render_charts_row2()
     st.divider()
-    _render_model_performance(entries)
+    _render_model_performance()
 
 
 def _render_summary_stats(summary):
@@ -68,15 +67,15 @@ def _render_today_strip(daily):
     with c4: st.metric("Overrides Today", daily['override_count'])
 
 
-def _render_charts_row1(entries):
+def _render_charts_row1():
     st.caption("CLASSIFICATION OVERVIEW")
     col1, col2 = st.columns(2)
-    with col1: _chart_category_pie(entries)
-    with col2: _chart_volume_over_time(entries)
+    with col1: _chart_category_pie()
+    with col2: _chart_volume_over_time()
 
 
-def _chart_category_pie(entries):
-    df = category_distribution(entries)
+def _chart_category_pie():
+    df = category_distribution()
     if df.empty:
         st.info("No category data yet.")
         return
@@ -95,12 +94,12 @@ def _chart_category_pie(entries):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def _chart_volume_over_time(entries):
+def _chart_volume_over_time():
     c1, c2 = st.columns(2)
     with c1: period = st.selectbox("Period", ["daily","weekly","monthly"], key="dash_period")
     with c2: days   = st.selectbox("Lookback", [7,14,30,60,90], index=2, key="dash_days")
 
-    df = volume_over_time(entries, period=period, last_n_days=days)
+    df = volume_over_time(period=period, last_n_days=days)
     if df.empty:
         st.info("Not enough data for this period.")
         return
@@ -118,15 +117,15 @@ def _chart_volume_over_time(entries):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def _render_charts_row2(entries):
+def _render_charts_row2():
     st.caption("CONFIDENCE & PRIORITY")
     col1, col2 = st.columns(2)
-    with col1: _chart_confidence_distribution(entries)
-    with col2: _chart_priority_breakdown(entries)
+    with col1: _chart_confidence_distribution()
+    with col2: _chart_priority_breakdown()
 
 
-def _chart_confidence_distribution(entries):
-    df = confidence_distribution(entries)
+def _chart_confidence_distribution():
+    df = confidence_distribution()
     fig = go.Figure(go.Bar(
         x=df['range'], y=df['count'],
         marker=dict(color=df['color'].tolist(),
@@ -143,8 +142,8 @@ def _chart_confidence_distribution(entries):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def _chart_priority_breakdown(entries):
-    df = priority_breakdown(entries)
+def _chart_priority_breakdown():
+    df = priority_breakdown()
     if df.empty:
         st.info("No priority data yet.")
         return
@@ -165,17 +164,17 @@ def _chart_priority_breakdown(entries):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def _render_model_performance(entries):
+def _render_model_performance():
     st.caption("MODEL PERFORMANCE")
     col1, col2 = st.columns(2)
-    with col1: _chart_avg_confidence_by_category(entries)
+    with col1: _chart_avg_confidence_by_category()
     with col2:
-        _render_override_stats(entries)
-        _render_top_categories(entries)
+        _render_override_stats()
+        _render_top_categories()
 
 
-def _chart_avg_confidence_by_category(entries):
-    df = avg_confidence_by_category(entries)
+def _chart_avg_confidence_by_category():
+    df = avg_confidence_by_category()
     if df.empty:
         st.info("No data yet.")
         return
@@ -197,8 +196,8 @@ def _chart_avg_confidence_by_category(entries):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def _render_override_stats(entries):
-    stats = override_rate(entries)
+def _render_override_stats():
+    stats = override_rate()
     st.caption("OVERRIDE & ACCURACY")
     c1, c2 = st.columns(2)
     with c1: st.metric("Implied Accuracy", f"{stats['accuracy_pct']}%")
@@ -210,8 +209,8 @@ def _render_override_stats(entries):
     )
 
 
-def _render_top_categories(entries):
-    top = top_categories(entries, n=5)
+def _render_top_categories():
+    top = top_categories(n=5)
     if not top:
         return
     st.caption("TOP 5 CATEGORIES")
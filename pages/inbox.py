@@ -9,13 +9,13 @@ from config.constants import (
     IMAP_PROVIDERS, AUTOREFRESH_OPTIONS, INBOX_FETCH_LIMIT,
     ROUTING_MAP, IRRELEVANT_THRESHOLD,
 )
-from utils.imap_client import (
-    connect, fetch_unread, fetch_all_recent,
-    mark_as_read, disconnect, test_connection,
-)
+from utils.imap_client import mark_as_read, test_connection, get_pool
+from utils.imap_sync import InboxSync
 from utils.log_manager import add_log_entry
+from models.client import InferenceServerError
 from models.predictor import predict_email, combine_subject_body
 from models.validator import validate_result
+from models.background import submit_classification
 
 
 def render_inbox(models: dict):
@@ -29,7 +29,7 @@ def render_inbox(models: dict):
         return
 
     st.divider()
-    _render_inbox_controls()
+    _render_inbox_controls(models)
     st.divider()
     _render_email_queue(models)
 
@@ -131,11 +131,16 @@ def _render_connection_panel():
 
 # ─── Inbox Controls ───────────────────────────────────────────────────────────
 
-def _render_inbox_controls():
+def _render_inbox_controls(models: dict):
     col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
 
     with col1:
         st.caption(f"📧 Connected as: **{st.session_state.get('imap_username_saved','')}**")
+        st.toggle(
+            "⚡ Auto-classify on fetch",
+            key="inbox_auto_classify",
+            help="Classify every fetched email in the background so results are ready when you open it.",
+        )
 
     with col2:
         view_mode = st.selectbox(
@@ -156,14 +161,17 @@ def _render_inbox_controls():
         st.markdown("<br>", unsafe_allow_html=True)
         fetch_clicked = st.button("🔄 Fetch Now", use_container_width=True, key="inbox_fetch_btn")
 
-    # Auto-refresh
+    # Auto-refresh — each timer tick triggers an (incremental) fetch
     interval = AUTOREFRESH_OPTIONS[refresh_label]
+    tick     = None
     if interval > 0:
-        st_autorefresh(interval=interval * 1000, key="inbox_autorefresh_timer")
+        tick = st_autorefresh(interval=interval * 1000, key="inbox_autorefresh_timer")
+    timer_fired = tick is not None and tick != st.session_state.get('inbox_last_tick')
+    st.session_state['inbox_last_tick'] = tick
 
-    # Fetch on button click OR on first load after connect
-    if fetch_clicked or 'inbox_emails' not in st.session_state:
-        _fetch_emails(view_mode)
+    # Fetch on button click, on a timer tick, OR on first load after connect
+    if fetch_clicked or timer_fired or 'inbox_emails' not in st.session_state:
+        _fetch_emails(view_mode, models)
 
     # Show last fetch time
     if st.session_state.get('inbox_last_fetched'):
@@ -180,14 +188,43 @@ def _render_email_queue(models: dict):
         return
 
     st.caption(f"INBOX — {len(emails)} EMAIL(S)")
+    _collect_auto_results()
 
-    for i, em in enumerate(emails):
-        _render_email_row(em, i, models)
+    for em in emails:
+        _render_email_row(em, models)
 
 
-def _render_email_row(em: dict, index: int, models: dict):
+def _collect_auto_results():
+    """Move finished background classifications into each row's result slot."""
+    job = st.session_state.get('inbox_auto_job')
+    if job is None:
+        return
+
+    future, key_prefixes = job
+    if not future.done():
+        st.caption("⚡ Classifying inbox in the background…")
+        st_autorefresh(interval=1000, key="inbox_auto_poll")
+        return
+
+    st.session_state.pop('inbox_auto_job', None)
+    try:
+        results = future.result()
+    except Exception as e:
+        st.warning(f"Background classification failed: {e}")
+        return
+
+    for key_prefix, result in zip(key_prefixes, results):
+        st.session_state.setdefault(f"{key_prefix}_result", result)
+
+
+def _row_key(em: dict) -> str:
+    # Not the row position: new mail is inserted at the top on every refresh
+    return f"inbox_{em.get('uidvalidity', 0)}_{int(em['uid'])}"
+
+
+def _render_email_row(em: dict, models: dict):
     """Render a single inbox email as an expandable classify card."""
-    key_prefix = f"inbox_{index}_{em.get('uid', index)}"
+    key_prefix = _row_key(em)
 
     with st.expander(f"📧 **{em['subject']}** · *{em['sender']}* · `{em['date']}`"):
 
@@ -206,8 +243,13 @@ def _render_email_row(em: dict, index: int, models: dict):
             if st.button("🤖 Classify", key=classify_key, use_container_width=True, type="primary"):
                 with st.spinner("Classifying…"):
                     full_text = combine_subject_body(em['subject'], em['body'])
-                    result    = predict_email(full_text, models)
-                st.session_state[f"{key_prefix}_result"] = result
+                    try:
+                        result = predict_email(full_text, models)
+                    except InferenceServerError as e:
+                        st.error(f"❌ Classification failed: {e}")
+                        result = None
+                if result is not None:
+                    st.session_state[f"{key_prefix}_result"] = result
 
         # Show result if classified
         result = st.session_state.get(f"{key_prefix}_result")
@@ -306,39 +348,55 @@ def _render_override(em, result, validation, key_prefix):
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
-def _fetch_emails(view_mode: str):
+def _fetch_emails(view_mode: str, models: dict):
     """Connect to IMAP and fetch emails into session state."""
     from datetime import datetime
-    try:
-        mail = connect(
-            st.session_state['imap_host_saved'],
-            st.session_state['imap_port_saved'],
-            st.session_state['imap_username_saved'],
-            st.session_state['imap_password_saved'],
+    syncs = st.session_state.setdefault('inbox_syncs', {})
+    if view_mode not in syncs:
+        syncs[view_mode] = InboxSync(
+            limit=INBOX_FETCH_LIMIT,
+            unread_only=(view_mode == "Unread only"),
         )
-        if view_mode == "Unread only":
-            emails = fetch_unread(mail, limit=INBOX_FETCH_LIMIT)
-        else:
-            emails = fetch_all_recent(mail, limit=INBOX_FETCH_LIMIT)
-        disconnect(mail)
+    try:
+        emails = get_pool().run(*_credentials(), syncs[view_mode].refresh)
         st.session_state['inbox_emails']      = emails
         st.session_state['inbox_last_fetched'] = datetime.now().strftime('%H:%M:%S')
+        if st.session_state.get('inbox_auto_classify') and emails:
+            _start_auto_classify(emails, models)
     except Exception as e:
         st.error(f"❌ Fetch failed: {e}")
         st.session_state['inbox_emails'] = []
 
 
+def _start_auto_classify(emails: list[dict], models: dict):
+    """
+    Queue a background batch classification of rows not yet classified.
+    Does nothing while the previous job is still running — replacing it
+    would drop its results and queue the same rows again behind it on the
+    single worker; rows it didn't cover are picked up on the next refresh.
+    """
+    job = st.session_state.get('inbox_auto_job')
+    if job is not None:
+        if not job[0].done():
+            return
+        _collect_auto_results()          # finished but not yet shown: keep its results
+    pending = [
+        (em, _row_key(em)) for em in emails
+        if f"{_row_key(em)}_result" not in st.session_state
+    ]
+    if not pending:
+        return
+    future = submit_classification([em for em, _ in pending], models)
+    st.session_state['inbox_auto_job'] = (future, [key for _, key in pending])
+
+
 def _mark_read_in_imap(em: dict):
     """Mark the email as read in the actual inbox."""
     try:
-        mail = connect(
-            st.session_state['imap_host_saved'],
-            st.session_state['imap_port_saved'],
-            st.session_state['imap_username_saved'],
-            st.session_state['imap_password_saved'],
-        )
-        mark_as_read(mail, em['uid'])
-        disconnect(mail)
+        get_pool().run(*_credentials(), lambda mail: mark_as_read(mail, em['uid']))
+        for sync in st.session_state.get('inbox_syncs', {}).values():
+            if sync.unread_only:
+                sync.forget(em['uid'])
     except Exception as e:
         print(f"[inbox] mark_as_read failed: {e}")
 
@@ -370,9 +428,26 @@ def _save_email(
     )
 
 
+def _credentials() -> tuple:
+    """Saved (host, port, username, password) for the pooled IMAP session."""
+    return (
+        st.session_state['imap_host_saved'],
+        st.session_state['imap_port_saved'],
+        st.session_state['imap_username_saved'],
+        st.session_state['imap_password_saved'],
+    )
+
+
 def _clear_connection():
     """Clear all IMAP session state."""
+    if st.session_state.get('imap_host_saved'):
+        get_pool().close(
+            st.session_state['imap_host_saved'],
+            st.session_state['imap_port_saved'],
+            st.session_state['imap_username_saved'],
+        )
     for key in ['imap_connected', 'imap_host_saved', 'imap_port_saved',
                 'imap_username_saved', 'imap_password_saved', 'inbox_emails',
-                'inbox_last_fetched']:
+                'inbox_last_fetched', 'inbox_auto_job', 'inbox_syncs',
+                'inbox_last_tick']:
         st.session_state.pop(key, None)
\ No newline at end of file
@@ -15,7 +15,7 @@ from config.constants import (
     ROUTING_MAP,
     CATEGORY_COLORS,
 )
-from utils.log_manager import load_log, get_log_summary
+from utils.log_manager import get_log_summary
 
 
 def render_landing():
@@ -99,8 +99,7 @@ def _badge(value: str, label: str) -> str:
 # ─── Stats Row ────────────────────────────────────────────────────────────────
 
 def _render_stats():
-    entries = load_log()
-    summary = get_log_summary(entries)
+    summary = get_log_summary()
 
     st.markdown('<span class="section-label">Live System Stats</span>',
                 unsafe_allow_html=True)
@@ -1,31 +1,39 @@
 import pathfix  # noqa
 import streamlit as st
 
-from config.constants import CATEGORIES, ROUTING_MAP, CATEGORY_COLORS, PRIORITY_CONFIG
+from config.constants import (
+    CATEGORIES, ROUTING_MAP, CATEGORY_COLORS, PRIORITY_CONFIG, LOG_PAGE_SIZES,
+    LOG_ARCHIVE_AFTER_DAYS,
+)
 from utils.log_manager import (
-    load_log, filter_log, sort_log, delete_log_entry,
-    clear_log, export_to_csv, get_log_summary,
+    query_log, delete_log_entry, clear_log, archive_old_entries,
+    export_query_csv, export_to_parquet, get_log_summary,
 )
+from utils.log_archive import archive_months
 
 
 def render_log():
     st.markdown("## 📋 Email Log")
     st.caption("View, filter, search and export all classified emails")
 
-    entries = load_log()
+    summary = get_log_summary()
 
-    if not entries:
+    if not summary['total']:
         _render_empty_state()
         return
 
-    _render_summary_row(entries)
+    _render_summary_row(summary)
     st.divider()
-    filtered = _render_filters(entries)
+    query, page_size = _render_filters()
+    page_entries, total = _query_page(query, page_size)
+    _render_showing_caption(page_size, len(page_entries), total, summary['total'])
     st.divider()
-    _render_toolbar(filtered)
+    _render_toolbar(query, total)
     st.markdown("<br>", unsafe_allow_html=True)
-    _render_log_table(filtered)
+    _render_log_table(page_entries)
+    _render_pagination(page_size, total)
     st.divider()
+    _render_archive()
     _render_danger_zone()
 
 
@@ -36,8 +44,7 @@ def _render_empty_state():
         st.rerun()
 
 
-def _render_summary_row(entries):
-    summary = get_log_summary(entries)
+def _render_summary_row(summary):
     c1, c2, c3, c4, c5 = st.columns(5)
     with c1: st.metric("Total",       summary['total'])
     with c2: st.metric("Today",       summary['today'])
@@ -46,7 +53,8 @@ def _render_summary_row(entries):
     with c5: st.metric("Avg Conf.",   f"{summary['avg_confidence']}%")
 
 
-def _render_filters(entries):
+def _render_filters() -> tuple[dict, int]:
+    """Render filter widgets; return (query_log kwargs, page size)."""
     st.caption("FILTER & SEARCH")
     c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
 
@@ -66,42 +74,101 @@ def _render_filters(entries):
         }
         sort_choice = st.selectbox("Sort By", list(sort_options.keys()), key="log_sort")
 
-    c_d1, c_d2, c_d3 = st.columns([1, 1, 2])
+    c_d1, c_d2, c_d3, c_d4 = st.columns([1, 1, 1, 1])
     with c_d1:
         date_from = st.date_input("From Date", value=None, key="log_date_from")
     with c_d2:
         date_to = st.date_input("To Date", value=None, key="log_date_to")
     with c_d3:
         overrides_only = st.checkbox("Show overrides only", key="log_overrides_only")
+    with c_d4:
+        page_size = st.selectbox("Per Page", LOG_PAGE_SIZES, index=1, key="log_page_size")
 
-    filtered = filter_log(
-        entries,
-        category=category,
-        priority=priority,
-        date_from=str(date_from) if date_from else None,
-        date_to=str(date_to)     if date_to   else None,
-        search_query=search,
-        overrides_only=overrides_only,
-    )
     sort_field, ascending = sort_options[sort_choice]
-    filtered = sort_log(filtered, sort_by=sort_field, ascending=ascending)
+    query = {
+        'category':       category,
+        'priority':       priority,
+        'date_from':      str(date_from) if date_from else None,
+        'date_to':        str(date_to)   if date_to   else None,
+        'search_query':   search,
+        'overrides_only': overrides_only,
+        'sort_by':        sort_field,
+        'ascending':      ascending,
+    }
+    return query, page_size
+
+
+def _query_page(query: dict, page_size: int) -> tuple[list[dict], int]:
+    """Fetch only the current page; jump back to page 1 when filters change."""
+    signature = (tuple(sorted(query.items())), page_size)
+    if st.session_state.get('log_query_sig') != signature:
+        st.session_state['log_query_sig'] = signature
+        st.session_state['log_page']      = 0
+
+    page = st.session_state.get('log_page', 0)
+    page_entries, total = query_log(**query, limit=page_size, offset=page * page_size)
+
+    # Deletes can leave the cursor past the last page
+    last_page = max(0, (total - 1) // page_size)
+    if page > last_page:
+        st.session_state['log_page'] = last_page
+        page_entries, total = query_log(**query, limit=page_size, offset=last_page * page_size)
+    return page_entries, total
 
-    st.caption(f"Showing **{len(filtered)}** of **{len(entries)}** emails")
-    return filtered
 
+def _render_showing_caption(page_size: int, shown: int, total: int, grand_total: int):
+    start = st.session_state.get('log_page', 0) * page_size
+    if shown:
+        st.caption(
+            f"Showing **{start + 1}–{start + shown}** of **{total}** matching "
+            f"· **{grand_total}** emails in log"
+        )
+    else:
+        st.caption(f"Showing **0** of **{grand_total}** emails")
 
-def _render_toolbar(filtered):
-    c1, c2 = st.columns([1, 4])
+
+def _render_pagination(page_size: int, total: int):
+    pages = max(1, -(-total // page_size))
+    if pages <= 1:
+        return
+    page = st.session_state.get('log_page', 0)
+
+    c1, c2, c3 = st.columns([1, 2, 1])
     with c1:
-        if filtered:
+        if st.button("◀ Prev", key="log_page_prev", disabled=page == 0,
+                     use_container_width=True):
+            st.session_state['log_page'] = page - 1
+            st.rerun()
+    with c2:
+        st.caption(f"Page **{page + 1}** of **{pages}**")
+    with c3:
+        if st.button("Next ▶", key="log_page_next", disabled=page >= pages - 1,
+                     use_container_width=True):
+            st.session_state['log_page'] = page + 1
+            st.rerun()
+
+
+def _render_toolbar(query: dict, total: int):
+    c1, c2, c3 = st.columns([1, 1, 3])
+    if total:
+        # Callables run only when the button is clicked, not on every rerun
+        with c1:
             st.download_button(
                 "⬇ Export CSV",
-                data=export_to_csv(filtered),
+                data=lambda: export_query_csv(**query),
                 file_name="email_log.csv",
                 mime="text/csv",
                 key="log_export_csv"
             )
-    with c2:
+        with c2:
+            st.download_button(
+                "⬇ Export Parquet",
+                data=lambda: export_to_parquet(query_log(**query)[0]),
+                file_name="email_log.parquet",
+                mime="application/vnd.apache.parquet",
+                key="log_export_parquet"
+            )
+    with c3:
         if st.button("🔄 Refresh", key="log_refresh"):
             st.rerun()
 
@@ -160,6 +227,32 @@ def _render_log_entry(entry):
                     st.error("Could not delete.")
 
 
+def _render_archive():
+    months = archive_months()
+    with st.expander(f"🗄 Archive — {len(months)} month(s) in Parquet"):
+        st.caption(
+            "Move old entries out of the live log into month-partitioned Parquet files. "
+            "Archived entries still count in the summary and dashboard, "
+            "but are no longer listed or searchable here."
+        )
+        if months:
+            st.caption(f"Archived months: {', '.join(months)}")
+        c1, c2 = st.columns([1, 2])
+        with c1:
+            days = st.number_input(
+                "Older than (days)", min_value=1, value=LOG_ARCHIVE_AFTER_DAYS, key="log_archive_days"
+            )
+        with c2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            if st.button("🗄 Archive old entries", key="log_archive_run"):
+                moved = archive_old_entries(int(days))
+                if moved:
+                    st.success(f"Archived {moved} entries.")
+                    st.rerun()
+                else:
+                    st.info("Nothing old enough to archive.")
+
+
 def _render_danger_zone():
     with st.expander("⚠️ Danger Zone — Clear All Logs"):
         st.warning("This will permanently delete **all** log entries and cannot be undone.")
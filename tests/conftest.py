@@ -0,0 +1,67 @@
+# tests/conftest.py
+# Shared fixtures: a tiny randomly initialised MobileBERT with the real
+# tokenizer and label encoder, so model-path tests run without the
+# fine-tuned weights (which are not in the repo)
+
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pathfix  # noqa
+
+import pytest
+
+from models.loader import MODEL_PATH, LABEL_ENCODER_PATH
+
+
+@pytest.fixture(scope='session')
+def label_encoder():
+    with open(LABEL_ENCODER_PATH, 'rb') as f:
+        return pickle.load(f)
+
+
+@pytest.fixture(scope='session')
+def tiny_model_dir(tmp_path_factory, label_encoder) -> str:
+    """A from_pretrained()-loadable directory holding a 2-layer MobileBERT."""
+    torch        = pytest.importorskip('torch')
+    transformers = pytest.importorskip('transformers')
+
+    tokenizer = transformers.AutoTokenizer.from_pretrained(MODEL_PATH)
+    config    = transformers.MobileBertConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=64,
+        embedding_size=32,
+        intra_bottleneck_size=32,
+        intermediate_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        num_feedforward_networks=1,
+        initializer_range=0.2,          # spread the logits so argmax is not a coin toss
+        num_labels=len(label_encoder.classes_),
+    )
+    torch.manual_seed(0)
+    model = transformers.MobileBertForSequenceClassification(config).eval()
+
+    path = str(tmp_path_factory.mktemp('mobilebert'))
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
+
+
+@pytest.fixture(scope='session')
+def tiny_models(tiny_model_dir, label_encoder) -> dict:
+    """A `models` dict (PyTorch backend, no caches) around the tiny model."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    return {
+        'model':         AutoModelForSequenceClassification.from_pretrained(tiny_model_dir).eval(),
+        'tokenizer':     AutoTokenizer.from_pretrained(tiny_model_dir),
+        'label_encoder': label_encoder,
+        'device':        torch.device('cpu'),
+        'backend':       'torch',
+        'fingerprint':   'tiny',
+        'cache':         None,
+        'token_cache':   None,
+    }
@@ -0,0 +1,268 @@
+# tests/test_imap_sync.py
+# InboxSync against an in-process IMAP server (plain TCP, imaplib.IMAP4)
+# Covers the UIDVALIDITY reset, the unchanged-HIGHESTMODSEQ skip, and the
+# `UID n:*` + backfill paths of an incremental refresh; also mark_as_read()
+#
+#   python -m pytest tests/
+
+import imaplib
+import os
+import re
+import socketserver
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pathfix  # noqa
+
+from utils.imap_client import mark_as_read
+from utils.imap_sync import InboxSync
+
+
+# ─── Fake server ──────────────────────────────────────────────────────────────
+
+class Mailbox:
+    """One folder: uid → {'raw', 'seen'}, plus UIDVALIDITY and HIGHESTMODSEQ."""
+
+    def __init__(self, condstore: bool = True):
+        self.condstore   = condstore
+        self.uidvalidity = 1
+        self.modseq      = 1
+        self.next_uid    = 1
+        self.messages: dict[int, dict] = {}
+        self.commands: list[str] = []          # every command line received, for assertions
+        self.lock        = threading.Lock()
+
+    def deliver(self, subject: str, seen: bool = False) -> int:
+        with self.lock:
+            uid = self.next_uid
+            self.next_uid += 1
+            raw = (f"From: student@uni.edu.ng\r\nSubject: {subject}\r\n"
+                   f"Date: Mon, 5 Jan 2026 10:00:00 +0000\r\n\r\nBody of {subject}\r\n").encode()
+            self.messages[uid] = {'raw': raw, 'seen': seen}
+            self.modseq += 1
+            return uid
+
+    def mark_seen(self, uid: int):
+        with self.lock:
+            self.messages[uid]['seen'] = True
+            self.modseq += 1
+
+    def recreate(self, subjects: list[str]):
+        """Simulate the folder being rebuilt: new UIDVALIDITY, UIDs restart at 1."""
+        with self.lock:
+            self.uidvalidity += 1
+            self.next_uid     = 1
+            self.messages     = {}
+        for subject in subjects:
+            self.deliver(subject)
+
+    def searches(self) -> list[str]:
+        return [c for c in self.commands if ' UID SEARCH ' in c]
+
+    def fetched_sets(self) -> list[str]:
+        return [c.split()[3] for c in self.commands if ' UID FETCH ' in c]
+
+
+def _uids_in_set(spec: str, existing: list[int]) -> set[int]:
+    top, out = max(existing, default=0), set()
+    for part in spec.split(','):
+        lo, _, hi = part.partition(':')
+        lo = top if lo == '*' else int(lo)
+        hi = lo if not hi else (top if hi == '*' else int(hi))
+        out.update(range(min(lo, hi), max(lo, hi) + 1))
+    return out
+
+
+class _ImapHandler(socketserver.StreamRequestHandler):
+    mailbox: Mailbox
+
+    def send(self, line: bytes | str):
+        self.wfile.write((line.encode() if isinstance(line, str) else line) + b'\r\n')
+
+    def handle(self):
+        box = self.mailbox
+        self.send("* OK [CAPABILITY IMAP4rev1] fake ready")
+        for raw in self.rfile:
+            line = raw.decode().rstrip('\r\n')
+            box.commands.append(line)
+            tag, command, *rest = line.split(' ', 2)
+            command, args = command.upper(), (rest[0] if rest else '')
+
+            if command == 'CAPABILITY':
+                self.send("* CAPABILITY IMAP4rev1" + (" CONDSTORE" if box.condstore else ""))
+            elif command in ('SELECT', 'EXAMINE'):
+                with box.lock:
+                    self.send(f"* {len(box.messages)} EXISTS")
+                    self.send(f"* OK [UIDVALIDITY {box.uidvalidity}] UIDs valid")
+                    if box.condstore:
+                        self.send(f"* OK [HIGHESTMODSEQ {box.modseq}] modseq")
+            elif command == 'UID':
+                self.uid_command(args)
+            elif command == 'LOGOUT':
+                self.send("* BYE")
+                self.send(f"{tag} OK LOGOUT completed")
+                return
+            self.send(f"{tag} OK {command} completed")
+
+    def uid_command(self, args: str):
+        box = self.mailbox
+        sub, _, args = args.partition(' ')
+        with box.lock:
+            uids = sorted(box.messages)
+            if sub.upper() == 'SEARCH':
+                match = set(uids)
+                if 'UNSEEN' in args:
+                    match = {u for u in match if not box.messages[u]['seen']}
+                uid_set = re.search(r'UID (\S+)', args)
+                if uid_set:
+                    match &= _uids_in_set(uid_set.group(1), uids)
+                self.send("* SEARCH" + ''.join(f" {u}" for u in sorted(match)))
+            elif sub.upper() == 'FETCH':
+                spec = args.split(' ', 1)[0]
+                for seq, uid in enumerate(uids, 1):
+                    if uid not in _uids_in_set(spec, uids):
+                        continue
+                    header, _, text = box.messages[uid]['raw'].partition(b'\r\n\r\n')
+                    header += b'\r\n\r\n'
+                    self.wfile.write(
+                        f"* {seq} FETCH (UID {uid} BODY[HEADER] {{{len(header)}}}\r\n".encode()
+                        + header + f" BODY[TEXT]<0> {{{len(text)}}}\r\n".encode() + text + b")\r\n"
+                    )
+            elif sub.upper() == 'STORE' and '\\Seen' in args:
+                for uid in _uids_in_set(args.split(' ', 1)[0], uids) & set(uids):
+                    box.messages[uid]['seen'] = True
+                box.modseq += 1
+
+
+@pytest.fixture
+def imap():
+    """(mailbox, connect) — connect() returns a logged-in imaplib.IMAP4."""
+    box     = Mailbox()
+    handler = type('Handler', (_ImapHandler,), {'mailbox': box})
+    server  = socketserver.ThreadingTCPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conns = []
+
+    def connect():
+        mail = imaplib.IMAP4('127.0.0.1', server.server_address[1])
+        mail.login('registry', 'secret')
+        conns.append(mail)
+        return mail
+
+    yield box, connect
+    for mail in conns:
+        try:
+            mail.logout()
+        except (imaplib.IMAP4.abort, OSError):
+            pass                                    # a test dropped this connection
+    server.shutdown()
+    server.server_close()
+
+
+def _subjects(view: list[dict]) -> list[str]:
+    return [em['subject'] for em in view]
+
+
+# ─── Tests ────────────────────────────────────────────────────────────────────
+
+def test_unchanged_modseq_skips_search_and_fetch(imap):
+    box, connect = imap
+    for i in range(3):
+        box.deliver(f"msg {i}")
+    mail, sync = connect(), InboxSync(limit=5)
+
+    assert _subjects(sync.refresh(mail)) == ['msg 2', 'msg 1', 'msg 0']
+    searches, fetches = len(box.searches()), len(box.fetched_sets())
+
+    assert _subjects(sync.refresh(mail)) == ['msg 2', 'msg 1', 'msg 0']
+    assert sync.stats['skipped'] == 1
+    assert len(box.searches()) == searches          # SELECT only
+    assert len(box.fetched_sets()) == fetches
+
+
+def test_new_mail_fetches_only_new_uids(imap):
+    box, connect = imap
+    for i in range(3):
+        box.deliver(f"msg {i}")
+    mail, sync = connect(), InboxSync(limit=5)
+    sync.refresh(mail)
+
+    new_uid = box.deliver("msg 3")
+    assert _subjects(sync.refresh(mail)) == ['msg 3', 'msg 2', 'msg 1', 'msg 0']
+    assert box.searches()[-1].endswith(f"UNSEEN UID {new_uid}:*")
+    assert box.fetched_sets()[-1] == str(new_uid)
+    assert sync.stats['full_syncs'] == 1
+
+    # `n:*` still matches the highest UID when nothing is new; it must not be refetched
+    box.modseq += 1
+    fetches = len(box.fetched_sets())
+    assert _subjects(sync.refresh(mail)) == ['msg 3', 'msg 2', 'msg 1', 'msg 0']
+    assert len(box.fetched_sets()) == fetches
+
+
+def test_removed_message_is_backfilled_from_older_uids(imap):
+    box, connect = imap
+    uids = [box.deliver(f"msg {i}") for i in range(5)]
+    mail, sync = connect(), InboxSync(limit=3)
+    assert _subjects(sync.refresh(mail)) == ['msg 4', 'msg 3', 'msg 2']
+
+    box.mark_seen(uids[3])                          # read in another client
+    assert _subjects(sync.refresh(mail)) == ['msg 4', 'msg 2', 'msg 1']
+    assert box.fetched_sets()[-1] == str(uids[1])   # only the backfilled message
+    assert sync.has_older
+
+    box.mark_seen(uids[4])
+    box.mark_seen(uids[2])
+    assert _subjects(sync.refresh(mail)) == ['msg 1', 'msg 0']
+    assert not sync.has_older
+
+
+def test_uidvalidity_change_discards_cache_and_resyncs(imap):
+    box, connect = imap
+    for i in range(3):
+        box.deliver(f"old {i}")
+    mail, sync = connect(), InboxSync(limit=5)
+    sync.refresh(mail)
+
+    box.recreate(["new 0", "new 1"])                # UIDs 1, 2 reused for different mail
+    assert _subjects(sync.refresh(mail)) == ['new 1', 'new 0']
+    assert sync.stats['full_syncs'] == 2
+    assert sync.uidvalidity == box.uidvalidity
+    assert sync.last_uid == 2
+    assert {em['uidvalidity'] for em in sync.view()} == {box.uidvalidity}
+    assert box.searches()[-1].endswith("UID SEARCH UNSEEN")
+
+
+def test_server_without_condstore_refreshes_incrementally(imap):
+    box, connect = imap
+    box.condstore = False
+    for i in range(2):
+        box.deliver(f"msg {i}")
+    mail, sync = connect(), InboxSync(limit=5)
+    sync.refresh(mail)
+
+    fetches = len(box.fetched_sets())
+    assert _subjects(sync.refresh(mail)) == ['msg 1', 'msg 0']
+    assert sync.stats['skipped'] == 0
+    assert len(box.fetched_sets()) == fetches       # searched, nothing new to fetch
+
+
+def test_mark_as_read_sets_seen(imap):
+    box, connect = imap
+    uid = box.deliver("msg 0")
+    mark_as_read(connect(), str(uid).encode())
+    assert box.messages[uid]['seen']
+
+
+def test_mark_as_read_lets_connection_errors_reach_the_pool(imap):
+    box, connect = imap
+    uid  = box.deliver("msg 0")
+    mail = connect()
+    mail.sock.shutdown(2)                           # connection dropped under the pooled session
+    with pytest.raises((imaplib.IMAP4.abort, OSError)):
+        mark_as_read(mail, str(uid).encode())
+    assert not box.messages[uid]['seen']
@@ -0,0 +1,54 @@
+# tests/test_loader.py
+# Memory-mapped model load: same outputs as from_pretrained, and building
+# on the meta device must not leak into other threads
+#
+#   python -m pytest tests/
+
+import os
+import threading
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+import models.loader as loader
+
+
+@pytest.fixture
+def tiny_paths(tiny_model_dir, monkeypatch):
+    monkeypatch.setattr(loader, 'MODEL_PATH', tiny_model_dir)
+    monkeypatch.setattr(loader, 'WEIGHTS_PATH', os.path.join(tiny_model_dir, 'model.safetensors'))
+    return tiny_model_dir
+
+
+def test_mmap_load_matches_from_pretrained(tiny_paths, tiny_models, label_encoder):
+    model = loader._load_mmap(len(label_encoder.classes_))
+    assert model is not None
+    model.eval()
+
+    ref = tiny_models['model']
+    assert torch.equal(model.mobilebert.embeddings.position_ids, ref.mobilebert.embeddings.position_ids)
+
+    batch = tiny_models['tokenizer'](["fees payment failed", "transcript request"], padding=True,
+                                     return_tensors='pt')
+    with torch.no_grad():
+        assert torch.equal(model(**batch).logits, ref(**batch).logits)
+
+
+def test_meta_construction_does_not_leak_into_other_threads(tiny_paths, label_encoder):
+    stop, leaked = threading.Event(), []
+
+    def build_elsewhere():
+        while not stop.is_set():
+            if torch.nn.Linear(8, 8).weight.is_meta:
+                leaked.append(True)
+
+    worker = threading.Thread(target=build_elsewhere)
+    worker.start()
+    try:
+        for _ in range(3):
+            assert loader._load_mmap(len(label_encoder.classes_)) is not None
+    finally:
+        stop.set()
+        worker.join()
+    assert not leaked
@@ -0,0 +1,52 @@
+# tests/test_onnx_backend.py
+# ONNX Runtime backend: parity with PyTorch on X_test, atomic optimized graph
+#
+#   python -m pytest tests/
+
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('onnxruntime')
+
+from models.onnx_backend import OnnxClassifier, export_onnx, _optimized_path
+from models.predictor import predict_emails
+from models.quantize import load_test_split
+
+
+@pytest.fixture(scope='module')
+def onnx_path(tiny_model_dir, label_encoder, tmp_path_factory) -> str:
+    out = str(tmp_path_factory.mktemp('onnx') / 'model.onnx')
+    return export_onnx(len(label_encoder.classes_), out, model_path=tiny_model_dir)
+
+
+def test_onnx_matches_torch_on_x_test(tiny_models, onnx_path):
+    x_test, _ = load_test_split()
+    onnx_models = {**tiny_models, 'model': OnnxClassifier(onnx_path), 'backend': 'onnx'}
+
+    ref = predict_emails(x_test, tiny_models)
+    got = predict_emails(x_test, onnx_models)
+
+    max_diff = max(float(np.abs(a['probabilities'] - b['probabilities']).max()) for a, b in zip(ref, got))
+    assert max_diff < 1e-4
+    assert [r['class_id'] for r in ref] == [r['class_id'] for r in got]
+
+
+def test_concurrent_first_loads_write_optimized_graph_atomically(onnx_path):
+    optimized = _optimized_path(onnx_path)
+    if os.path.exists(optimized):
+        os.remove(optimized)
+
+    ctx   = multiprocessing.get_context('spawn')
+    procs = [ctx.Process(target=OnnxClassifier, args=(onnx_path, 1)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    assert [p.exitcode for p in procs] == [0] * len(procs)
+    assert os.path.exists(optimized)
+    leftovers = [n for n in os.listdir(os.path.dirname(onnx_path)) if n.endswith('.tmp')]
+    assert leftovers == []
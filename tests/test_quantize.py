@@ -0,0 +1,48 @@
+# tests/test_quantize.py
+# INT8 guardrail: tolerance in test emails, fp32 and INT8 scored in one run
+#
+#   python -m pytest tests/
+
+from models.quantize import (
+    allowed_samples, check_guardrail, compare, load_test_split, quantized_variant,
+)
+
+
+def _comparison(n: int, fp32_correct: int, int8_correct: int, f1_drop: float = 0.0) -> dict:
+    return {
+        'fp32':      {'accuracy': fp32_correct / n, 'correct': fp32_correct, 'f1_macro': 0.9},
+        'int8':      {'accuracy': int8_correct / n, 'correct': int8_correct, 'f1_macro': 0.9 - f1_drop},
+        'n':         n,
+        'agreement': 1.0,
+        'flips':     abs(fp32_correct - int8_correct),
+    }
+
+
+def test_tolerance_is_at_least_one_email():
+    assert allowed_samples(67, 0.01) == 1        # 0.01 × 67 < 1
+    assert allowed_samples(1000, 0.01) == 10
+
+
+def test_one_flip_on_a_small_split_passes_two_fail():
+    assert check_guardrail(_comparison(67, 62, 61, f1_drop=0.012), 0.01)[0]
+    passed, reason = check_guardrail(_comparison(67, 62, 60), 0.01)
+    assert not passed and '2 more test emails wrong' in reason
+
+
+def test_macro_f1_drop_beyond_tolerance_fails():
+    passed, reason = check_guardrail(_comparison(67, 62, 62, f1_drop=0.05), 0.01)
+    assert not passed and 'macro-F1' in reason
+
+
+def test_compare_scores_both_variants_on_the_same_split(tiny_models):
+    x_test, y_test = load_test_split()
+
+    same = compare(tiny_models, tiny_models, x_test, y_test)
+    assert same['flips'] == 0 and same['agreement'] == 1.0
+    assert same['fp32']['correct'] == same['int8']['correct']
+    assert check_guardrail(same)[0]
+
+    result = compare(tiny_models, quantized_variant(tiny_models), x_test, y_test)
+    assert result['n'] == len(x_test) == result['fp32']['n'] == result['int8']['n']
+    assert 0.0 <= result['agreement'] <= 1.0
+    assert result['flips'] == round((1 - result['agreement']) * result['n'])
@@ -0,0 +1,69 @@
+# tests/test_reclassify.py
+# Bulk re-classification on the tiny model: diff rows, resume, and the
+# process-wide torch thread count left as it was
+#
+#   python -m pytest tests/
+
+import json
+import os
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+import models.reclassify as reclassify
+
+
+def _entries(n: int) -> list[dict]:
+    return [
+        {
+            'id':           f"E{i:03d}",
+            'timestamp':    f"2026-01-01 10:{i // 60:02d}:{i % 60:02d}",
+            'subject':      f"Transcript request {i}",
+            'body_preview': "Please send my transcript to the graduate school",
+            'category':     'Transcript Requests',
+            'confidence':   91.5,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def log(monkeypatch):
+    entries = _entries(25)
+    monkeypatch.setattr(reclassify, '_iter_entries', lambda include_archive: iter(entries))
+    monkeypatch.setattr(reclassify, '_count_entries', lambda include_archive: len(entries))
+    return entries
+
+
+def _rows(path: str) -> list[dict]:
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_job_writes_diffs_and_restores_torch_threads(tiny_models, log, tmp_path):
+    before = torch.get_num_threads()
+    torch.set_num_threads(os.cpu_count() + 2)    # not what the job would pick, even on one core
+    try:
+        result = reclassify.reclassify_log(tiny_models, workers=2, chunk_size=10, out_dir=str(tmp_path))
+        assert torch.get_num_threads() == os.cpu_count() + 2
+    finally:
+        torch.set_num_threads(before)
+
+    assert result['done'] and result['processed'] == len(log)
+    assert result['rescored_on'] == reclassify.RESCORED_ON
+
+    rows = _rows(result['output'])
+    assert sorted(r['id'] for r in rows) == [e['id'] for e in log]
+    assert all(r['rescored_on'] == reclassify.RESCORED_ON for r in rows)
+    assert all(r['old_confidence'] == 91.5 and 0 <= r['new_confidence'] <= 100 for r in rows)
+
+
+def test_job_resumes_without_rescoring(tiny_models, log, tmp_path):
+    first = reclassify.reclassify_log(tiny_models, workers=1, chunk_size=10, out_dir=str(tmp_path))
+    with open(first['output'], 'a', encoding='utf-8') as f:
+        f.write('{"id": "torn')                   # interrupted mid-line
+
+    again = reclassify.reclassify_log(tiny_models, workers=1, chunk_size=10, out_dir=str(tmp_path))
+    assert again['processed'] == len(log)
+    assert len(_rows(again['output'])) == len(log)
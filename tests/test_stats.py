@@ -0,0 +1,208 @@
+# tests/test_stats.py
+# Dashboard stats from LogAggregates must match the per-function rescans
+# they replaced (the baseline_* functions below, copied from the original
+# utils/stats.py) on a synthetic log
+#
+#   python -m pytest tests/
+
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from config.constants import CATEGORIES, CATEGORY_COLORS, PRIORITY_CONFIG
+from utils.log_aggregates import CONF_BUCKETS, LogAggregates
+from utils.stats import (
+    category_distribution, confidence_distribution, volume_over_time, priority_breakdown,
+    override_rate, avg_confidence_by_category, daily_summary,
+)
+
+
+# ─── Baseline (original per-function rescans) ─────────────────────────────────
+
+
+def baseline_category_distribution(entries):
+    counts = {cat: 0 for cat in CATEGORIES}
+    for e in entries:
+        cat = e.get('category', '')
+        if cat in counts:
+            counts[cat] += 1
+    total = sum(counts.values()) or 1
+    rows = [
+        {'category': cat, 'count': count, 'color': CATEGORY_COLORS.get(cat, '#6495ed'),
+         'percentage': round(count / total * 100, 1)}
+        for cat, count in counts.items()
+        if count > 0
+    ]
+    return pd.DataFrame(rows).sort_values('count', ascending=False)
+
+
+def baseline_confidence_distribution(entries):
+    buckets = dict.fromkeys(CONF_BUCKETS, 0)
+    colors  = dict(zip(CONF_BUCKETS, ['#EF4444', '#F97316', '#F59E0B', '#6495ed', '#10B981']))
+    for e in entries:
+        conf = float(e.get('confidence', 0))
+        if conf < 20:
+            buckets['0–20%'] += 1
+        elif conf < 40:
+            buckets['20–40%'] += 1
+        elif conf < 60:
+            buckets['40–60%'] += 1
+        elif conf < 80:
+            buckets['60–80%'] += 1
+        else:
+            buckets['80–100%'] += 1
+    return pd.DataFrame([{'range': k, 'count': v, 'color': colors[k]} for k, v in buckets.items()])
+
+
+def baseline_volume_over_time(entries, period='daily', last_n_days=30):
+    cutoff = datetime.now() - timedelta(days=last_n_days)
+    counts = defaultdict(int)
+    for e in entries:
+        try:
+            dt = datetime.strptime(e.get('date', ''), '%Y-%m-%d')
+        except ValueError:
+            continue
+        if dt < cutoff:
+            continue
+        if period == 'daily':
+            key = dt.strftime('%Y-%m-%d')
+        elif period == 'weekly':
+            key = f"W{dt.isocalendar()[1]} {dt.year}"
+        else:
+            key = dt.strftime('%b %Y')
+        counts[key] += 1
+    if not counts:
+        return pd.DataFrame(columns=['period', 'count'])
+    return pd.DataFrame([{'period': k, 'count': v} for k, v in sorted(counts.items())])
+
+
+def baseline_priority_breakdown(entries):
+    counts = {'urgent': 0, 'high': 0, 'normal': 0, 'low': 0}
+    for e in entries:
+        pri = e.get('priority', 'normal')
+        if pri in counts:
+            counts[pri] += 1
+    rows = [
+        {'priority': pri, 'label': PRIORITY_CONFIG[pri]['label'], 'count': count,
+         'color': PRIORITY_CONFIG[pri]['color'], 'badge': PRIORITY_CONFIG[pri]['badge']}
+        for pri, count in counts.items()
+        if count > 0
+    ]
+    priority_order = {'urgent': 0, 'high': 1, 'normal': 2, 'low': 3}
+    return pd.DataFrame(rows).sort_values('priority', key=lambda s: s.map(priority_order))
+
+
+def baseline_override_rate(entries):
+    total      = len(entries)
+    overridden = sum(1 for e in entries if e.get('was_overridden'))
+    rate       = round(overridden / total * 100, 1) if total else 0.0
+    return {'total': total, 'overridden': overridden,
+            'rate_pct': rate, 'accuracy_pct': round(100 - rate, 1)}
+
+
+def baseline_avg_confidence_by_category(entries):
+    totals = defaultdict(list)
+    for e in entries:
+        cat = e.get('category', '')
+        if cat in CATEGORIES:
+            totals[cat].append(float(e.get('confidence', 0)))
+    rows = [
+        {'category': cat, 'avg_confidence': round(sum(vals) / len(vals), 1),
+         'color': CATEGORY_COLORS.get(cat, '#6495ed')}
+        for cat, vals in totals.items()
+        if vals
+    ]
+    return pd.DataFrame(rows).sort_values('avg_confidence', ascending=False)
+
+
+def baseline_daily_summary(entries):
+    today         = datetime.now().strftime('%Y-%m-%d')
+    today_entries = [e for e in entries if e.get('date') == today]
+    if not today_entries:
+        return {'count': 0, 'avg_confidence': 0.0, 'urgent_count': 0, 'override_count': 0}
+    confidences = [float(e.get('confidence', 0)) for e in today_entries]
+    return {
+        'count':          len(today_entries),
+        'avg_confidence': round(sum(confidences) / len(confidences), 1),
+        'urgent_count':   sum(1 for e in today_entries if e.get('priority') == 'urgent'),
+        'override_count': sum(1 for e in today_entries if e.get('was_overridden')),
+    }
+
+
+# ─── Synthetic log ────────────────────────────────────────────────────────────
+
+def synthetic(n: int) -> list[dict]:
+    rng   = random.Random(0)
+    today = datetime.now()
+    out   = []
+    for i in range(n):
+        ts = today - timedelta(minutes=rng.randint(0, 60 * 24 * 120))
+        out.append({
+            'id':             f"{i:08X}",
+            'timestamp':      ts.strftime('%Y-%m-%d %H:%M:%S'),
+            'date':           ts.strftime('%Y-%m-%d'),
+            'category':       rng.choice(CATEGORIES),
+            'priority':       rng.choice(['urgent', 'high', 'normal', 'low']),
+            'confidence':     round(rng.uniform(0, 100), 2),
+            'was_overridden': rng.random() < 0.1,
+        })
+    return out
+
+
+def dashboard(entries, fns) -> list:
+    """Every widget the dashboard page draws, in page order."""
+    (cat, conf, vol, pri, over, avg, daily) = fns
+    return [
+        cat(entries), conf(entries), pri(entries), over(entries), avg(entries), daily(entries),
+        *(vol(entries, period=p, last_n_days=90) for p in ('daily', 'weekly', 'monthly')),
+    ]
+
+
+BASELINE = (
+    baseline_category_distribution, baseline_confidence_distribution,
+    baseline_volume_over_time, baseline_priority_breakdown, baseline_override_rate,
+    baseline_avg_confidence_by_category, baseline_daily_summary,
+)
+CURRENT = (
+    category_distribution, confidence_distribution, volume_over_time,
+    priority_breakdown, override_rate, avg_confidence_by_category, daily_summary,
+)
+
+
+def same_output(a, b) -> bool:
+    if not isinstance(a, pd.DataFrame):
+        return a == b
+    # Same rows; rows tied on the sort key may come out in either order
+    # (the baseline kept first-seen log order, aggregates use CATEGORIES order)
+    a, b = (df.astype(object).sort_values(list(df.columns)).reset_index(drop=True) for df in (a, b))
+    return a.equals(b)
+
+
+WIDGETS = [
+    'category_distribution', 'confidence_distribution', 'priority_breakdown', 'override_rate',
+    'avg_confidence_by_category', 'daily_summary',
+    'volume_over_time daily', 'volume_over_time weekly', 'volume_over_time monthly',
+]
+
+
+# ─── Tests ────────────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope='module')
+def outputs() -> tuple[list, list]:
+    entries = synthetic(20_000)
+    return dashboard(entries, BASELINE), dashboard(LogAggregates(entries), CURRENT)
+
+
+@pytest.mark.parametrize('index', range(len(WIDGETS)), ids=WIDGETS)
+def test_aggregate_stats_match_baseline_rescans(outputs, index):
+    baseline, current = outputs
+    assert same_output(baseline[index], current[index])
+
+
+def test_entry_list_and_prebuilt_aggregates_agree():
+    entries = synthetic(2_000)
+    for a, b in zip(dashboard(entries, CURRENT), dashboard(LogAggregates(entries), CURRENT)):
+        assert same_output(a, b)
@@ -0,0 +1,111 @@
+# tests/test_text_normalizer.py
+# Golden check: clean_text / strip_html must match the regex chains they
+# replaced on every dataset text plus a fuzzed corpus
+#
+#   python -m pytest tests/
+
+import os
+import pickle
+import random
+import re
+import string
+
+import pandas as pd
+import pytest
+
+from utils.text_normalizer import clean_text, strip_html
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ─── Reference implementations (the original regex chains) ────────────────────
+
+def _reference_clean_text(text: str) -> str:
+    if not text:
+        return ""
+    text = str(text).lower()
+    text = re.sub(r'\S+@\S+', '', text)
+    text = re.sub(r'http\S+|www\S+', '', text)
+    text = re.sub(r'<.*?>', '', text)
+    text = re.sub(r'[^\w\s.,!?]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def _reference_strip_html(html: str) -> str:
+    clean = re.sub(r'<[^>]+>', ' ', html)
+    clean = re.sub(r'&nbsp;', ' ', clean)
+    clean = re.sub(r'&amp;',  '&', clean)
+    clean = re.sub(r'&lt;',   '<', clean)
+    clean = re.sub(r'&gt;',   '>', clean)
+    clean = re.sub(r'\s+',    ' ', clean)
+    return clean.strip()
+
+
+# ─── Corpus ───────────────────────────────────────────────────────────────────
+
+_PIECES = [
+    'Fees', 'PAYMENT', 'registrar@uni.edu.ng', 'a@', '@b', '@@x', 'x@y@z',
+    'http://portal.uni.edu/a?b=1', 'www.uni.edu', 'xhttp', '<b>', '</p>',
+    '<a href="http://x.com">link</a>', '<br\n/>', '&nbsp;', '&amp;lt;',
+    '&amp;nbsp;', '&lt;i&gt;', 'İstanbul', 'naïve', 'x_y', '3.5', '—',
+    ' ', ' ', '\x1c', '\t', '\n', '\r\n', '  ',
+]
+_ALPHABET = string.ascii_letters + string.digits + "<>@.:/&;!?,'\"-_ \n\t"
+
+
+def _fuzzed(count: int = 20_000, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+
+    def one(n: int) -> str:
+        out = []
+        while sum(map(len, out)) < n:
+            if rng.random() < 0.35:
+                out.append(rng.choice(_PIECES))
+            else:
+                out.append(''.join(rng.choice(_ALPHABET) for _ in range(rng.randint(1, 9))))
+            out.append(rng.choice([' ', ' ', '', '\n']))
+        return ''.join(out)[:n]
+
+    return [one(rng.randint(0, 400)) for _ in range(count)]
+
+
+@pytest.fixture(scope='module')
+def dataset_texts() -> list[str]:
+    data_dir = os.path.join(_ROOT, 'preprocessed_data')
+    texts    = [str(t) for t in pd.read_csv(
+        os.path.join(data_dir, 'preprocessed_dataset.csv'))['text_cleaned'].tolist()]
+    with open(os.path.join(data_dir, 'data_splits.pkl'), 'rb') as f:
+        splits = pickle.load(f)
+    for split in ('X_train', 'X_val', 'X_test'):
+        texts += [str(t) for t in splits.get(split, [])]
+    return texts
+
+
+@pytest.fixture(scope='module')
+def html_texts(dataset_texts) -> list[str]:
+    return [f"<html><body><p>{t[:400]}</p>&nbsp;<br/>\n<div>&amp; {t[400:]}</div></body></html>"
+            for t in dataset_texts[:500]]
+
+
+def _mismatches(new, ref, corpus: list[str]) -> list[str]:
+    return [t for t in corpus if new(t) != ref(t)]
+
+
+# ─── Tests ────────────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize('case', _PIECES + ['', 'a @ b', 'mail me@x.com now', 'see www', '<<a>>'])
+def test_clean_text_matches_reference_on_edge_cases(case):
+    assert clean_text(case) == _reference_clean_text(case)
+
+
+def test_clean_text_matches_reference_on_dataset(dataset_texts, html_texts):
+    assert _mismatches(clean_text, _reference_clean_text, dataset_texts + html_texts) == []
+
+
+def test_clean_text_matches_reference_on_fuzzed_text():
+    assert _mismatches(clean_text, _reference_clean_text, _fuzzed()) == []
+
+
+def test_strip_html_matches_reference(html_texts):
+    assert _mismatches(strip_html, _reference_strip_html, html_texts + _fuzzed()) == []
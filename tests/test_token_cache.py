@@ -0,0 +1,76 @@
+# tests/test_token_cache.py
+# Cached and stored token ids must be exactly what the tokenizer produces,
+# and predictions must not change when they are used
+#
+#   python -m pytest tests/
+
+import numpy as np
+import pytest
+
+from models.loader import MODEL_PATH
+from models.predictor import MAX_LENGTH, clean_text, predict_emails
+from models.quantize import load_test_split
+from models.token_cache import TokenCache, read_store, tokenize, tokenizer_fingerprint, write_store
+
+
+@pytest.fixture(scope='module')
+def tokenizer():
+    transformers = pytest.importorskip('transformers')
+    return transformers.AutoTokenizer.from_pretrained(MODEL_PATH)
+
+
+@pytest.fixture(scope='module')
+def cleaned() -> list[str]:
+    x_test, _ = load_test_split()
+    return [clean_text(t) for t in x_test] + ['', 'word ' * 500]     # empty and truncated
+
+
+def _reference_ids(tokenizer, texts: list[str]) -> list[list[int]]:
+    return tokenizer(texts, max_length=MAX_LENGTH, truncation=True)['input_ids']
+
+
+def _new_cache(tokenizer) -> TokenCache:
+    return TokenCache(4096, MAX_LENGTH, tokenizer_fingerprint(MODEL_PATH, MAX_LENGTH), len(tokenizer))
+
+
+def test_cache_returns_tokenizer_ids(tokenizer, cleaned):
+    cache = _new_cache(tokenizer)
+    first = cache.encode(cleaned, tokenizer)
+    again = cache.encode(cleaned, tokenizer)
+
+    assert [a.tolist() for a in first] == _reference_ids(tokenizer, cleaned)
+    assert [a.tolist() for a in again] == [a.tolist() for a in first]
+    assert cache.misses == len(set(cleaned))        # duplicates in one batch share a lookup
+    assert cache.hits == len(cleaned)
+
+
+def test_store_round_trip_prefills_cache(tokenizer, cleaned, tmp_path):
+    cache = _new_cache(tokenizer)
+    ids   = tokenize(cleaned, tokenizer, MAX_LENGTH, cache.dtype)
+    write_store(str(tmp_path / 'X_test.npz'), cleaned, ids, cache.fingerprint, cache.dtype)
+
+    store = read_store(str(tmp_path / 'X_test.npz'))
+    assert [a.tolist() for a in store['ids']] == [a.tolist() for a in ids]
+
+    assert cache.load_stores(str(tmp_path)) == len(cleaned)
+    assert [a.tolist() for a in cache.encode(cleaned, tokenizer)] == _reference_ids(tokenizer, cleaned)
+    assert cache.misses == 0
+
+
+def test_store_from_another_tokenizer_is_ignored(tokenizer, cleaned, tmp_path):
+    cache = _new_cache(tokenizer)
+    write_store(str(tmp_path / 'old.npz'), cleaned, tokenize(cleaned, tokenizer, MAX_LENGTH),
+                'other-tokenizer', cache.dtype)
+    assert cache.load_stores(str(tmp_path)) == 0
+
+
+def test_predictions_unchanged_with_token_cache(tiny_models, tokenizer):
+    x_test, _ = load_test_split()
+    cache     = _new_cache(tokenizer)
+    plain     = predict_emails(x_test, tiny_models)
+    cached    = predict_emails(x_test, {**tiny_models, 'token_cache': cache})
+    cached   += predict_emails(x_test, {**tiny_models, 'token_cache': cache})     # all hits
+
+    for a, b in zip(plain * 2, cached):
+        assert a['class_id'] == b['class_id']
+        np.testing.assert_array_equal(a['probabilities'], b['probabilities'])
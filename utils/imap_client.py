@@ -4,12 +4,20 @@ import pathfix  # noqa
 
 import imaplib
 import email
+import hashlib
+import re
 import ssl
 import socket
+import threading
+import time
+from contextlib import contextmanager
 from email.header import decode_header
 from email.utils import parsedate_to_datetime
 from datetime import datetime
 
+from utils.metrics import span
+from utils.text_normalizer import strip_html
+
 
 def connect(host: str, port: int, username: str, password: str) -> imaplib.IMAP4_SSL:
     """
@@ -24,6 +32,7 @@ def connect(host: str, port: int, username: str, password: str) -> imaplib.IMAP4
 
         mail = imaplib.IMAP4_SSL(host, port, ssl_context=context)
         mail.login(username, password)
+        _enable_condstore(mail)
         return mail
 
     except imaplib.IMAP4.error as e:
@@ -57,33 +66,64 @@ def connect(host: str, port: int, username: str, password: str) -> imaplib.IMAP4
         raise ConnectionError(f"Unexpected error: {e}")
 
 
-def fetch_unread(mail: imaplib.IMAP4_SSL, folder: str = "INBOX", limit: int = 20) -> list[dict]:
-    """Fetch unread emails, newest first."""
+# Bytes of body text requested in partial mode — enough raw MIME to yield the
+# 2000 characters we keep, even through base64 or HTML markup
+PARTIAL_TEXT_BYTES = 16384
+
+# Max UIDs per FETCH command, keeps the command line a sane length
+_FETCH_CHUNK = 200
+
+
+def fetch_unread(
+    mail:    imaplib.IMAP4_SSL,
+    folder:  str  = "INBOX",
+    limit:   int  = 20,
+    partial: bool = True,
+) -> list[dict]:
+    """
+    Fetch unread emails, newest first.
+    With partial=True only headers and the start of the body are
+    downloaded (and the messages stay unread on the server).
+    """
     mail.select(folder, readonly=False)
-    status, messages = mail.search(None, 'UNSEEN')
+    status, messages = mail.uid('SEARCH', None, 'UNSEEN')
     if status != 'OK' or not messages[0]:
         return []
     uids = messages[0].split()[-limit:][::-1]
-    return _fetch_batch(mail, uids)
+    return _fetch_batch(mail, uids, partial=partial)
 
 
-def fetch_all_recent(mail: imaplib.IMAP4_SSL, folder: str = "INBOX", limit: int = 20) -> list[dict]:
+def fetch_all_recent(
+    mail:    imaplib.IMAP4_SSL,
+    folder:  str  = "INBOX",
+    limit:   int  = 20,
+    partial: bool = True,
+) -> list[dict]:
     """Fetch recent emails regardless of read status."""
     mail.select(folder, readonly=True)
-    status, messages = mail.search(None, 'ALL')
+    status, messages = mail.uid('SEARCH', None, 'ALL')
     if status != 'OK' or not messages[0]:
         return []
     uids = messages[0].split()[-limit:][::-1]
-    return _fetch_batch(mail, uids)
+    return _fetch_batch(mail, uids, partial=partial)
 
 
 def mark_as_read(mail: imaplib.IMAP4_SSL, uid: bytes, folder: str = "INBOX"):
-    """Mark a single email as read."""
-    try:
-        mail.select(folder, readonly=False)
-        mail.store(uid, '+FLAGS', '\\Seen')
-    except Exception as e:
-        print(f"[imap_client] mark_as_read failed: {e}")
+    """
+    Mark a single email (by UID) as read.
+
+    Errors propagate: a dropped connection has to reach ImapPool.run() to
+    be reconnected and retried, and the caller reports anything else.
+
+    Raises:
+        imaplib.IMAP4.error: The server refused the SELECT or STORE
+    """
+    status, data = mail.select(folder, readonly=False)
+    if status != 'OK':
+        raise imaplib.IMAP4.error(f"SELECT {folder} failed: {data}")
+    status, data = mail.uid('STORE', uid, '+FLAGS', '\\Seen')
+    if status != 'OK':
+        raise imaplib.IMAP4.error(f"STORE failed: {data}")
 
 
 def disconnect(mail: imaplib.IMAP4_SSL):
@@ -105,26 +145,244 @@ def test_connection(host: str, port: int, username: str, password: str) -> tuple
         return False, str(e)
 
 
+# ─── Connection Pool ──────────────────────────────────────────────────────────
+
+class ImapPool:
+    """
+    Keep-alive authenticated IMAP sessions, one per (host, port, user).
+
+    Sessions survive Streamlit reruns because the pool lives at module
+    level. An idle session is checked with NOOP before reuse and is
+    replaced transparently if the server has dropped it.
+
+    Args:
+        noop_after: Seconds a session may sit idle before reuse triggers a
+                    NOOP liveness check
+        max_idle:   Seconds after which an idle session is logged out
+                    instead of reused
+    """
+
+    # Errors meaning the socket is gone; ConnectionError from connect() is
+    # deliberately absent so bad credentials are not retried
+    _RECONNECT_ERRORS = (
+        imaplib.IMAP4.abort, ssl.SSLError, socket.timeout, EOFError,
+        BrokenPipeError, ConnectionResetError, ConnectionAbortedError,
+    )
+
+    def __init__(self, noop_after: float = 10.0, max_idle: float = 600.0):
+        self.noop_after = noop_after
+        self.max_idle   = max_idle
+        self._sessions: dict[tuple, dict] = {}
+        self._lock      = threading.Lock()
+
+    def run(self, host: str, port: int, username: str, password: str, func):
+        """
+        Call `func(mail)` on a pooled session and return its result.
+        If the connection dies mid-call, reconnect and retry once.
+        """
+        try:
+            with self.session(host, port, username, password) as mail:
+                return func(mail)
+        except self._RECONNECT_ERRORS:
+            with self.session(host, port, username, password) as mail:
+                return func(mail)
+
+    @contextmanager
+    def session(self, host: str, port: int, username: str, password: str):
+        """Context manager yielding a live, logged-in IMAP4_SSL."""
+        slot = self._slot(host, port, username)
+        with slot['lock']:
+            mail = self._checkout(slot, host, port, username, password)
+            try:
+                yield mail
+            except self._RECONNECT_ERRORS:
+                _logout_quietly(slot['mail'])
+                slot['mail'] = None
+                raise
+            finally:
+                slot['last_used'] = time.monotonic()
+
+    def close(self, host: str, port: int, username: str):
+        """Log out and forget the session for one account."""
+        with self._lock:
+            slot = self._sessions.pop((host, int(port), username), None)
+        if slot:
+            with slot['lock']:
+                if slot['mail'] is not None:
+                    disconnect(slot['mail'])
+                slot['mail'] = None
+
+    def close_all(self):
+        """Log out every pooled session."""
+        with self._lock:
+            keys = list(self._sessions)
+        for host, port, username in keys:
+            self.close(host, port, username)
+
+    def _slot(self, host: str, port: int, username: str) -> dict:
+        key = (host, int(port), username)
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = {
+                    'mail':      None,
+                    'secret':    None,
+                    'last_used': 0.0,
+                    'lock':      threading.Lock(),
+                }
+            return self._sessions[key]
+
+    def _checkout(self, slot: dict, host: str, port: int, username: str, password: str):
+        secret = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        mail   = slot['mail']
+        idle   = time.monotonic() - slot['last_used']
+
+        if mail is not None and (slot['secret'] != secret or idle > self.max_idle):
+            disconnect(mail)
+            mail = None
+        elif mail is not None and idle > self.noop_after and not _is_alive(mail):
+            _logout_quietly(mail)
+            mail = None
+
+        if mail is None:
+            mail           = connect(host, port, username, password)
+            slot['secret'] = secret
+
+        slot['mail'] = mail
+        return mail
+
+
+_pool = ImapPool()
+
+
+def get_pool() -> ImapPool:
+    """Return the process-wide IMAP session pool."""
+    return _pool
+
+
 # ─── Private Helpers ──────────────────────────────────────────────────────────
 
-def _fetch_batch(mail: imaplib.IMAP4_SSL, uids: list) -> list[dict]:
+def _enable_condstore(mail: imaplib.IMAP4_SSL):
+    """
+    Ask CONDSTORE servers (RFC 7162) to report HIGHESTMODSEQ on SELECT,
+    which lets utils/imap_sync skip unchanged folders. Best effort only.
+    """
+    try:
+        status, data = mail.capability()
+        caps = data[0].upper().split() if status == 'OK' and data and data[0] else []
+        if b'CONDSTORE' in caps and b'ENABLE' in caps:
+            mail.xatom('ENABLE', 'CONDSTORE')
+    except Exception:
+        pass
+
+
+def _is_alive(mail: imaplib.IMAP4_SSL) -> bool:
+    try:
+        status, _ = mail.noop()
+        return status == 'OK'
+    except Exception:
+        return False
+
+
+def _logout_quietly(mail: imaplib.IMAP4_SSL | None):
+    """Drop a possibly-dead connection without raising."""
+    if mail is None:
+        return
+    try:
+        mail.shutdown()
+    except Exception:
+        pass
+
+
+def _fetch_batch(mail: imaplib.IMAP4_SSL, uids: list, partial: bool = True) -> list[dict]:
+    """
+    Fetch many messages with one UID FETCH per chunk of UIDs.
+    Returns parsed emails in the same order as `uids`; messages that
+    vanished or fail to parse are skipped.
+    """
+    query = (
+        f'(UID BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{PARTIAL_TEXT_BYTES}>)'
+        if partial else '(UID RFC822)'
+    )
+    raw: dict[bytes, bytes] = {}
+    with span('fetch', items=len(uids)):
+        for start in range(0, len(uids), _FETCH_CHUNK):
+            chunk = uids[start:start + _FETCH_CHUNK]
+            try:
+                status, data = mail.uid('FETCH', _uid_set(chunk), query)
+            except imaplib.IMAP4.error as e:
+                print(f"[imap_client] batch fetch failed: {e}")
+                continue
+            if status == 'OK' and data:
+                raw.update(_parse_fetch_response(data))
+
     results = []
-    for uid in uids:
-        try:
-            parsed = _fetch_single(mail, uid)
-            if parsed:
-                results.append(parsed)
-        except Exception:
-            continue
+    with span('parse', items=len(raw)):
+        for uid in uids:
+            key = uid if isinstance(uid, bytes) else str(uid).encode()
+            if key not in raw:
+                continue
+            try:
+                results.append(_parse_message(key, raw[key]))
+            except Exception:
+                continue
     return results
 
 
-def _fetch_single(mail: imaplib.IMAP4_SSL, uid: bytes) -> dict | None:
-    status, data = mail.fetch(uid, '(RFC822)')
-    if status != 'OK' or not data or data[0] is None:
-        return None
+def _uid_set(uids: list) -> str:
+    """Compress UIDs into an IMAP sequence set, e.g. [1, 5, 9, 10, 11] → '1,5,9:11'."""
+    nums   = sorted({int(u) for u in uids})
+    ranges = []
+    for n in nums:
+        if ranges and n == ranges[-1][1] + 1:
+            ranges[-1][1] = n
+        else:
+            ranges.append([n, n])
+    return ','.join(str(a) if a == b else f"{a}:{b}" for a, b in ranges)
 
-    msg = email.message_from_bytes(data[0][1])
+
+_UID_RE     = re.compile(rb'UID (\d+)')
+_NEW_MSG_RE = re.compile(rb'^\d+ \(')
+
+
+def _parse_fetch_response(data: list) -> dict[bytes, bytes]:
+    """
+    Split an imaplib FETCH response covering many messages into
+    { uid: raw message bytes }.
+
+    imaplib returns a flat list where each literal arrives as a
+    (prefix, payload) tuple and the text between literals as plain
+    bytes, e.g. for one message fetched in partial mode:
+        (b'7 (UID 42 BODY[HEADER] {310}', b'...'),
+        (b' BODY[TEXT]<0> {2048}', b'...'),
+        b')'
+    Header and text literals of the same message are concatenated.
+    """
+    messages: dict[bytes, bytes] = {}
+    uid   = None
+    parts: list[bytes] = []
+
+    def flush():
+        if uid is not None and parts:
+            messages[uid] = b''.join(parts)
+
+    for item in data:
+        prefix = item[0] if isinstance(item, tuple) else item
+        if not isinstance(prefix, bytes):
+            continue
+        if _NEW_MSG_RE.match(prefix):
+            flush()
+            uid, parts = None, []
+        match = _UID_RE.search(prefix)
+        if match:
+            uid = match.group(1)
+        if isinstance(item, tuple) and len(item) > 1 and item[1] is not None:
+            parts.append(item[1])
+    flush()
+    return messages
+
+
+def _parse_message(uid: bytes, raw: bytes) -> dict:
+    msg = email.message_from_bytes(raw)
 
     subject  = _decode_header_value(msg.get('Subject', '(no subject)'))
     sender   = _decode_header_value(msg.get('From', ''))
@@ -179,7 +437,7 @@ def _extract_body(msg) -> str:
             if ctype == 'text/html' and not body:
                 try:
                     charset = part.get_content_charset() or 'utf-8'
-                    body    = _strip_html(
+                    body    = strip_html(
                         part.get_payload(decode=True).decode(charset, errors='replace')
                     )
                 except Exception:
@@ -191,19 +449,9 @@ def _extract_body(msg) -> str:
             if payload:
                 body = payload.decode(charset, errors='replace')
                 if msg.get_content_type() == 'text/html':
-                    body = _strip_html(body)
+                    body = strip_html(body)
         except Exception:
             body = ''
 
     return body.strip()[:2000]
 
-
-def _strip_html(html: str) -> str:
-    import re
-    clean = re.sub(r'<[^>]+>', ' ', html)
-    clean = re.sub(r'&nbsp;', ' ', clean)
-    clean = re.sub(r'&amp;',  '&', clean)
-    clean = re.sub(r'&lt;',   '<', clean)
-    clean = re.sub(r'&gt;',   '>', clean)
-    clean = re.sub(r'\s+',    ' ', clean)
-    return clean.strip()
\ No newline at end of file
@@ -0,0 +1,163 @@
+import pathfix  # noqa
+# utils/imap_sync.py
+# Incremental inbox sync — only new messages are downloaded on each refresh
+# Depends on: utils/imap_client.py
+
+import imaplib
+
+from utils.imap_client import _fetch_batch, _uid_set
+
+
+class InboxSync:
+    """
+    Incremental view of the newest `limit` messages in one folder.
+
+    Remembers the folder's UIDVALIDITY, the highest UID seen, the
+    HIGHESTMODSEQ (on CONDSTORE servers) and the already-parsed emails.
+    Each refresh then costs:
+        - nothing beyond SELECT if HIGHESTMODSEQ has not moved
+        - a `UID SEARCH ... UID n:*` for new mail, plus a UID-only search
+          over the cached set to drop messages that were read or expunged
+        - a batched FETCH of the new messages only
+    A change of UIDVALIDITY discards everything and resyncs from scratch.
+
+    Args:
+        folder:      Mailbox name
+        limit:       Number of newest messages to keep in view
+        unread_only: True → UNSEEN messages, False → all messages
+        partial:     Passed through to the batched fetch (headers + body start)
+    """
+
+    def __init__(
+        self,
+        folder:      str  = "INBOX",
+        limit:       int  = 20,
+        unread_only: bool = True,
+        partial:     bool = True,
+    ):
+        self.folder      = folder
+        self.limit       = limit
+        self.unread_only = unread_only
+        self.partial     = partial
+        self.stats       = {'refreshes': 0, 'fetched': 0, 'skipped': 0, 'full_syncs': 0}
+        self.reset()
+
+    def reset(self):
+        """Forget all sync state; the next refresh does a full search."""
+        self.uidvalidity: int | None = None
+        self.modseq:      int | None = None
+        self.last_uid     = 0
+        self.has_older    = False
+        self.messages: dict[int, dict] = {}
+
+    @property
+    def criteria(self) -> str:
+        return 'UNSEEN' if self.unread_only else 'ALL'
+
+    def refresh(self, mail: imaplib.IMAP4_SSL) -> list[dict]:
+        """
+        Bring the view up to date and return it, newest first.
+
+        Args:
+            mail: Logged-in IMAP connection (pooled or fresh)
+
+        Returns:
+            List of email dicts as produced by utils.imap_client, each
+            with the folder's 'uidvalidity' added
+        """
+        self.stats['refreshes'] += 1
+        status, _ = mail.select(self.folder, readonly=True)
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"Could not select {self.folder}")
+
+        uidvalidity = _response_int(mail, 'UIDVALIDITY')
+        modseq      = _response_int(mail, 'HIGHESTMODSEQ')
+
+        if self.uidvalidity is None or uidvalidity != self.uidvalidity:
+            self.reset()
+            self.uidvalidity = uidvalidity
+            self._full_sync(mail)
+        elif modseq is not None and modseq == self.modseq:
+            # CONDSTORE: nothing in the folder changed since the last refresh
+            self.stats['skipped'] += 1
+            return self.view()
+        else:
+            self._incremental_sync(mail)
+
+        self.modseq = modseq
+        return self.view()
+
+    def view(self) -> list[dict]:
+        """Cached emails, newest first."""
+        return [self.messages[uid] for uid in sorted(self.messages, reverse=True)]
+
+    def forget(self, uid):
+        """Drop one message from the view, e.g. after it has been approved."""
+        self.messages.pop(int(uid), None)
+
+    # ─── Private ──────────────────────────────────────────────────────────────
+
+    def _full_sync(self, mail):
+        self.stats['full_syncs'] += 1
+        uids = self._search(mail, self.criteria)
+        if uids:
+            self.last_uid = max(self.last_uid, uids[-1])
+        self.has_older = len(uids) > self.limit
+        self._fetch(mail, uids[-self.limit:])
+
+    def _incremental_sync(self, mail):
+        # Drop cached messages that no longer match (read elsewhere, expunged)
+        if self.messages:
+            still = set(self._search(mail, f"{self.criteria} UID {_uid_set(self.messages)}"))
+            for uid in [u for u in self.messages if u not in still]:
+                del self.messages[uid]
+
+        # New arrivals; `n:*` always includes the highest UID, so filter
+        new = [
+            uid for uid in self._search(mail, f"{self.criteria} UID {self.last_uid + 1}:*")
+            if uid > self.last_uid
+        ]
+        if new:
+            self.last_uid = new[-1]
+        self._fetch(mail, new)
+        self._trim()
+
+        # Backfill older matches if removals left the view short
+        missing = self.limit - len(self.messages)
+        if missing > 0 and self.has_older:
+            oldest = min(self.messages) if self.messages else self.last_uid + 1
+            older  = self._search(mail, f"{self.criteria} UID 1:{oldest - 1}") if oldest > 1 else []
+            older  = [uid for uid in older if uid < oldest]
+            self.has_older = len(older) > missing
+            self._fetch(mail, older[-missing:])
+
+    def _fetch(self, mail, uids: list[int]):
+        if not uids:
+            return
+        emails = _fetch_batch(mail, [str(uid).encode() for uid in uids], partial=self.partial)
+        self.stats['fetched'] += len(emails)
+        for em in emails:
+            em['uidvalidity'] = self.uidvalidity       # (uidvalidity, uid) names the message for good
+            self.messages[int(em['uid'])] = em
+        self._trim()
+
+    def _trim(self):
+        for uid in sorted(self.messages)[:-self.limit or None]:
+            del self.messages[uid]
+            self.has_older = True
+
+    @staticmethod
+    def _search(mail, criteria: str) -> list[int]:
+        status, data = mail.uid('SEARCH', None, criteria)
+        if status != 'OK' or not data or not data[0]:
+            return []
+        return sorted(int(uid) for uid in data[0].split())
+
+
+def _response_int(mail, code: str) -> int | None:
+    """Read an untagged response code such as [UIDVALIDITY 123] left by SELECT."""
+    _, data = mail.response(code)
+    try:
+        return int(data[-1]) if data and data[-1] is not None else None
+    except (TypeError, ValueError):
+        return None
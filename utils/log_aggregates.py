@@ -0,0 +1,179 @@
+# utils/log_aggregates.py
+# Materialized summary counts over the email log
+# Kept up to date entry-by-entry so dashboard/sidebar reads don't rescan the log
+# Full rebuilds go through a typed columnar frame and pandas/NumPy groupbys
+# Depends on: config/constants.py
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from config.constants import CATEGORIES
+
+PRIORITIES   = ['urgent', 'high', 'normal', 'low']
+CONF_BUCKETS = ['0–20%', '20–40%', '40–60%', '60–80%', '80–100%']
+
+
+def _conf_hundredths(entry: dict) -> int:
+    """Confidence as an integer number of 0.01% so add/remove never drifts."""
+    try:
+        return round(float(entry.get('confidence', 0)) * 100)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _bucket(conf_hundredths: int) -> int:
+    """Index into CONF_BUCKETS; same edges as the original 20-point ranges."""
+    return min(max(conf_hundredths // 2000, 0), len(CONF_BUCKETS) - 1)
+
+
+# ─── Columnar Frame ───────────────────────────────────────────────────────────
+
+def to_frame(entries: list[dict]) -> pd.DataFrame:
+    """
+    Load log entries into a typed columnar frame.
+
+    Columns:
+        category, priority, date: categorical
+        conf:                     int32 confidence in hundredths of a percent
+        was_overridden:           bool
+
+    Confidence is kept as exact hundredths rather than float32 so that
+    averages round exactly like the incremental path in LogAggregates.
+    """
+    conf = np.fromiter(
+        (_conf_hundredths(e) for e in entries), dtype=np.int32, count=len(entries)
+    )
+    return pd.DataFrame({
+        'category':       pd.Categorical([e.get('category') or '' for e in entries]),
+        'priority':       pd.Categorical([e.get('priority') or 'normal' for e in entries]),
+        'date':           pd.Categorical([e.get('date') or '' for e in entries]),
+        'conf':           conf,
+        'was_overridden': np.fromiter(
+            (bool(e.get('was_overridden')) for e in entries), dtype=bool, count=len(entries)
+        ),
+    })
+
+
+# ─── Aggregates ───────────────────────────────────────────────────────────────
+
+class LogAggregates:
+    """
+    Running totals over every log entry.
+
+    add() / remove() are O(1), so keeping this alongside the log store
+    turns the dashboard and sidebar summaries into dictionary lookups.
+    rebuild() computes the same totals from a columnar frame with
+    groupby/bincount instead of a per-entry Python loop.
+    Confidence sums are held in hundredths of a percent (log entries
+    store confidence rounded to 2 decimals), so they stay exact however
+    many entries are added and removed.
+
+    Attributes:
+        total:            Number of entries
+        overridden:       Entries with was_overridden set
+        conf_sum:         Sum of confidence, in hundredths
+        by_category:      {category: count}
+        conf_by_category: {category: confidence sum in hundredths}
+        by_priority:      {priority: count}
+        conf_buckets:     Counts per CONF_BUCKETS range
+        by_day:           {YYYY-MM-DD: Counter(count, conf_sum, urgent, overridden)}
+    """
+
+    def __init__(self, entries: list[dict] | None = None):
+        self.rebuild(entries or [])
+
+    def rebuild(self, entries: list[dict]):
+        """Recompute every total from scratch."""
+        self.rebuild_from_frame(to_frame(entries))
+
+    def rebuild_from_frame(self, df: pd.DataFrame):
+        """Recompute every total from a frame produced by to_frame()."""
+        by_cat  = df.groupby('category', observed=True)['conf'].agg(['size', 'sum'])
+        buckets = np.clip(df['conf'].to_numpy() // 2000, 0, len(CONF_BUCKETS) - 1)
+
+        daily = (
+            df.assign(urgent=df['priority'] == 'urgent')
+              .groupby('date', observed=True)
+              .agg(count=('conf', 'size'), conf_sum=('conf', 'sum'),
+                   urgent=('urgent', 'sum'), overridden=('was_overridden', 'sum'))
+        )
+
+        self.total            = len(df)
+        self.overridden       = int(df['was_overridden'].sum())
+        self.conf_sum         = int(df['conf'].to_numpy().sum(dtype=np.int64))
+        self.by_category      = Counter({k: int(v) for k, v in by_cat['size'].items()})
+        self.conf_by_category = Counter({k: int(v) for k, v in by_cat['sum'].items()})
+        self.by_priority      = Counter(
+            {k: int(v) for k, v in df['priority'].value_counts(sort=False).items() if v}
+        )
+        self.conf_buckets     = np.bincount(buckets, minlength=len(CONF_BUCKETS)).tolist()
+        self.by_day: dict[str, Counter] = {
+            date: Counter({k: int(v) for k, v in row.items()})
+            for date, row in daily.to_dict(orient='index').items()
+        }
+
+    def merge(self, other: 'LogAggregates'):
+        """Fold another set of totals (e.g. the Parquet archive) into this one."""
+        self.total      += other.total
+        self.overridden += other.overridden
+        self.conf_sum   += other.conf_sum
+        self.by_category.update(other.by_category)
+        self.conf_by_category.update(other.conf_by_category)
+        self.by_priority.update(other.by_priority)
+        self.conf_buckets = [a + b for a, b in zip(self.conf_buckets, other.conf_buckets)]
+        for date, day in other.by_day.items():
+            self.by_day.setdefault(date, Counter()).update(day)
+
+    def add(self, entry: dict):
+        self._apply(entry, +1)
+
+    def remove(self, entry: dict):
+        self._apply(entry, -1)
+
+    def _apply(self, entry: dict, sign: int):
+        conf     = _conf_hundredths(entry)
+        category = entry.get('category') or ''
+        priority = entry.get('priority') or 'normal'
+        date     = entry.get('date') or ''
+        override = bool(entry.get('was_overridden'))
+
+        self.total                       += sign
+        self.overridden                  += sign * override
+        self.conf_sum                    += sign * conf
+        self.by_category[category]       += sign
+        self.conf_by_category[category]  += sign * conf
+        self.by_priority[priority]       += sign
+        self.conf_buckets[_bucket(conf)] += sign
+
+        day = self.by_day.setdefault(date, Counter())
+        day['count']      += sign
+        day['conf_sum']   += sign * conf
+        day['urgent']     += sign * (priority == 'urgent')
+        day['overridden'] += sign * override
+        if day['count'] <= 0:
+            del self.by_day[date]
+
+    # ── Derived views ──────────────────────────────────────────────────────
+
+    def category_counts(self) -> dict:
+        """{category: count} for every known category (zeros included)."""
+        return {cat: self.by_category[cat] for cat in CATEGORIES}
+
+    def priority_counts(self) -> dict:
+        return {pri: self.by_priority[pri] for pri in PRIORITIES}
+
+    def avg_confidence(self) -> float:
+        return round(self.conf_sum / 100 / self.total, 1) if self.total else 0.0
+
+    def avg_confidence_by_category(self) -> dict:
+        """{category: average confidence %} for known categories with entries."""
+        return {
+            cat: round(self.conf_by_category[cat] / 100 / self.by_category[cat], 1)
+            for cat in CATEGORIES
+            if self.by_category[cat] > 0
+        }
+
+    def day(self, date: str) -> Counter:
+        return self.by_day.get(date, Counter())
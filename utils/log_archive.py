@@ -0,0 +1,250 @@
+import pathfix  # noqa
+# utils/log_archive.py
+# Cold tier for the email log — old entries as Parquet, partitioned by month
+# data/archive/month=YYYY-MM/part-<id>.parquet; log_manager decides what moves here
+# Depends on: config/constants.py, utils/log_aggregates.py
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config.constants import LOG_ARCHIVE_DIR
+from utils.log_aggregates import LogAggregates
+
+# Same columns as the SQLite store; anything else rides along as JSON in `extra`
+ARCHIVE_SCHEMA = pa.schema([
+    ('id',                pa.string()),
+    ('timestamp',         pa.timestamp('s')),
+    ('date',              pa.string()),
+    ('time',              pa.string()),
+    ('subject',           pa.string()),
+    ('body_preview',      pa.string()),
+    ('category',          pa.dictionary(pa.int32(), pa.string())),
+    ('confidence',        pa.float64()),
+    ('department',        pa.dictionary(pa.int32(), pa.string())),
+    ('priority',          pa.dictionary(pa.int32(), pa.string())),
+    ('elapsed_ms',        pa.string()),
+    ('was_overridden',    pa.bool_()),
+    ('original_category', pa.string()),
+    ('status',            pa.string()),
+    ('extra',             pa.string()),
+])
+
+# Columns LogAggregates needs — all an analytics read ever touches
+AGGREGATE_COLUMNS = ['category', 'priority', 'date', 'confidence', 'was_overridden']
+
+_BASE_COLUMNS = [f.name for f in ARCHIVE_SCHEMA if f.name != 'extra']
+
+
+# ─── Conversion ───────────────────────────────────────────────────────────────
+
+def entries_to_table(entries: list[dict]) -> pa.Table:
+    """
+    Convert log entry dicts to an Arrow table with ARCHIVE_SCHEMA.
+
+    Args:
+        entries: List of log entry dicts
+
+    Returns:
+        pyarrow.Table, one row per entry, in the given order
+    """
+    rows = []
+    for e in entries:
+        row = {c: e.get(c) for c in _BASE_COLUMNS}
+        row['timestamp']      = _parse_timestamp(e.get('timestamp'))
+        row['was_overridden'] = bool(e.get('was_overridden'))
+        try:
+            row['confidence'] = float(e.get('confidence', 0))
+        except (TypeError, ValueError):
+            row['confidence'] = 0.0
+        for c in ('elapsed_ms', 'original_category'):
+            row[c] = None if row[c] is None else str(row[c])
+        extra        = {k: v for k, v in e.items() if k not in _BASE_COLUMNS}
+        row['extra'] = json.dumps(extra, ensure_ascii=False, default=str) if extra else None
+        rows.append(row)
+    return pa.Table.from_pylist(rows, schema=ARCHIVE_SCHEMA)
+
+
+def table_to_entries(table: pa.Table) -> list[dict]:
+    """Inverse of entries_to_table(): rows back to log entry dicts."""
+    entries = []
+    for row in table.to_pylist():
+        extra = row.pop('extra', None)
+        row.pop('month', None)
+        ts = row.get('timestamp')
+        row['timestamp'] = ts.strftime('%Y-%m-%d %H:%M:%S') if ts else None
+        if extra:
+            row.update(json.loads(extra))
+        entries.append(row)
+    return entries
+
+
+# ─── Write ────────────────────────────────────────────────────────────────────
+
+_write_lock = threading.Lock()
+
+
+def write_archive(entries: list[dict], root: str = LOG_ARCHIVE_DIR) -> dict[str, int]:
+    """
+    Append entries to their month partitions.
+
+    Each call adds one new part file per month touched, so existing
+    partitions are never rewritten.
+
+    Args:
+        entries: Log entries to archive
+        root:    Archive directory
+
+    Returns:
+        { 'YYYY-MM': entries written }
+    """
+    by_month: dict[str, list[dict]] = defaultdict(list)
+    for e in entries:
+        by_month[_month_of(e)].append(e)
+
+    written = {}
+    with _write_lock:
+        for month, month_entries in sorted(by_month.items()):
+            part_dir = os.path.join(root, f"month={month}")
+            os.makedirs(part_dir, exist_ok=True)
+            path = os.path.join(part_dir, f"part-{uuid.uuid4().hex[:12]}.parquet")
+            tmp  = path + '.tmp'
+            pq.write_table(entries_to_table(month_entries), tmp, compression='zstd')
+            os.replace(tmp, path)
+            written[month] = len(month_entries)
+    return written
+
+
+def clear_archive(root: str = LOG_ARCHIVE_DIR) -> bool:
+    """Delete every archived partition."""
+    try:
+        with _write_lock:
+            if os.path.isdir(root):
+                shutil.rmtree(root)
+        return True
+    except OSError as e:
+        print(f"[log_archive] clear → FAILED: {e}")
+        return False
+
+
+# ─── Read ─────────────────────────────────────────────────────────────────────
+
+def archive_months(root: str = LOG_ARCHIVE_DIR) -> list[str]:
+    """Months present in the archive, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        d.name.split('=', 1)[1] for d in os.scandir(root)
+        if d.is_dir() and d.name.startswith('month=')
+    )
+
+
+def read_archive(
+    columns:    list[str] | None = None,
+    month_from: str | None = None,
+    month_to:   str | None = None,
+    root:       str = LOG_ARCHIVE_DIR,
+) -> pa.Table:
+    """
+    Read archived entries, touching only the requested columns and months.
+
+    Args:
+        columns:    Columns to read (None = all)
+        month_from: First month 'YYYY-MM' to include (None = no bound)
+        month_to:   Last month 'YYYY-MM' to include (None = no bound)
+        root:       Archive directory
+
+    Returns:
+        pyarrow.Table (empty, with the requested columns, if nothing matches)
+    """
+    cols = columns or [f.name for f in ARCHIVE_SCHEMA]
+    if not archive_months(root):
+        return ARCHIVE_SCHEMA.empty_table().select(cols)
+
+    dataset = ds.dataset(root, format='parquet', partitioning='hive', schema=_dataset_schema())
+    month   = ds.field('month')
+    filt    = None
+    if month_from:
+        filt = month >= month_from
+    if month_to:
+        filt = (month <= month_to) if filt is None else filt & (month <= month_to)
+    return dataset.to_table(columns=cols, filter=filt)
+
+
+def load_archived_entries(**kwargs) -> list[dict]:
+    """read_archive() as log entry dicts, oldest part first."""
+    return table_to_entries(read_archive(**kwargs))
+
+
+def archive_signature(root: str = LOG_ARCHIVE_DIR) -> tuple:
+    """(month, part name, size, mtime) of every part file; changes when parts are added."""
+    sig = []
+    for month in archive_months(root):
+        part_dir = os.path.join(root, f"month={month}")
+        for f in sorted(os.scandir(part_dir), key=lambda f: f.name):
+            if f.name.endswith('.parquet'):
+                st_ = f.stat()
+                sig.append((month, f.name, st_.st_size, st_.st_mtime_ns))
+    return tuple(sig)
+
+
+_agg_lock  = threading.Lock()
+_agg_cache = {'key': None, 'agg': None}
+
+
+def archive_aggregates(root: str = LOG_ARCHIVE_DIR) -> LogAggregates:
+    """
+    LogAggregates over every archived entry.
+
+    Reads only AGGREGATE_COLUMNS. Part files are immutable, so the
+    result is cached until a part is added or removed.
+    """
+    key = archive_signature(root)
+    with _agg_lock:
+        if _agg_cache['key'] == key:
+            return _agg_cache['agg']
+
+    table = read_archive(AGGREGATE_COLUMNS, root=root)
+    df    = table.to_pandas()
+    frame = pd.DataFrame({
+        'category':       pd.Categorical(df['category'].astype(object).fillna('')),
+        'priority':       pd.Categorical(df['priority'].astype(object).fillna('normal')),
+        'date':           pd.Categorical(df['date'].fillna('')),
+        'conf':           np.round(df['confidence'].fillna(0).to_numpy() * 100).astype(np.int32),
+        'was_overridden': df['was_overridden'].fillna(False).to_numpy(dtype=bool),
+    })
+    agg = LogAggregates()
+    agg.rebuild_from_frame(frame)
+
+    with _agg_lock:
+        _agg_cache['key'] = key
+        _agg_cache['agg'] = agg
+    return agg
+
+
+# ─── Private Helpers ──────────────────────────────────────────────────────────
+
+def _dataset_schema() -> pa.Schema:
+    return ARCHIVE_SCHEMA.append(pa.field('month', pa.string()))
+
+
+def _parse_timestamp(value) -> datetime | None:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return None
+
+
+def _month_of(entry: dict) -> str:
+    date = entry.get('date') or entry.get('timestamp') or ''
+    return date[:7] if len(date) >= 7 else 'unknown'
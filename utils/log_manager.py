@@ -1,16 +1,28 @@
 # utils/log_manager.py
 # Handles all email log operations — save, load, filter, export
-# Log is stored as a JSON file at data/email_log.json
-# Depends on: config/constants.py
+# Log is stored by the backend chosen in LOG_BACKEND (see utils/log_store.py)
+# Old entries can be moved to the Parquet archive (see utils/log_archive.py)
+# Depends on: config/constants.py, utils/log_store.py, utils/log_aggregates.py,
+#             utils/log_archive.py, utils/metrics.py
 
-import json
+import csv
+import io
 import os
+import threading
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from config.constants import LOG_FILE_PATH, CATEGORIES
+from config.constants import LOG_FILE_PATH, LOG_ARCHIVE_AFTER_DAYS, LOG_EXPORT_CHUNK_ROWS
+from utils.log_store import get_store
+from utils.log_aggregates import LogAggregates
+from utils.log_archive import (
+    archive_aggregates, archive_signature, write_archive, clear_archive, entries_to_table,
+)
+from utils.metrics import span
 
 
 # ─── Ensure data directory exists ─────────────────────────────────────────────
@@ -25,43 +37,155 @@ def _ensure_data_dir():
         print(f"[log_manager] _ensure_data_dir → FAILED: {e}")
 
 
+# ─── Shared Snapshot ──────────────────────────────────────────────────────────
+# Sidebar, dashboard, landing and log pages all call load_log() on every
+# rerun. The parsed log is kept once per process and only re-read when a
+# writer in this process bumps _log_version or the backing file's
+# mtime/size changes (another process wrote to it).
+
+_snapshot_lock = threading.Lock()
+_snapshot      = {'key': None, 'entries': []}
+_log_version   = 0
+
+
+def _bump_version():
+    """Invalidate the shared snapshot after a write through this module."""
+    global _log_version
+    with _snapshot_lock:
+        _log_version += 1
+
+
+def _state_key(store) -> tuple:
+    return (id(store), _log_version, _disk_signature(store))
+
+
+def _disk_signature(store) -> tuple:
+    """(mtime_ns, size) of the store's file(s); SQLite also writes to its -wal file."""
+    path  = getattr(store, 'path', None)
+    if not path:
+        return ()
+    paths = [path, path + '-wal'] if path.endswith('.db') else [path]
+    sig   = []
+    for p in paths:
+        try:
+            st_ = os.stat(p)
+            sig.append((st_.st_mtime_ns, st_.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+# ─── Aggregates ───────────────────────────────────────────────────────────────
+# Totals cover the hot log plus the Parquet archive. Writes made through
+# this module are folded in entry by entry. Any change the aggregates
+# didn't see (another process, a failed write) leaves _agg_key stale and
+# forces one rebuild on the next read.
+
+_agg_lock   = threading.RLock()
+_aggregates = LogAggregates()
+_agg_key    = None
+
+
+def get_aggregates() -> LogAggregates:
+    """
+    Return the process-wide LogAggregates, rebuilt only if the log
+    changed behind its back. Treat the result as read-only.
+    """
+    global _agg_key
+    with _agg_lock:
+        store = get_store()
+        key   = (_state_key(store), archive_signature())
+        if _agg_key != key:
+            _rebuild_aggregates(load_log())
+            _agg_key = key
+        return _aggregates
+
+
+def _rebuild_aggregates(hot_entries: list[dict]):
+    _aggregates.rebuild(hot_entries)
+    _aggregates.merge(archive_aggregates())
+
+
+def _tracked_write(write, added=None, removed=None, replaced=None) -> bool:
+    """
+    Run a store write and keep the snapshot and aggregates in step.
+
+    Args:
+        write:    Zero-argument callable performing the write, returns bool
+        added:    Entry appended by the write
+        removed:  Entry deleted by the write
+        replaced: Full new entry list for save_all / clear
+
+    Returns:
+        Result of write()
+    """
+    global _agg_key
+    with _agg_lock:
+        store  = get_store()
+        before = (_state_key(store), archive_signature())
+        ok     = write()
+        _bump_version()
+        if not ok:
+            return ok
+        if replaced is not None:
+            _rebuild_aggregates(replaced)
+        elif _agg_key == before:
+            if added is not None:
+                _aggregates.add(added)
+            if removed is not None:
+                _aggregates.remove(removed)
+        else:
+            return ok                    # stale already; rebuilt on next read
+        _agg_key = (_state_key(store), archive_signature())
+        return ok
+
+
 # ─── Load & Save ──────────────────────────────────────────────────────────────
 
 def load_log() -> list[dict]:
     """
-    Load all email log entries from the JSON file.
+    Load all email log entries, served from the shared in-memory snapshot
+    unless the log changed since it was taken.
 
     Returns:
         List of log entry dicts, newest first.
-        Empty list if file does not exist or is corrupt.
+        Empty list if the log does not exist or is corrupt.
+        The list is a fresh copy; the entry dicts are shared and
+        should be treated as read-only.
     """
     _ensure_data_dir()
-    print(f"[log_manager] LOG_FILE_PATH = {LOG_FILE_PATH}")
-    print(f"[log_manager] file exists   = {os.path.exists(LOG_FILE_PATH)}")
-    if not os.path.exists(LOG_FILE_PATH):
-        return []
-    try:
-        with open(LOG_FILE_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    except (json.JSONDecodeError, IOError):
-        return []
+    store = get_store()
+    key   = _state_key(store)
+    with _snapshot_lock:
+        if _snapshot['key'] == key:
+            return list(_snapshot['entries'])
+
+    entries = store.load()
+    with _snapshot_lock:
+        # A write may have raced the load; only cache if nothing moved
+        if key == _state_key(store):
+            _snapshot['key']     = key
+            _snapshot['entries'] = entries
+    return list(entries)
+
+
+def iter_log() -> Iterator[dict]:
+    """
+    Yield log entries newest first without loading the whole log.
+    Stop iterating early to read only the most recent entries.
+    """
+    _ensure_data_dir()
+    yield from get_store().iter_newest_first()
 
 
 def save_log(entries: list[dict]) -> bool:
     """
-    Save the full log list back to the JSON file.
+    Replace the full log with the given list (newest first).
     """
-    try:
-        _ensure_data_dir()
-        print(f"[log_manager] save_log → writing {len(entries)} entries to {LOG_FILE_PATH}")
-        with open(LOG_FILE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(entries, f, indent=2, ensure_ascii=False)
-        print(f"[log_manager] save_log → SUCCESS, file exists: {os.path.exists(LOG_FILE_PATH)}")
-        return True
-    except Exception as e:
-        print(f"[log_manager] save_log → FAILED: {e}")
-        return False
+    _ensure_data_dir()
+    print(f"[log_manager] save_log → writing {len(entries)} entries")
+    store = get_store()
+    return _tracked_write(lambda: store.save_all(entries), replaced=entries)
 
 
 # ─── Add Entry ────────────────────────────────────────────────────────────────
@@ -78,7 +202,7 @@ def add_log_entry(
     original_category: str | None = None,
 ) -> dict:
     """
-    Create a new log entry and prepend it to the log file.
+    Create a new log entry and append it to the log store.
 
     Args:
         subject:           Email subject line
@@ -111,9 +235,10 @@ def add_log_entry(
         'status':            'routed',
     }
 
-    entries = load_log()
-    entries.insert(0, entry)   # newest first
-    save_log(entries)
+    with span('log'):
+        _ensure_data_dir()
+        store = get_store()
+        _tracked_write(lambda: store.append(entry), added=entry)
 
     return entry
 
@@ -130,19 +255,50 @@ def delete_log_entry(entry_id: str) -> bool:
     Returns:
         True if found and deleted, False otherwise
     """
-    entries = load_log()
-    original_len = len(entries)
-    entries = [e for e in entries if e.get('id') != entry_id]
-
-    if len(entries) == original_len:
+    _ensure_data_dir()
+    store   = get_store()
+    removed = next((e for e in load_log() if e.get('id') == entry_id), None)
+    if removed is None:
         return False
-
-    return save_log(entries)
+    return _tracked_write(lambda: store.delete(entry_id), removed=removed)
 
 
 def clear_log() -> bool:
-    """Delete all log entries."""
-    return save_log([])
+    """Delete all log entries, including the Parquet archive."""
+    _ensure_data_dir()
+    store = get_store()
+    return _tracked_write(lambda: store.clear() and clear_archive(), replaced=[])
+
+
+# ─── Archive ──────────────────────────────────────────────────────────────────
+
+def archive_old_entries(older_than_days: int = LOG_ARCHIVE_AFTER_DAYS) -> int:
+    """
+    Move entries older than `older_than_days` from the hot log into the
+    month-partitioned Parquet archive.
+
+    Entries are written to the archive before they are removed from the
+    hot log, so a crash in between can duplicate entries but never lose them.
+
+    Args:
+        older_than_days: Age threshold in days
+
+    Returns:
+        Number of entries archived
+    """
+    _ensure_data_dir()
+    cutoff  = (datetime.now() - timedelta(days=older_than_days)).strftime('%Y-%m-%d')
+    entries = load_log()
+    old     = [e for e in entries if e.get('date') and e['date'] < cutoff]
+    if not old:
+        return 0
+
+    written = write_archive(old)
+    print(f"[log_manager] archive → {len(old)} entries into {sorted(written)}")
+    old_ids = {id(e) for e in old}
+    if not save_log([e for e in entries if id(e) not in old_ids]):
+        return 0
+    return len(old)
 
 
 # ─── Filter & Search ──────────────────────────────────────────────────────────
@@ -237,12 +393,114 @@ def sort_log(
     )
 
 
+# ─── Query (filter + sort + page) ─────────────────────────────────────────────
+
+def query_log(
+    category:       str  = "All",
+    priority:       str  = "All",
+    date_from:      str  = None,
+    date_to:        str  = None,
+    search_query:   str  = "",
+    overrides_only: bool = False,
+    sort_by:        str  = 'timestamp',
+    ascending:      bool = False,
+    limit:          int  = None,
+    offset:         int  = 0,
+) -> tuple[list[dict], int]:
+    """
+    Filter, sort and slice the stored log in one call.
+
+    Backends that support it (SQLite) run the whole query in the
+    database; the file backends fall back to filter_log() + sort_log().
+
+    Args:
+        category … overrides_only: Same as filter_log()
+        sort_by, ascending:        Same as sort_log()
+        limit:                     Max entries to return (None = all)
+        offset:                    Number of matching entries to skip
+
+    Returns:
+        (matching entries for the requested slice, total number of matches)
+    """
+    _ensure_data_dir()
+    store = get_store()
+    if hasattr(store, 'query'):
+        return store.query(
+            category=category, priority=priority,
+            date_from=date_from, date_to=date_to,
+            search_query=search_query, overrides_only=overrides_only,
+            sort_by=sort_by, ascending=ascending,
+            limit=limit, offset=offset,
+        )
+
+    filtered = filter_log(
+        load_log(),
+        category=category, priority=priority,
+        date_from=date_from, date_to=date_to,
+        search_query=search_query, overrides_only=overrides_only,
+    )
+    filtered = sort_log(filtered, sort_by=sort_by, ascending=ascending)
+    end      = offset + limit if limit is not None else None
+    return filtered[offset:end], len(filtered)
+
+
 # ─── Export ───────────────────────────────────────────────────────────────────
 
+# Column order and headers for CSV export
+EXPORT_COLUMNS = {
+    'id':                'ID',
+    'timestamp':         'Timestamp',
+    'subject':           'Subject',
+    'category':          'Category',
+    'confidence':        'Confidence (%)',
+    'department':        'Department',
+    'priority':          'Priority',
+    'elapsed_ms':        'Inference (ms)',
+    'was_overridden':    'Manually Overridden',
+    'original_category': 'Original AI Category',
+    'status':            'Status',
+    'body_preview':      'Body Preview',
+}
+
+
+def iter_csv_chunks(
+    entries:    Iterable[dict],
+    columns:    list[str] | None = None,
+    chunk_rows: int = LOG_EXPORT_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """
+    Encode log entries as CSV, yielding UTF-8 bytes every `chunk_rows` rows.
+
+    Args:
+        entries:    Any iterable of log entry dicts (consumed lazily)
+        columns:    Keys of EXPORT_COLUMNS to write (None = all)
+        chunk_rows: Rows buffered before a chunk is yielded
+
+    Yields:
+        CSV byte chunks; the first one carries the header row
+    """
+    columns = columns or list(EXPORT_COLUMNS)
+    buf     = io.StringIO()
+    writer  = csv.writer(buf, lineterminator='\n')
+    writer.writerow([EXPORT_COLUMNS[c] for c in columns])
+
+    for i, e in enumerate(entries, 1):
+        writer.writerow([e.get(c) for c in columns])
+        if i % chunk_rows == 0:
+            yield buf.getvalue().encode('utf-8')
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode('utf-8')
+
+
 def export_to_csv(entries: list[dict]) -> bytes:
     """
     Convert log entries to a CSV byte string for download.
 
+    Only columns present in at least one entry are written. For large
+    logs prefer export_query_csv(), which never holds every entry in memory.
+
     Args:
         entries: List of log entry dicts
 
@@ -251,40 +509,91 @@ def export_to_csv(entries: list[dict]) -> bytes:
     """
     if not entries:
         return b""
+    present = set().union(*entries)
+    columns = [c for c in EXPORT_COLUMNS if c in present]
+    return b"".join(iter_csv_chunks(entries, columns))
 
-    df = pd.DataFrame(entries)
-
-    # Reorder and rename columns for clean export
-    export_cols = {
-        'id':                'ID',
-        'timestamp':         'Timestamp',
-        'subject':           'Subject',
-        'category':          'Category',
-        'confidence':        'Confidence (%)',
-        'department':        'Department',
-        'priority':          'Priority',
-        'elapsed_ms':        'Inference (ms)',
-        'was_overridden':    'Manually Overridden',
-        'original_category': 'Original AI Category',
-        'status':            'Status',
-        'body_preview':      'Body Preview',
-    }
 
-    # Only include columns that exist
-    available = [c for c in export_cols if c in df.columns]
-    df = df[available].rename(columns={c: export_cols[c] for c in available})
+def iter_query_log(chunk_rows: int = LOG_EXPORT_CHUNK_ROWS, **query) -> Iterator[dict]:
+    """
+    Yield every entry matching a query_log() filter, in sort order.
 
-    return df.to_csv(index=False).encode('utf-8')
+    SQLite streams one cursor `chunk_rows` rows at a time, so at most one
+    chunk of entries is held at once; the file backends iterate over the
+    shared snapshot.
+
+    Args:
+        chunk_rows: Rows fetched per step from stores that run queries themselves
+        **query:    query_log() filter and sort arguments (no limit/offset)
+    """
+    _ensure_data_dir()
+    store = get_store()
+    if hasattr(store, 'iter_query'):
+        yield from store.iter_query(chunk_rows=chunk_rows, **query)
+        return
+    yield from query_log(**query)[0]
+
+
+def export_query_csv(**query) -> bytes:
+    """
+    CSV of the log entries matching a query_log() filter.
+
+    Meant to be passed (wrapped in a lambda) as the `data` callable of
+    st.download_button, so the export only runs when the button is
+    clicked. Entries are streamed and encoded chunk by chunk, so only the
+    CSV bytes themselves are held in memory — Streamlit needs the whole
+    download as one bytes object anyway.
+
+    Args:
+        **query: query_log() filter and sort arguments
+
+    Returns:
+        UTF-8 encoded CSV bytes
+    """
+    return b"".join(iter_csv_chunks(iter_query_log(**query)))
+
+
+def export_to_parquet(entries: list[dict]) -> bytes:
+    """
+    Convert log entries to Parquet bytes for download.
+
+    Args:
+        entries: List of log entry dicts
+
+    Returns:
+        Parquet file bytes (zstd-compressed)
+    """
+    buf = io.BytesIO()
+    pq.write_table(entries_to_table(entries), buf, compression='zstd')
+    return buf.getvalue()
+
+
+def export_to_arrow(entries: list[dict]) -> bytes:
+    """
+    Convert log entries to an Arrow IPC (Feather v2) file for download.
+
+    Args:
+        entries: List of log entry dicts
+
+    Returns:
+        Arrow IPC file bytes
+    """
+    table = entries_to_table(entries)
+    sink  = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
 
 
 # ─── Statistics Helpers ───────────────────────────────────────────────────────
 
-def get_log_summary(entries: list[dict]) -> dict:
+def get_log_summary(entries: list[dict] | None = None) -> dict:
     """
     Compute quick summary counts from the log for the dashboard.
 
     Args:
-        entries: Full list of log entries
+        entries: List of log entries to summarise, or None (default) to
+                 read the maintained aggregates for the whole log in O(1)
 
     Returns:
         dict with keys:
@@ -296,38 +605,16 @@ def get_log_summary(entries: list[dict]) -> dict:
             - by_category   (dict)  { category: count }
             - by_priority   (dict)  { priority: count }
     """
-    if not entries:
-        return {
-            'total':          0,
-            'today':          0,
-            'overridden':     0,
-            'urgent':         0,
-            'avg_confidence': 0.0,
-            'by_category':    {cat: 0 for cat in CATEGORIES},
-            'by_priority':    {'urgent': 0, 'high': 0, 'normal': 0, 'low': 0},
-        }
-
+    agg   = get_aggregates() if entries is None else LogAggregates(entries)
     today = datetime.now().strftime('%Y-%m-%d')
-
-    by_category = {cat: 0 for cat in CATEGORIES}
-    by_priority = {'urgent': 0, 'high': 0, 'normal': 0, 'low': 0}
-    total_conf  = 0.0
-
-    for e in entries:
-        cat = e.get('category', '')
-        pri = e.get('priority', 'normal')
-        if cat in by_category:
-            by_category[cat] += 1
-        if pri in by_priority:
-            by_priority[pri] += 1
-        total_conf += float(e.get('confidence', 0))
+    by_priority = agg.priority_counts()
 
     return {
-        'total':          len(entries),
-        'today':          sum(1 for e in entries if e.get('date') == today),
-        'overridden':     sum(1 for e in entries if e.get('was_overridden')),
+        'total':          agg.total,
+        'today':          agg.day(today)['count'],
+        'overridden':     agg.overridden,
         'urgent':         by_priority['urgent'],
-        'avg_confidence': round(total_conf / len(entries), 1) if entries else 0.0,
-        'by_category':    by_category,
+        'avg_confidence': agg.avg_confidence(),
+        'by_category':    agg.category_counts(),
         'by_priority':    by_priority,
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,684 @@
+import pathfix  # noqa
+# utils/log_store.py
+# Storage backends for the email log
+# log_manager.py talks to whichever backend LOG_BACKEND selects
+# Depends on: config/constants.py
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:              # Windows: no flock, a single writer process is assumed
+    fcntl = None
+
+from config.constants import (
+    LOG_BACKEND, LOG_FILE_PATH, LOG_JSONL_PATH, LOG_SQLITE_PATH,
+    LOG_FSYNC_EVERY, LOG_FSYNC_INTERVAL, LOG_COMPACT_AFTER,
+)
+
+
+# ─── Legacy JSON Array ────────────────────────────────────────────────────────
+
+class JsonLogStore:
+    """
+    The original format: one JSON array, newest first, rewritten on every change.
+    Kept for compatibility and as the migration source for other backends.
+    """
+
+    def __init__(self, path: str = LOG_FILE_PATH):
+        self.path = path
+
+    def load(self) -> list[dict]:
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data if isinstance(data, list) else []
+        except (json.JSONDecodeError, IOError):
+            return []
+
+    def iter_newest_first(self) -> Iterator[dict]:
+        yield from self.load()
+
+    def save_all(self, entries: list[dict]) -> bool:
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=2, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"[log_store] save_all → FAILED: {e}")
+            return False
+
+    def append(self, entry: dict) -> bool:
+        entries = self.load()
+        entries.insert(0, entry)
+        return self.save_all(entries)
+
+    def delete(self, entry_id: str) -> bool:
+        entries = self.load()
+        kept    = [e for e in entries if e.get('id') != entry_id]
+        if len(kept) == len(entries):
+            return False
+        return self.save_all(kept)
+
+    def clear(self) -> bool:
+        return self.save_all([])
+
+    def flush(self):
+        pass
+
+
+# ─── Append-only JSON Lines ───────────────────────────────────────────────────
+
+class JsonlLogStore:
+    """
+    Append-only JSON-lines log, oldest first on disk.
+
+    - add:    one line appended; fsync is batched (every LOG_FSYNC_EVERY
+              appends or LOG_FSYNC_INTERVAL seconds, and at exit)
+    - delete: a {"_deleted": id} tombstone line is appended
+    - read:   the file is scanned backwards, so newest-first readers can
+              stop early without parsing the whole log
+    - compact: rewrites the file without tombstoned entries; runs
+              automatically once LOG_COMPACT_AFTER tombstones pile up
+
+    Appends and rewrites hold an flock on `<path>.lock`, so several
+    Streamlit processes can share one log: a compaction can't drop an
+    append made by another process between its load() and os.replace().
+    Without fcntl (Windows) only one process may write the file.
+    """
+
+    def __init__(
+        self,
+        path:           str   = LOG_JSONL_PATH,
+        fsync_every:    int   = LOG_FSYNC_EVERY,
+        fsync_interval: float = LOG_FSYNC_INTERVAL,
+        compact_after:  int   = LOG_COMPACT_AFTER,
+    ):
+        self.path           = path
+        self.fsync_every    = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.compact_after  = compact_after
+        self._lock          = threading.RLock()
+        self._lock_fd       = None       # held flock on <path>.lock, if any
+        self._unsynced      = 0
+        self._last_fsync    = time.monotonic()
+        self._tombstones    = None       # unknown until the first full scan
+        atexit.register(self.flush)
+
+    # ── Reads ──────────────────────────────────────────────────────────────
+
+    def iter_newest_first(self) -> Iterator[dict]:
+        """Yield live entries newest first, reading the file from the end."""
+        deleted: set = set()
+        for line in _read_lines_reversed(self.path):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue                 # torn final line after a crash
+            if not isinstance(record, dict):
+                continue
+            if '_deleted' in record:
+                deleted.add(record['_deleted'])
+                continue
+            if record.get('id') in deleted:
+                continue
+            yield record
+
+    def load(self) -> list[dict]:
+        entries, tombstones = [], 0
+        deleted: set = set()
+        for line in _read_lines_reversed(self.path):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            if '_deleted' in record:
+                deleted.add(record['_deleted'])
+                tombstones += 1
+            elif record.get('id') not in deleted:
+                entries.append(record)
+        self._tombstones = tombstones
+        return entries
+
+    # ── Writes ─────────────────────────────────────────────────────────────
+
+    def append(self, entry: dict) -> bool:
+        return self._write_line(entry)
+
+    def delete(self, entry_id: str) -> bool:
+        if not any(e.get('id') == entry_id for e in self.iter_newest_first()):
+            return False
+        if not self._write_line({'_deleted': entry_id}):
+            return False
+        with self._lock:
+            if self._tombstones is not None:
+                self._tombstones += 1
+                if self._tombstones >= self.compact_after:
+                    self.compact()
+        return True
+
+    def save_all(self, entries: list[dict]) -> bool:
+        """Replace the whole log with `entries` (given newest first)."""
+        with self._locked():
+            ok = _atomic_write_lines(self.path, reversed(entries))
+            if ok:
+                self._tombstones = 0
+                self._unsynced   = 0
+            return ok
+
+    def clear(self) -> bool:
+        return self.save_all([])
+
+    def compact(self) -> bool:
+        """Rewrite the file with only live entries, dropping tombstones."""
+        with self._locked():
+            print(f"[log_store] compacting {self.path}")
+            return self.save_all(self.load())
+
+    def flush(self):
+        """fsync any appended lines not yet on stable storage."""
+        with self._lock:
+            if self._unsynced and os.path.exists(self.path):
+                try:
+                    fd = os.open(self.path, os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                except OSError as e:
+                    print(f"[log_store] fsync failed: {e}")
+            self._unsynced   = 0
+            self._last_fsync = time.monotonic()
+
+    def _write_line(self, record: dict) -> bool:
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._locked():
+            try:
+                _truncate_partial_line(self.path)
+                with open(self.path, 'ab') as f:
+                    f.write(line)
+                    self._unsynced += 1
+                    due = (
+                        self._unsynced >= self.fsync_every
+                        or time.monotonic() - self._last_fsync >= self.fsync_interval
+                    )
+                    if due:
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self._unsynced   = 0
+                        self._last_fsync = time.monotonic()
+                return True
+            except Exception as e:
+                print(f"[log_store] append → FAILED: {e}")
+                return False
+
+    @contextmanager
+    def _locked(self):
+        """This store's thread lock plus an exclusive flock on `<path>.lock`."""
+        with self._lock:
+            if self._lock_fd is not None or fcntl is None:   # re-entered (compact → save_all)
+                yield
+                return
+            fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                self._lock_fd = fd
+                yield
+            finally:
+                self._lock_fd = None
+                os.close(fd)             # releases the flock
+
+
+# ─── SQLite ───────────────────────────────────────────────────────────────────
+
+# Columns stored natively; any other entry keys go into the `extra` JSON column
+_SQL_COLUMNS = [
+    'id', 'timestamp', 'date', 'time', 'subject', 'body_preview', 'category',
+    'confidence', 'department', 'priority', 'elapsed_ms', 'was_overridden',
+    'original_category', 'status',
+]
+
+_INSERT_SQL = (
+    f"INSERT OR REPLACE INTO log ({', '.join(_SQL_COLUMNS)}, extra) "
+    f"VALUES ({', '.join('?' for _ in range(len(_SQL_COLUMNS) + 1))})"
+)
+
+_SCHEMA_VERSION = 1              # PRAGMA user_version
+
+_SQL_SORTABLE = {'timestamp', 'confidence', 'category', 'department', 'priority'}
+
+_PRIORITY_ORDER_SQL = (
+    "CASE priority WHEN 'urgent' THEN 0 WHEN 'high' THEN 1 "
+    "WHEN 'normal' THEN 2 WHEN 'low' THEN 3 ELSE 2 END"
+)
+
+
+class SqliteLogStore:
+    """
+    SQLite-backed log with indexes on date, category, priority and
+    was_overridden, plus an FTS5 index over subject, body preview,
+    category and department for search.
+
+    Unlike the file stores it implements query(), so the log page's
+    filters, sorting and LIMIT/OFFSET run inside SQLite instead of over
+    a Python list of every entry.
+    """
+
+    def __init__(self, path: str = LOG_SQLITE_PATH):
+        self.path   = path
+        self._local = threading.local()
+        self.fts    = None           # 'trigram' | 'unicode61' | None (no FTS5)
+        self._init_schema()
+
+    # ── Connection / schema ────────────────────────────────────────────────
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # INSERT OR REPLACE deletes the old row; only with recursive
+            # triggers does that deletion fire log_fts_ad and unindex it
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS log (
+                    seq               INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id                TEXT NOT NULL UNIQUE,
+                    timestamp         TEXT,
+                    date              TEXT,
+                    time              TEXT,
+                    subject           TEXT,
+                    body_preview      TEXT,
+                    category          TEXT,
+                    confidence        REAL,
+                    department        TEXT,
+                    priority          TEXT,
+                    elapsed_ms        TEXT,
+                    was_overridden    INTEGER,
+                    original_category TEXT,
+                    status            TEXT,
+                    extra             TEXT
+                )
+            """)
+            for column in ('date', 'category', 'priority', 'was_overridden', 'timestamp'):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_log_{column} ON log({column})")
+
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                with conn:
+                    conn.execute(f"""
+                        CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+                            subject, body_preview, category, department,
+                            content='log', content_rowid='seq', tokenize='{tokenizer}'
+                        )
+                    """)
+                    conn.executescript("""
+                        CREATE TRIGGER IF NOT EXISTS log_fts_ai AFTER INSERT ON log BEGIN
+                            INSERT INTO log_fts(rowid, subject, body_preview, category, department)
+                            VALUES (new.seq, new.subject, new.body_preview, new.category, new.department);
+                        END;
+                        CREATE TRIGGER IF NOT EXISTS log_fts_ad AFTER DELETE ON log BEGIN
+                            INSERT INTO log_fts(log_fts, rowid, subject, body_preview, category, department)
+                            VALUES ('delete', old.seq, old.subject, old.body_preview, old.category, old.department);
+                        END;
+                    """)
+                row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'log_fts'").fetchone()
+                self.fts = 'trigram' if 'trigram' in row['sql'] else 'unicode61'
+                break
+            except sqlite3.OperationalError:
+                continue
+
+        # Version 1: files written before recursive_triggers was on may hold
+        # FTS rows for replaced entries — rebuild the index once
+        if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            try:
+                with conn:
+                    if self.fts:
+                        conn.execute("INSERT INTO log_fts(log_fts) VALUES ('rebuild')")
+                    conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            except sqlite3.OperationalError as e:
+                print(f"[log_store] FTS rebuild → FAILED: {e}")
+
+    # ── Reads ──────────────────────────────────────────────────────────────
+
+    def iter_newest_first(self) -> Iterator[dict]:
+        cursor = self._conn().execute("SELECT * FROM log ORDER BY seq DESC")
+        for row in cursor:
+            yield _row_to_entry(row)
+
+    def load(self) -> list[dict]:
+        return list(self.iter_newest_first())
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM log").fetchone()[0]
+
+    def query(
+        self,
+        category:       str  = "All",
+        priority:       str  = "All",
+        date_from:      str  = None,
+        date_to:        str  = None,
+        search_query:   str  = "",
+        overrides_only: bool = False,
+        sort_by:        str  = 'timestamp',
+        ascending:      bool = False,
+        limit:          int  = None,
+        offset:         int  = 0,
+    ) -> tuple[list[dict], int]:
+        """
+        Filter, sort and page the log in SQL.
+        Same semantics as log_manager.filter_log() + sort_log().
+
+        Returns:
+            (entries on the requested page, total number of matches)
+        """
+        where_sql, params, order_sql = self._select_clauses(
+            category, priority, date_from, date_to, search_query, overrides_only, sort_by, ascending,
+        )
+        conn  = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM log {where_sql}", params).fetchone()[0]
+        sql   = f"SELECT * FROM log {where_sql} {order_sql}"
+
+        page_params = list(params)
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            page_params += [int(limit), int(offset)]
+        elif offset:
+            sql += " LIMIT -1 OFFSET ?"
+            page_params.append(int(offset))
+
+        rows = conn.execute(sql, page_params).fetchall()
+        return [_row_to_entry(r) for r in rows], total
+
+    def iter_query(
+        self,
+        category:       str  = "All",
+        priority:       str  = "All",
+        date_from:      str  = None,
+        date_to:        str  = None,
+        search_query:   str  = "",
+        overrides_only: bool = False,
+        sort_by:        str  = 'timestamp',
+        ascending:      bool = False,
+        chunk_rows:     int  = 1000,
+    ) -> Iterator[dict]:
+        """
+        Every entry query() would match, in the same order, streamed from a
+        single cursor `chunk_rows` rows at a time (no COUNT, no OFFSET).
+        """
+        where_sql, params, order_sql = self._select_clauses(
+            category, priority, date_from, date_to, search_query, overrides_only, sort_by, ascending,
+        )
+        cursor = self._conn().execute(f"SELECT * FROM log {where_sql} {order_sql}", params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    return
+                for row in rows:
+                    yield _row_to_entry(row)
+        finally:
+            cursor.close()
+
+    def _select_clauses(
+        self, category, priority, date_from, date_to, search_query, overrides_only, sort_by, ascending,
+    ) -> tuple[str, list, str]:
+        """WHERE clause, its parameters and ORDER BY clause shared by query() and iter_query()."""
+        where, params = [], []
+        if category != "All":
+            where.append("category = ?")
+            params.append(category)
+        if priority != "All":
+            where.append("priority = ?")
+            params.append(priority)
+        if date_from:
+            where.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("date <= ?")
+            params.append(date_to)
+        if overrides_only:
+            where.append("was_overridden = 1")
+
+        q = (search_query or "").strip()
+        if q:
+            clause, args = self._search_clause(q)
+            where.append(clause)
+            params.extend(args)
+
+        if sort_by == 'priority':
+            order_expr = _PRIORITY_ORDER_SQL
+        elif sort_by in _SQL_SORTABLE:
+            order_expr = sort_by
+        else:
+            order_expr = 'seq'
+        direction = 'ASC' if ascending else 'DESC'
+        # Ties keep newest-first order, matching Python's stable sort_log()
+        order_sql = f"ORDER BY {order_expr} {direction}, seq DESC"
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        return where_sql, params, order_sql
+
+    def _search_clause(self, q: str) -> tuple[str, list]:
+        """
+        Case-insensitive substring match on subject, body preview, category
+        and department. The trigram FTS index can answer substrings of 3+
+        characters; shorter queries (or no FTS5) fall back to LIKE.
+        """
+        if self.fts == 'trigram' and len(q) >= 3:
+            phrase = '"' + q.replace('"', '""') + '"'
+            return "seq IN (SELECT rowid FROM log_fts WHERE log_fts MATCH ?)", [phrase]
+        like = '%' + q.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        columns = ('subject', 'body_preview', 'category', 'department')
+        clause  = ' OR '.join(f"lower({c}) LIKE ? ESCAPE '\\'" for c in columns)
+        return f"({clause})", [like] * len(columns)
+
+    # ── Writes ─────────────────────────────────────────────────────────────
+
+    def append(self, entry: dict) -> bool:
+        return self._insert([entry])
+
+    def delete(self, entry_id: str) -> bool:
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM log WHERE id = ?", (entry_id,)).rowcount > 0
+
+    def save_all(self, entries: list[dict]) -> bool:
+        conn = self._conn()
+        try:
+            with conn:                   # one transaction: a crash never leaves an empty log
+                conn.execute("DELETE FROM log")
+                conn.executemany(_INSERT_SQL, (_entry_to_row(e) for e in reversed(entries)))
+            return True
+        except sqlite3.Error as e:
+            print(f"[log_store] save_all → FAILED: {e}")
+            return False
+
+    def clear(self) -> bool:
+        return self.save_all([])
+
+    def flush(self):
+        pass
+
+    def _insert(self, entries: list[dict]) -> bool:
+        """Insert entries given oldest first."""
+        conn = self._conn()
+        try:
+            with conn:
+                conn.executemany(_INSERT_SQL, (_entry_to_row(e) for e in entries))
+            return True
+        except sqlite3.Error as e:
+            print(f"[log_store] insert → FAILED: {e}")
+            return False
+
+
+def _entry_to_row(entry: dict) -> tuple:
+    extra = {k: v for k, v in entry.items() if k not in _SQL_COLUMNS}
+    row   = [entry.get(c) for c in _SQL_COLUMNS]
+    row[_SQL_COLUMNS.index('was_overridden')] = 1 if entry.get('was_overridden') else 0
+    return (*row, json.dumps(extra, ensure_ascii=False) if extra else None)
+
+
+def _row_to_entry(row: sqlite3.Row) -> dict:
+    entry = {c: row[c] for c in _SQL_COLUMNS}
+    entry['was_overridden'] = bool(entry['was_overridden'])
+    if row['extra']:
+        entry.update(json.loads(row['extra']))
+    return entry
+
+
+# ─── Migration ────────────────────────────────────────────────────────────────
+
+def migrate_json_to_jsonl(json_path: str = LOG_FILE_PATH, jsonl_path: str = LOG_JSONL_PATH) -> int:
+    """
+    Copy entries from the legacy JSON array file into a JSON-lines file.
+    Does nothing if the JSON-lines file already exists. The source file is
+    left untouched.
+
+    Returns:
+        Number of entries migrated
+    """
+    if os.path.exists(jsonl_path) or not os.path.exists(json_path):
+        return 0
+    entries = JsonLogStore(json_path).load()
+    if not _atomic_write_lines(jsonl_path, reversed(entries)):
+        return 0
+    print(f"[log_store] migrated {len(entries)} entries → {jsonl_path}")
+    return len(entries)
+
+
+# ─── Backend Selection ────────────────────────────────────────────────────────
+
+_stores: dict = {}
+_stores_lock = threading.Lock()
+
+
+def migrate_to_sqlite(store: 'SqliteLogStore') -> int:
+    """
+    Import the existing file-based log into an empty SQLite store.
+    Prefers the JSON-lines file, falling back to the legacy JSON array.
+
+    Returns:
+        Number of entries imported
+    """
+    if store.count() > 0:
+        return 0
+    if os.path.exists(LOG_JSONL_PATH):
+        entries = JsonlLogStore(LOG_JSONL_PATH).load()
+    else:
+        entries = JsonLogStore(LOG_FILE_PATH).load()
+    if not entries or not store.save_all(entries):
+        return 0
+    print(f"[log_store] migrated {len(entries)} entries → {store.path}")
+    return len(entries)
+
+
+def get_store(backend: str = LOG_BACKEND):
+    """
+    Return the process-wide store for `backend` ('json' | 'jsonl' | 'sqlite').
+    The first access to a new backend migrates the existing log into it.
+    """
+    with _stores_lock:
+        if backend not in _stores:
+            os.makedirs(os.path.dirname(LOG_FILE_PATH), exist_ok=True)
+            if backend == 'json':
+                _stores[backend] = JsonLogStore()
+            elif backend == 'jsonl':
+                migrate_json_to_jsonl()
+                _stores[backend] = JsonlLogStore()
+            elif backend == 'sqlite':
+                store = SqliteLogStore()
+                migrate_to_sqlite(store)
+                _stores[backend] = store
+            else:
+                raise ValueError(f"Unknown LOG_BACKEND: {backend!r}")
+        return _stores[backend]
+
+
+# ─── Private Helpers ──────────────────────────────────────────────────────────
+
+def _read_lines_reversed(path: str, block_size: int = 1 << 16) -> Iterator[str]:
+    """Yield non-empty lines of a UTF-8 text file from last to first."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos  = f.tell()
+        tail = b''
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + tail
+            lines = chunk.split(b'\n')
+            tail  = lines.pop(0)        # may be a partial line; finish it next round
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode('utf-8', errors='replace')
+        if tail.strip():
+            yield tail.decode('utf-8', errors='replace')
+
+
+def _truncate_partial_line(path: str, block_size: int = 1 << 16):
+    """
+    Cut off a final line left without its newline by a crash, so the next
+    append starts on a clean line instead of being glued onto the fragment
+    (and then skipped by load() as undecodable).
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return
+    if not size:
+        return
+    with open(path, 'r+b') as f:
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+        pos, good = size, 0
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            newline = f.read(step).rfind(b'\n')
+            if newline >= 0:
+                good = pos + newline + 1
+                break
+        f.truncate(good)
+    print(f"[log_store] dropped {size - good} bytes of a torn line at the end of {path}")
+
+
+def _atomic_write_lines(path: str, records) -> bool:
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        print(f"[log_store] write {path} → FAILED: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
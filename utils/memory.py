@@ -0,0 +1,99 @@
+import pathfix  # noqa
+# utils/memory.py
+# Resident vs shared memory per process, from /proc/<pid>/smaps_rollup (Linux)
+# Used to size hosts running several Streamlit processes with memory-mapped weights
+# Depends on: models/loader.py (CLI only)
+#
+#   python -m utils.memory              # load the models here, report before/after
+#   python -m utils.memory PID [PID …]  # report running processes (e.g. streamlit workers)
+
+import os
+
+# smaps_rollup fields reported, in kB on disk
+_FIELDS = (
+    'Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty',
+    'Private_Clean', 'Private_Dirty', 'Anonymous', 'Swap',
+)
+
+
+def memory_report(pid: int | str = 'self') -> dict | None:
+    """
+    Memory of one process, split by how it can be shared.
+
+    Args:
+        pid: Process id, or 'self'
+
+    Returns:
+        dict of MB values with keys: rss, pss, shared, private, anonymous,
+        file_backed, swap — or None where smaps_rollup is unavailable
+        (non-Linux, kernel < 4.14, or another user's process)
+
+        shared      — pages also mapped by another process (e.g. the same
+                      model.safetensors in a second worker)
+        file_backed — rss - anonymous: mapped files; clean pages here are
+                      page cache and become shared once a second process
+                      maps the same file
+        pss         — rss with shared pages split between their users;
+                      summing pss over workers gives the host total
+    """
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    kb = dict.fromkeys(_FIELDS, 0)
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].rstrip(':') in kb:
+            kb[parts[0].rstrip(':')] = int(parts[1])
+
+    mb = lambda v: round(v / 1024, 1)
+    return {
+        'rss':         mb(kb['Rss']),
+        'pss':         mb(kb['Pss']),
+        'shared':      mb(kb['Shared_Clean'] + kb['Shared_Dirty']),
+        'private':     mb(kb['Private_Clean'] + kb['Private_Dirty']),
+        'anonymous':   mb(kb['Anonymous']),
+        'file_backed': mb(kb['Rss'] - kb['Anonymous']),
+        'swap':        mb(kb['Swap']),
+    }
+
+
+def format_report(report: dict | None) -> str:
+    """One-line summary of memory_report() for logs."""
+    if report is None:
+        return "memory report unavailable (needs /proc/<pid>/smaps_rollup)"
+    return (
+        f"rss {report['rss']:.0f} MB (pss {report['pss']:.0f}, "
+        f"shared {report['shared']:.0f}, file-backed {report['file_backed']:.0f}, "
+        f"anonymous {report['anonymous']:.0f})"
+    )
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+if __name__ == '__main__':
+    import sys
+
+    pids = sys.argv[1:]
+    if pids:
+        for pid in pids:
+            print(f"[memory] pid {pid:>7}  {format_report(memory_report(pid))}")
+        total = [memory_report(pid) for pid in pids]
+        if all(total):
+            print(f"[memory] total pss {sum(r['pss'] for r in total):.0f} MB over {len(pids)} processes")
+        sys.exit(0)
+
+    from models.loader import build_models
+
+    before = memory_report()
+    models = build_models(quantize=False)
+    after  = memory_report()
+    print(f"[memory] backend {models['backend']}"
+          f"{' (snapshot)' if models.get('from_snapshot') else ''}")
+    print(f"[memory] before load  {format_report(before)}")
+    print(f"[memory] after load   {format_report(after)}")
+    if before and after:
+        print(f"[memory] model load added {after['anonymous'] - before['anonymous']:.0f} MB private anonymous, "
+              f"{after['file_backed'] - before['file_backed']:.0f} MB file-backed (shareable)")
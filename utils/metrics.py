@@ -0,0 +1,234 @@
+import pathfix  # noqa
+# utils/metrics.py
+# In-process latency histograms for each stage of the pipeline
+# fetch → parse → clean → tokenize → pad → infer → validate → log
+# Exported as Prometheus text or JSON (models/server.py, or METRICS_PORT here)
+# Depends on: config/constants.py
+#
+#   with span('tokenize', items=len(texts)):
+#       ...
+
+import bisect
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.constants import METRICS_ENABLED, METRICS_BUCKETS
+
+METRIC_NAME = 'email_triage_stage_seconds'
+
+
+# ─── Histogram ────────────────────────────────────────────────────────────────
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (Prometheus style: the last bucket is +Inf).
+
+    Args:
+        buckets: Ascending upper bounds in seconds
+    """
+
+    def __init__(self, buckets: tuple = METRICS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts  = [0] * (len(self.buckets) + 1)
+        self.count   = 0
+        self.items   = 0
+        self.sum     = 0.0
+
+    def observe(self, seconds: float, items: int = 1):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.items += items
+        self.sum   += seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the q-quantile in seconds by linear interpolation inside
+        its bucket (what Prometheus' histogram_quantile() does).
+        """
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class Registry:
+    """Thread-safe set of histograms, one per stage name."""
+
+    def __init__(self, buckets: tuple = METRICS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._stages: dict[str, Histogram] = {}
+        self._lock   = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, items: int = 1):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = Histogram(self.buckets)
+            hist.observe(seconds, items)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Summary per stage.
+
+        Returns:
+            { stage: { count, items, total_ms, mean_ms, p50_ms, p95_ms, p99_ms } }
+            count is spans, items is emails (a batched span covers several)
+        """
+        with self._lock:
+            out = {}
+            for stage, h in sorted(self._stages.items()):
+                out[stage] = {
+                    'count':    h.count,
+                    'items':    h.items,
+                    'total_ms': round(h.sum * 1000, 3),
+                    'mean_ms':  round(h.sum * 1000 / h.count, 3) if h.count else 0.0,
+                    'p50_ms':   round(h.quantile(0.50) * 1000, 3),
+                    'p95_ms':   round(h.quantile(0.95) * 1000, 3),
+                    'p99_ms':   round(h.quantile(0.99) * 1000, 3),
+                }
+            return out
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            f"# HELP {METRIC_NAME} Wall time per pipeline stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        items = [
+            "# HELP email_triage_stage_items_total Emails processed per pipeline stage.",
+            "# TYPE email_triage_stage_items_total counter",
+        ]
+        with self._lock:
+            for stage, h in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float('inf'),), h.counts):
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {h.sum!r}')
+                lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {h.count}')
+                items.append(f'email_triage_stage_items_total{{stage="{stage}"}} {h.items}')
+        return '\n'.join(lines + items) + '\n'
+
+
+REGISTRY = Registry()
+
+
+# ─── Recording ────────────────────────────────────────────────────────────────
+
+@contextmanager
+def span(stage: str, items: int = 1):
+    """
+    Time the enclosed block with perf_counter_ns and record it under `stage`.
+    Recorded even if the block raises. No-op when METRICS_ENABLED is off.
+
+    Args:
+        stage: Stage name ('fetch', 'clean', 'tokenize', 'infer', …)
+        items: Emails the block handles (batch size for batched stages)
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(stage, (time.perf_counter_ns() - t0) / 1e9, items)
+
+
+def record(stage: str, started_ns: int, items: int = 1):
+    """
+    Record a span started at `started_ns` (time.perf_counter_ns()) and
+    ending now — for stages that should only count when they succeed.
+    """
+    if METRICS_ENABLED:
+        REGISTRY.observe(stage, (time.perf_counter_ns() - started_ns) / 1e9, items)
+
+
+def timed(stage: str):
+    """Decorator form of span() for a function that is a whole stage."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> dict:
+    """REGISTRY.snapshot() for this process."""
+    return REGISTRY.snapshot()
+
+
+# ─── Export ───────────────────────────────────────────────────────────────────
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics (Prometheus text) and /metrics.json; usable by any http.server."""
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self.send_metrics()
+        elif self.path == '/metrics.json':
+            self.send_metrics_json()
+        else:
+            self.send_error(404)
+
+    def send_metrics(self):
+        self._send_body(REGISTRY.render_prometheus().encode('utf-8'), 'text/plain; version=0.0.4')
+
+    def send_metrics_json(self):
+        self._send_body(json.dumps(snapshot()).encode('utf-8'), 'application/json')
+
+    def _send_body(self, data: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass                                  # scraped every few seconds — keep quiet
+
+
+_server_lock   = threading.Lock()
+_server: ThreadingHTTPServer | None = None
+_server_failed = False                       # bind failed once; app.py calls us on every rerun
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer | None:
+    """
+    Serve /metrics and /metrics.json from a daemon thread, once per process.
+    Used by the Streamlit app when METRICS_PORT is set.
+
+    Returns:
+        The server, or None if the port is unavailable (not retried)
+    """
+    global _server, _server_failed
+    with _server_lock:
+        if _server is not None or _server_failed:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            _server_failed = True
+            print(f"[metrics] could not listen on {host}:{port}: {e}")
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name='metrics', daemon=True).start()
+        print(f"[metrics] serving http://{host}:{port}/metrics")
+        return _server
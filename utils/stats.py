@@ -1,32 +1,42 @@
 # utils/stats.py
 # Statistics calculations for the dashboard
-# Depends on: config/constants.py, utils/log_manager.py
+# Depends on: config/constants.py, utils/log_manager.py, utils/log_aggregates.py
+#
+# Every function takes an optional `entries` list. Passing None (the
+# default) reads the aggregates log_manager maintains for the whole log,
+# so the dashboard never rescans every entry. A LogAggregates built once
+# can also be passed in place of the list to reuse it across calls.
 
 from datetime import datetime, timedelta
-from collections import defaultdict
 
 import pandas as pd
 
-from config.constants import CATEGORIES, CATEGORY_COLORS, PRIORITY_CONFIG
+from config.constants import CATEGORY_COLORS, PRIORITY_CONFIG
+from utils.log_aggregates import LogAggregates, CONF_BUCKETS
+from utils.log_manager import get_aggregates
+
+
+def _aggregates(entries: list[dict] | LogAggregates | None) -> LogAggregates:
+    if entries is None:
+        return get_aggregates()
+    if isinstance(entries, LogAggregates):
+        return entries
+    return LogAggregates(entries)
 
 
 # ─── Category Distribution ────────────────────────────────────────────────────
 
-def category_distribution(entries: list[dict]) -> pd.DataFrame:
+def category_distribution(entries: list[dict] | None = None) -> pd.DataFrame:
     """
     Count emails per category for a pie / bar chart.
 
     Args:
-        entries: List of log entry dicts
+        entries: List of log entry dicts (None = whole log)
 
     Returns:
         DataFrame with columns: category, count, color, percentage
     """
-    counts = {cat: 0 for cat in CATEGORIES}
-    for e in entries:
-        cat = e.get('category', '')
-        if cat in counts:
-            counts[cat] += 1
+    counts = _aggregates(entries).category_counts()
 
     total = sum(counts.values()) or 1
 
@@ -41,30 +51,27 @@ def category_distribution(entries: list[dict]) -> pd.DataFrame:
         if count > 0
     ]
 
+    if not rows:
+        return pd.DataFrame(columns=['category', 'count', 'color', 'percentage'])
+
     return pd.DataFrame(rows).sort_values('count', ascending=False)
 
 
 # ─── Confidence Distribution ──────────────────────────────────────────────────
 
-def confidence_distribution(entries: list[dict]) -> pd.DataFrame:
+def confidence_distribution(entries: list[dict] | None = None) -> pd.DataFrame:
     """
     Bucket confidence scores into ranges for a histogram.
 
     Buckets: 0–20, 20–40, 40–60, 60–80, 80–100
 
     Args:
-        entries: List of log entry dicts
+        entries: List of log entry dicts (None = whole log)
 
     Returns:
         DataFrame with columns: range, count, color
     """
-    buckets = {
-        '0–20%':   0,
-        '20–40%':  0,
-        '40–60%':  0,
-        '60–80%':  0,
-        '80–100%': 0,
-    }
+    buckets = dict(zip(CONF_BUCKETS, _aggregates(entries).conf_buckets))
     colors = {
         '0–20%':   '#EF4444',
         '20–40%':  '#F97316',
@@ -73,19 +80,6 @@ def confidence_distribution(entries: list[dict]) -> pd.DataFrame:
         '80–100%': '#10B981',
     }
 
-    for e in entries:
-        conf = float(e.get('confidence', 0))
-        if conf < 20:
-            buckets['0–20%'] += 1
-        elif conf < 40:
-            buckets['20–40%'] += 1
-        elif conf < 60:
-            buckets['40–60%'] += 1
-        elif conf < 80:
-            buckets['60–80%'] += 1
-        else:
-            buckets['80–100%'] += 1
-
     rows = [
         {'range': k, 'count': v, 'color': colors[k]}
         for k, v in buckets.items()
@@ -96,7 +90,7 @@ def confidence_distribution(entries: list[dict]) -> pd.DataFrame:
 # ─── Volume Over Time ─────────────────────────────────────────────────────────
 
 def volume_over_time(
-    entries:     list[dict],
+    entries:     list[dict] | None = None,
     period:      str = 'daily',
     last_n_days: int = 30,
 ) -> pd.DataFrame:
@@ -104,64 +98,50 @@ def volume_over_time(
     Count emails classified per time period for a line/bar chart.
 
     Args:
-        entries:     List of log entry dicts
+        entries:     List of log entry dicts (None = whole log)
         period:      'daily' | 'weekly' | 'monthly'
         last_n_days: How many days back to include
 
     Returns:
         DataFrame with columns: period, count
     """
-    if not entries:
+    agg = _aggregates(entries)
+    if not agg.total:
         return pd.DataFrame(columns=['period', 'count'])
 
-    cutoff = datetime.now() - timedelta(days=last_n_days)
-    counts: dict = defaultdict(int)
+    # Per-day counts from the aggregates, bucketed with vectorized date ops
+    days = pd.Series({d: day['count'] for d, day in agg.by_day.items()}, dtype='int64')
+    dts  = pd.to_datetime(days.index, format='%Y-%m-%d', errors='coerce')
+    keep = dts.notna() & (dts >= datetime.now() - timedelta(days=last_n_days))
+    days, dts = days[keep], dts[keep]
 
-    for e in entries:
-        try:
-            dt = datetime.strptime(e.get('date', ''), '%Y-%m-%d')
-        except ValueError:
-            continue
-
-        if dt < cutoff:
-            continue
-
-        if period == 'daily':
-            key = dt.strftime('%Y-%m-%d')
-        elif period == 'weekly':
-            key = f"W{dt.isocalendar()[1]} {dt.year}"
-        else:
-            key = dt.strftime('%b %Y')
-
-        counts[key] += 1
-
-    if not counts:
+    if days.empty:
         return pd.DataFrame(columns=['period', 'count'])
 
-    df = pd.DataFrame(
-        [{'period': k, 'count': v} for k, v in sorted(counts.items())]
-    )
-    return df
+    if period == 'daily':
+        keys = dts.strftime('%Y-%m-%d')
+    elif period == 'weekly':
+        keys = 'W' + dts.isocalendar().week.astype(str).to_numpy() + ' ' + dts.year.astype(str)
+    else:
+        keys = dts.strftime('%b %Y')
+
+    counts = days.groupby(keys.to_numpy()).sum().sort_index()
+    return pd.DataFrame({'period': counts.index, 'count': counts.to_numpy()})
 
 
 # ─── Priority Breakdown ───────────────────────────────────────────────────────
 
-def priority_breakdown(entries: list[dict]) -> pd.DataFrame:
+def priority_breakdown(entries: list[dict] | None = None) -> pd.DataFrame:
     """
     Count emails per priority level.
 
     Args:
-        entries: List of log entry dicts
+        entries: List of log entry dicts (None = whole log)
 
     Returns:
         DataFrame with columns: priority, label, count, color, badge
     """
-    counts = {'urgent': 0, 'high': 0, 'normal': 0, 'low': 0}
-
-    for e in entries:
-        pri = e.get('priority', 'normal')
-        if pri in counts:
-            counts[pri] += 1
+    counts = _aggregates(entries).priority_counts()
 
     rows = [
         {
@@ -175,6 +155,9 @@ def priority_breakdown(entries: list[dict]) -> pd.DataFrame:
         if count > 0
     ]
 
+    if not rows:
+        return pd.DataFrame(columns=['priority', 'label', 'count', 'color', 'badge'])
+
     priority_order = {'urgent': 0, 'high': 1, 'normal': 2, 'low': 3}
     return pd.DataFrame(rows).sort_values(
         'priority', key=lambda s: s.map(priority_order)
@@ -183,12 +166,12 @@ def priority_breakdown(entries: list[dict]) -> pd.DataFrame:
 
 # ─── Top Categories ───────────────────────────────────────────────────────────
 
-def top_categories(entries: list[dict], n: int = 5) -> list[dict]:
+def top_categories(entries: list[dict] | None = None, n: int = 5) -> list[dict]:
     """
     Return the N most frequent email categories.
 
     Args:
-        entries: List of log entry dicts
+        entries: List of log entry dicts (None = whole log)
         n:       Number of top categories to return
 
     Returns:
@@ -202,18 +185,19 @@ def top_categories(entries: list[dict], n: int = 5) -> list[dict]:
 
 # ─── Override Rate ────────────────────────────────────────────────────────────
 
-def override_rate(entries: list[dict]) -> dict:
+def override_rate(entries: list[dict] | None = None) -> dict:
     """
     Calculate the manual override rate.
 
     Args:
-        entries: List of log entry dicts
+        entries: List of log entry dicts (None = whole log)
 
     Returns:
         dict with keys: total, overridden, rate_pct, accuracy_pct
     """
-    total      = len(entries)
-    overridden = sum(1 for e in entries if e.get('was_overridden'))
+    agg        = _aggregates(entries)
+    total      = agg.total
+    overridden = agg.overridden
     rate       = round(overridden / total * 100, 1) if total else 0.0
     accuracy   = round(100 - rate, 1)
 
@@ -227,33 +211,24 @@ def override_rate(entries: list[dict]) -> dict:
 
 # ─── Average Confidence Per Category ─────────────────────────────────────────
 
-def avg_confidence_by_category(entries: list[dict]) -> pd.DataFrame:
+def avg_confidence_by_category(entries: list[dict] | None = None) -> pd.DataFrame:
     """
     Compute average confidence score per category.
 
     Args:
-        entries: List of log entry dicts
+        entries: List of log entry dicts (None = whole log)
 
     Returns:
         DataFrame with columns: category, avg_confidence, color
         Sorted by avg_confidence descending
     """
-    totals: dict = defaultdict(list)
-
-    for e in entries:
-        cat  = e.get('category', '')
-        conf = float(e.get('confidence', 0))
-        if cat in CATEGORIES:
-            totals[cat].append(conf)
-
     rows = [
         {
             'category':       cat,
-            'avg_confidence': round(sum(vals) / len(vals), 1),
+            'avg_confidence': avg,
             'color':          CATEGORY_COLORS.get(cat, '#6495ed'),
         }
-        for cat, vals in totals.items()
-        if vals
+        for cat, avg in _aggregates(entries).avg_confidence_by_category().items()
     ]
 
     if not rows:
@@ -264,20 +239,20 @@ def avg_confidence_by_category(entries: list[dict]) -> pd.DataFrame:
 
 # ─── Daily Stats Summary ──────────────────────────────────────────────────────
 
-def daily_summary(entries: list[dict]) -> dict:
+def daily_summary(entries: list[dict] | None = None) -> dict:
     """
     Compute stats for today only.
 
     Args:
-        entries: Full log entry list
+        entries: Full log entry list (None = whole log)
 
     Returns:
         dict with keys: count, avg_confidence, urgent_count, override_count
     """
     today = datetime.now().strftime('%Y-%m-%d')
-    today_entries = [e for e in entries if e.get('date') == today]
+    day   = _aggregates(entries).day(today)
 
-    if not today_entries:
+    if not day['count']:
         return {
             'count':          0,
             'avg_confidence': 0.0,
@@ -285,11 +260,50 @@ def daily_summary(entries: list[dict]) -> dict:
             'override_count': 0,
         }
 
-    confidences = [float(e.get('confidence', 0)) for e in today_entries]
-
     return {
-        'count':          len(today_entries),
-        'avg_confidence': round(sum(confidences) / len(confidences), 1),
-        'urgent_count':   sum(1 for e in today_entries if e.get('priority') == 'urgent'),
-        'override_count': sum(1 for e in today_entries if e.get('was_overridden')),
-    }
\ No newline at end of file
+        'count':          day['count'],
+        'avg_confidence': round(day['conf_sum'] / 100 / day['count'], 1),
+        'urgent_count':   day['urgent'],
+        'override_count': day['overridden'],
+    }
+
+# ─── Benchmark ────────────────────────────────────────────────────────────────
+# python -m utils.stats [N ...]   (from the project root)
+# Times the per-function rescans this module replaced (each dashboard
+# widget looped over every entry on its own) against one columnar
+# rebuild. The baseline and the equality check live in tests/test_stats.py.
+
+if __name__ == '__main__':
+    import importlib.util
+    import os
+    import sys
+    import time
+
+    _spec = importlib.util.spec_from_file_location(
+        'test_stats',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'test_stats.py'),
+    )
+    _bench = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_bench)
+
+    sizes = [int(a) for a in sys.argv[1:]] or [100_000, 1_000_000]
+    for n in sizes:
+        entries = _bench.synthetic(n)
+
+        t0     = time.perf_counter()
+        _bench.dashboard(entries, _bench.BASELINE)
+        t_base = time.perf_counter() - t0
+
+        t0    = time.perf_counter()
+        agg   = LogAggregates(entries)
+        t_col = time.perf_counter() - t0
+
+        t0     = time.perf_counter()
+        _bench.dashboard(agg, _bench.CURRENT)
+        t_dash = time.perf_counter() - t0
+
+        print(
+            f"[stats] n={n:>9,}  baseline rescans {t_base:6.2f}s  "
+            f"columnar rebuild + stats {t_col + t_dash:6.2f}s  ({t_base / (t_col + t_dash):4.1f}×)  "
+            f"stats from live aggregates {t_dash * 1000:5.1f}ms"
+        )
@@ -0,0 +1,127 @@
+# utils/text_normalizer.py
+# Text normalization shared by the IMAP client (HTML bodies) and the predictor
+# Precompiled patterns; passes are merged or skipped only where the result is
+# identical to the original regex chain (enforced by tests/test_text_normalizer.py)
+# Depends on: nothing (stdlib re)
+#
+#   python -m utils.text_normalizer    # micro-benchmark against the regex chain
+
+import re
+
+# A whitespace-delimited token with an '@' that has characters on both
+# sides. Same matches as r'\S+@\S+', but anchored at token starts instead
+# of being retried (with backtracking) at every position of the text.
+_ADDRESS = re.compile(r'(?<!\S)(?=\S+@\S)\S+')
+_URL     = re.compile(r'http\S+|www\S+')
+_TAG     = re.compile(r'<.*?>')               # clean_text: tags on one line
+_HTML    = re.compile(r'<[^>]+>')             # strip_html: tags may span lines
+_SPECIAL = re.compile(r'[^\w\s.,!?]')
+
+# Applied in this order, like the chain of re.sub() calls they replace
+_ENTITIES = (('&nbsp;', ' '), ('&amp;', '&'), ('&lt;', '<'), ('&gt;', '>'))
+
+
+def clean_text(text: str) -> str:
+    """
+    Clean and normalize raw email text before tokenization.
+
+    Steps:
+        - Lowercase
+        - Remove email addresses
+        - Remove URLs
+        - Strip HTML tags
+        - Collapse whitespace
+
+    Args:
+        text: Raw email string
+
+    Returns:
+        Cleaned string
+    """
+    if not text:
+        return ""
+    text = str(text).lower()
+    if '@' in text:
+        text = _ADDRESS.sub('', text)                 # remove emails
+    if 'http' in text or 'www' in text:
+        text = _URL.sub('', text)                     # remove URLs
+    if '<' in text:
+        text = _TAG.sub('', text)                     # strip HTML tags
+    text = _SPECIAL.sub(' ', text)                    # remove special chars
+    return ' '.join(text.split())                     # collapse whitespace
+
+
+def strip_html(html: str) -> str:
+    """
+    Reduce an HTML email body to plain text.
+
+    Tags become spaces, the common entities (&nbsp; &amp; &lt; &gt;) are
+    decoded, and whitespace is collapsed.
+
+    Args:
+        html: Decoded text/html payload
+
+    Returns:
+        Plain-text string
+    """
+    if '<' in html:
+        html = _HTML.sub(' ', html)
+    if '&' in html:
+        for entity, char in _ENTITIES:
+            html = html.replace(entity, char)
+    return ' '.join(html.split())
+
+
+# ─── Micro-benchmark ──────────────────────────────────────────────────────────
+# python -m utils.text_normalizer   (from the project root)
+# "before" is the regex chain this module replaced; equality with it is
+# checked by tests/test_text_normalizer.py, not here.
+
+if __name__ == '__main__':
+    import os
+    import timeit
+
+    import pandas as pd
+
+    _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def _reference_clean_text(text: str) -> str:
+        if not text:
+            return ""
+        text = str(text).lower()
+        text = re.sub(r'\S+@\S+', '', text)
+        text = re.sub(r'http\S+|www\S+', '', text)
+        text = re.sub(r'<.*?>', '', text)
+        text = re.sub(r'[^\w\s.,!?]', ' ', text)
+        text = re.sub(r'\s+', ' ', text).strip()
+        return text
+
+    def _reference_strip_html(html: str) -> str:
+        clean = re.sub(r'<[^>]+>', ' ', html)
+        clean = re.sub(r'&nbsp;', ' ', clean)
+        clean = re.sub(r'&amp;',  '&', clean)
+        clean = re.sub(r'&lt;',   '<', clean)
+        clean = re.sub(r'&gt;',   '>', clean)
+        clean = re.sub(r'\s+',    ' ', clean)
+        return clean.strip()
+
+    # ── 2000-character bodies ──────────────────────────────────────────────
+    dataset = pd.read_csv(os.path.join(_ROOT, 'preprocessed_data', 'preprocessed_dataset.csv'))
+    joined  = ' '.join(str(t) for t in dataset['text_cleaned'].tolist())
+    plain   = [joined[i * 2000:(i + 1) * 2000] for i in range(100)]
+    contact = [b[:1000] + ' Mail registrar@uni.edu.ng or see https://portal.uni.edu/fees ' + b[1000:1940]
+               for b in plain]
+    markup  = [f"<div><p>{b[:1000]}</p>&nbsp;<p>{b[1000:1950]}</p></div>" for b in plain]
+
+    for label, corpus in (('plain', plain), ('address+url', contact), ('html', markup)):
+        for name, new, ref in (
+            ('clean_text', clean_text, _reference_clean_text),
+            ('strip_html', strip_html, _reference_strip_html),
+        ):
+            if name == 'strip_html' and label != 'html':
+                continue
+            t_ref = min(timeit.repeat(lambda: [ref(b) for b in corpus], number=5, repeat=3))
+            t_new = min(timeit.repeat(lambda: [new(b) for b in corpus], number=5, repeat=3))
+            per   = 1e6 / (5 * len(corpus))
+            print(f"[text_normalizer] {name:<10} {label:<12} "
+                  f"before {t_ref * per:6.1f} µs  after {t_new * per:6.1f} µs  ({t_ref / t_new:3.1f}×)")